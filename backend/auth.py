@@ -1,17 +1,68 @@
 from fastapi import APIRouter, HTTPException, Header
 from .models import UserSignup, UserLogin
-from .database import execute_query, fetch_one, fetch_all
-import hashlib
+from .database import execute_query, fetch_one, fetch_all, delete_expired
+from . import metrics, passwords
+from .session_tokens import DenyList, create_signed_token, is_signed_token, parse_signed_token
+from cachetools import TLRUCache
+import asyncio
+import os
+import threading
 import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+SESSION_DAYS = 7
 
-def hash_password(password: str) -> str:
-    """Hash password using SHA256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+# "db" issues random tokens looked up in the sessions table; "signed" issues
+# HMAC-signed tokens verified without the database. Both are always accepted.
+SESSION_TOKEN_MODE = os.getenv('SESSION_TOKEN_MODE', 'db')
+SESSION_SECRET = os.getenv('SESSION_SECRET')
+REVOCATION_SYNC_SECONDS = int(os.getenv('REVOCATION_SYNC_SECONDS', 10))
+
+# Expired sessions are deleted by a background sweeper in bounded batches
+SESSION_SWEEP_SECONDS = int(os.getenv('SESSION_SWEEP_SECONDS', 300))
+SESSION_SWEEP_BATCH = int(os.getenv('SESSION_SWEEP_BATCH', 1000))
+
+SESSION_QUERY = "SELECT user_id, expires_at FROM sessions WHERE session_token = %s"
+REVOKED_QUERY = "SELECT token_id, expires_at FROM revoked_tokens WHERE expires_at > NOW()"
+REVOKED_SINCE_QUERY = "SELECT token_id, expires_at FROM revoked_tokens WHERE revoked_at >= %s"
+
+if SESSION_TOKEN_MODE == 'signed' and not SESSION_SECRET:
+    raise RuntimeError("SESSION_SECRET must be set when SESSION_TOKEN_MODE=signed")
+
+# Revoked signed tokens, synced from revoked_tokens by revocation_sync_loop
+_deny_list = DenyList()
+_last_revocation_sync = None
+
+# Session lookup cache: token -> (user_id, expires_at).
+# Logout invalidates the local entry; other workers may accept a revoked
+# token for at most SESSION_CACHE_TTL seconds.
+SESSION_CACHE_TTL = int(os.getenv('SESSION_CACHE_TTL', 60))
+SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', 10000))
+
+
+def _session_ttu(token, session, now):
+    """Keep a session until its TTL window ends or it expires, whichever is first"""
+    remaining = (session[1] - datetime.now()).total_seconds()
+    return now + min(SESSION_CACHE_TTL, remaining)
+
+
+_session_cache = TLRUCache(maxsize=SESSION_CACHE_SIZE, ttu=_session_ttu)
+_session_cache_lock = threading.Lock()
+
+metrics.register_gauge("auth.session_cache.size", lambda: len(_session_cache))
+metrics.register_gauge(
+    "auth.session_cache.hit_ratio",
+    lambda: metrics.hit_ratio("auth.session_cache.hits", "auth.session_cache.misses")
+)
+
+
+def invalidate_session(token: str):
+    """Drop a token from the session cache"""
+    with _session_cache_lock:
+        _session_cache.pop(token, None)
 
 
 def create_session_token() -> str:
@@ -19,24 +70,128 @@ def create_session_token() -> str:
     return str(uuid.uuid4())
 
 
+def issue_session(user_id: int) -> str:
+    """Create a session for user_id and return its token"""
+    expires_at = datetime.now() + timedelta(days=SESSION_DAYS)
+
+    if SESSION_TOKEN_MODE == 'signed':
+        return create_signed_token(user_id, expires_at, SESSION_SECRET)
+
+    session_token = create_session_token()
+    execute_query(
+        "INSERT INTO sessions (user_id, session_token, expires_at) VALUES (%s, %s, %s)",
+        (user_id, session_token, expires_at)
+    )
+    return session_token
+
+
+def verify_signed_session(token: str) -> Optional[int]:
+    """Verify a signed token purely in memory"""
+    if not SESSION_SECRET:
+        return None
+
+    parsed = parse_signed_token(token, SESSION_SECRET)
+    if not parsed:
+        return None
+
+    user_id, expires_at, token_id = parsed
+    if expires_at < datetime.now() or token_id in _deny_list:
+        return None
+
+    return user_id
+
+
+def revoke_signed_session(token: str):
+    """Add a signed token to the shared deny-list"""
+    parsed = parse_signed_token(token, SESSION_SECRET) if SESSION_SECRET else None
+    if not parsed:
+        return
+
+    _, expires_at, token_id = parsed
+    execute_query(
+        "INSERT IGNORE INTO revoked_tokens (token_id, expires_at) VALUES (%s, %s)",
+        (token_id, expires_at)
+    )
+    _deny_list.add(token_id, expires_at)
+
+
+def sync_revoked_tokens():
+    """Pull revocations made by other workers since the last sync"""
+    global _last_revocation_sync
+
+    # revoked_at is filled by the database clock, so the watermark must be too
+    started_at = fetch_one("SELECT NOW() AS now")['now']
+    if _last_revocation_sync is None:
+        rows = fetch_all(REVOKED_QUERY)
+    else:
+        rows = fetch_all(REVOKED_SINCE_QUERY, (_last_revocation_sync,))
+
+    for row in rows:
+        _deny_list.add(row['token_id'], row['expires_at'])
+
+    _deny_list.prune()
+    # Overlap by a second so rows committed during the query are not missed
+    _last_revocation_sync = started_at - timedelta(seconds=1)
+
+
+async def revocation_sync_loop():
+    """Background task keeping the deny-list in sync across workers"""
+    while True:
+        try:
+            await asyncio.to_thread(sync_revoked_tokens)
+        except Exception as e:
+            print(f"Error syncing revoked tokens: {e}")
+        await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+
+
+def sweep_expired_sessions(batch_size: int = SESSION_SWEEP_BATCH) -> int:
+    """Delete expired sessions and revocations in LIMIT-sized batches; returns rows removed"""
+    removed = 0
+    for table in ('sessions', 'revoked_tokens'):
+        removed += delete_expired(table, batch_size)
+
+    metrics.increment("auth.sessions_swept", removed)
+    return removed
+
+
+async def session_sweeper_loop():
+    """Background task removing expired sessions every SESSION_SWEEP_SECONDS"""
+    while True:
+        try:
+            removed = await asyncio.to_thread(sweep_expired_sessions)
+            if removed:
+                print(f"🧹 Swept {removed} expired sessions")
+        except Exception as e:
+            print(f"Error sweeping expired sessions: {e}")
+        await asyncio.sleep(SESSION_SWEEP_SECONDS)
+
+
 def verify_session(token: str) -> Optional[int]:
     """Verify session token and return user_id"""
-    query = """
-            SELECT user_id, expires_at
-            FROM sessions
-            WHERE session_token = %s \
-            """
-    session = fetch_one(query, (token,))
+    if is_signed_token(token):
+        return verify_signed_session(token)
+
+    with _session_cache_lock:
+        cached = _session_cache.get(token)
+
+    if cached is not None and cached[1] >= datetime.now():
+        metrics.increment("auth.session_cache.hits")
+        return cached[0]
+
+    metrics.increment("auth.session_cache.misses")
+
+    session = fetch_one(SESSION_QUERY, (token,))
 
     if not session:
         return None
 
-    # Check if session expired
+    # Check if session expired (the sweeper deletes the row later)
     if session['expires_at'] < datetime.now():
-        # Delete expired session
-        execute_query("DELETE FROM sessions WHERE session_token = %s", (token,))
         return None
 
+    with _session_cache_lock:
+        _session_cache[token] = (session['user_id'], session['expires_at'])
+
     return session['user_id']
 
 
@@ -49,8 +204,8 @@ async def signup(user: UserSignup):
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
 
-        # Hash password
-        hashed_pw = hash_password(user.password)
+        # Hash password (off the event loop)
+        hashed_pw = await passwords.hash_password(user.password)
 
         # Insert user
         query = """
@@ -63,13 +218,7 @@ async def signup(user: UserSignup):
         )
 
         # Create session
-        session_token = create_session_token()
-        expires_at = datetime.now() + timedelta(days=7)
-
-        execute_query(
-            "INSERT INTO sessions (user_id, session_token, expires_at) VALUES (%s, %s, %s)",
-            (user_id, session_token, expires_at)
-        )
+        session_token = issue_session(user_id)
 
         return {
             "success": True,
@@ -88,24 +237,22 @@ async def signup(user: UserSignup):
 async def login(credentials: UserLogin):
     """Login user"""
     try:
-        # Hash the provided password
-        hashed_pw = hash_password(credentials.password)
-
         # Check credentials
-        query = "SELECT user_id, name FROM users WHERE email = %s AND password = %s"
-        user = fetch_one(query, (credentials.email, hashed_pw))
+        query = "SELECT user_id, name, password FROM users WHERE email = %s"
+        user = fetch_one(query, (credentials.email,))
 
-        if not user:
+        if not user or not await passwords.verify_password(credentials.password, user['password']):
             raise HTTPException(status_code=401, detail="Invalid email or password")
 
-        # Create session
-        session_token = create_session_token()
-        expires_at = datetime.now() + timedelta(days=7)
+        # Upgrade legacy SHA-256 hashes and hashes made with an old cost
+        if passwords.needs_rehash(user['password']):
+            execute_query(
+                "UPDATE users SET password = %s WHERE user_id = %s",
+                (await passwords.hash_password(credentials.password), user['user_id'])
+            )
 
-        execute_query(
-            "INSERT INTO sessions (user_id, session_token, expires_at) VALUES (%s, %s, %s)",
-            (user['user_id'], session_token, expires_at)
-        )
+        # Create session
+        session_token = issue_session(user['user_id'])
 
         return {
             "success": True,
@@ -131,8 +278,12 @@ async def logout(authorization: str = Header(None)):
         # Extract token (format: "Bearer <token>")
         token = authorization.replace("Bearer ", "")
 
-        # Delete session
-        execute_query("DELETE FROM sessions WHERE session_token = %s", (token,))
+        # Revoke signed tokens, delete database sessions
+        if is_signed_token(token):
+            revoke_signed_session(token)
+        else:
+            execute_query("DELETE FROM sessions WHERE session_token = %s", (token,))
+            invalidate_session(token)
 
         return {"success": True, "message": "Logged out successfully"}
 
@@ -0,0 +1,94 @@
+import os
+
+os.environ.setdefault('LLM_PROVIDER', 'stub')
+
+import asyncio
+import statistics
+import time
+import uuid
+from backend.database import fetch_all
+from backend.dependencies import fetch_profile
+from backend.coach import ChatMessage, stream_chat_with_coach
+from backend import career, llm
+
+# Career path and coach chat latency under concurrency, with the LLM replaced
+# by the local stub (LLM_PROVIDER=stub unless set otherwise). Tune the stub
+# with LLM_STUB_TTFT / LLM_STUB_TOKENS_PER_SEC / LLM_STUB_ERROR_RATE.
+#
+#   python -m backend.bench_llm
+#
+# Uses existing users from the configured database and writes career cache
+# rows and coach conversations, so point it at a development database.
+
+USERS = 20
+CONCURRENCY = 32
+REQUESTS = 128
+
+
+def summarize(name, latencies, ttfts, elapsed):
+    latencies.sort()
+    ttfts.sort()
+    return {
+        "name": name,
+        "per_sec": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "ttft_p50_ms": statistics.median(ttfts) * 1000 if ttfts else None
+    }
+
+
+async def run(name, profiles, request):
+    latencies = []
+    ttfts = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def limited(i):
+        async with semaphore:
+            start = time.perf_counter()
+            ttft = await request(profiles[i % len(profiles)], i)
+            latencies.append(time.perf_counter() - start)
+            if ttft is not None:
+                ttfts.append(ttft - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited(i) for i in range(REQUESTS)))
+    return summarize(name, latencies, ttfts, time.perf_counter() - start)
+
+
+def career_request(tag):
+    async def request(profile, i):
+        # A fresh goal per request misses the career cache and reaches the LLM
+        await career.career_path_result({**profile, "career_goal": f"{profile.get('career_goal')} #{tag}-{i}"})
+    return request
+
+
+async def coach_request(profile, i):
+    response = await stream_chat_with_coach(ChatMessage(message=f"How do I get better at interviews? ({i})"), profile)
+    first_token = None
+    async for event in response.body_iterator:
+        if first_token is None and event.startswith("event: token"):
+            first_token = time.perf_counter()
+    return first_token
+
+
+async def main():
+    users = fetch_all("SELECT user_id FROM users ORDER BY user_id LIMIT %s", (USERS,))
+    profiles = [fetch_profile(row['user_id']) for row in users or []]
+    if not profiles:
+        print("❌ No users in the database")
+        return
+
+    print(f"🤖 {llm.LLM_PROVIDER} provider, {REQUESTS} requests, {CONCURRENCY} concurrent, "
+          f"{llm.LLM_MAX_CONCURRENCY} LLM slots, {len(profiles)} users\n")
+    print(f"{'endpoint':<14} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'ttft p50':>9}")
+
+    tag = uuid.uuid4().hex[:8]
+    for name, request in (("career/path", career_request(tag)), ("coach/stream", coach_request)):
+        result = await run(name, profiles, request)
+        ttft = f"{result['ttft_p50_ms']:>9.1f}" if result['ttft_p50_ms'] is not None else f"{'-':>9}"
+        print(f"{result['name']:<14} {result['per_sec']:>8.1f} "
+              f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {ttft}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
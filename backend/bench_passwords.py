@@ -0,0 +1,54 @@
+import asyncio
+import statistics
+import time
+from backend import passwords
+
+# Login throughput/latency vs. scrypt cost. Each simulated login is one
+# verify_password call on the hashing pool, which is the CPU part of /auth/login.
+#
+#   python -m backend.bench_passwords
+
+COSTS = [12, 13, 14, 15]
+CONCURRENCY = 32
+LOGINS = 128
+
+
+async def run(cost):
+    stored = passwords.hash_password_sync("correct horse battery staple", cost)
+    latencies = []
+
+    async def login():
+        start = time.perf_counter()
+        await passwords.verify_password("correct horse battery staple", stored)
+        latencies.append(time.perf_counter() - start)
+
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def limited():
+        async with semaphore:
+            await login()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(LOGINS)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "cost": cost,
+        "logins_per_sec": LOGINS / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000
+    }
+
+
+async def main():
+    print(f"🔐 {LOGINS} logins, {CONCURRENCY} concurrent, {passwords.PASSWORD_HASH_WORKERS} hash workers\n")
+    print(f"{'cost':>4} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for cost in COSTS:
+        result = await run(cost)
+        print(f"{result['cost']:>4} {result['logins_per_sec']:>10.1f} "
+              f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,71 +1,37 @@
-from fastapi import APIRouter, HTTPException, Header
-from backend.models import CareerPathRequest
-from backend.database import fetch_one, fetch_all
-from backend.auth import verify_session
+from fastapi import APIRouter, HTTPException, Depends
+from backend.models import CareerPathRequest, CareerPath
+from backend.database import fetch_all
+from backend.dependencies import get_current_profile
+from backend.rate_limit import rate_limit
 from backend.faiss_utils import search_faiss
-import google.generativeai as genai
-import os
+from backend.career_cache import profile_fingerprint, get_cached_paths, store_paths
+from backend.degree_map import normalize_degree, get_career_options
+from backend.json_stream import load_models
+from backend import llm, jobs, career_clusters
 import json
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Configure Gemini API
-genai.configure(api_key=os.getenv('GEMINI_API'))
 
 router = APIRouter(prefix="/career", tags=["Career Guidance"])
 
+# Bump when the career path prompt changes so cached results are not reused
+CAREER_PROMPT_VERSION = "career-path-v1"
 
-def get_user_profile(user_id):
-    """Get complete user profile with skills"""
-    user = fetch_one(
-        "SELECT user_id, name, email, degree, career_goal FROM users WHERE user_id = %s",
-        (user_id,)
-    )
-
-    if not user:
-        return None
-
-    # Get user skills
-    skills = fetch_all("""
-                       SELECT s.skill_id, s.skill_name, us.proficiency
-                       FROM user_skills us
-                                JOIN skills s ON us.skill_id = s.skill_id
-                       WHERE us.user_id = %s
-                       """, (user_id,))
-
-    user['skills'] = skills
-    return user
-
-
-@router.post("/path")
-async def get_career_path(request: CareerPathRequest, authorization: str = Header(None)):
-    """Get AI-powered career path recommendations"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
 
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
+async def generate_career_paths(prompt, fingerprint):
+    """Ask Gemini for career paths, validate them and cache the result"""
+    # Call Gemini API
+    response_text = (await llm.generate(prompt, endpoint="career_path")).strip()
 
-    response_text = ""  # Initialize at function scope
+    # First JSON array in the reply, wherever the fences or prose put it
+    career_paths = [path.model_dump() for path in load_models(response_text, CareerPath)]
 
-    try:
-        # Get user profile
-        profile = get_user_profile(user_id)
+    store_paths(fingerprint, career_paths)
 
-        if not profile:
-            raise HTTPException(status_code=404, detail="User not found")
+    return career_paths
 
-        # Prepare data for Gemini
-        skill_names = [s['skill_name'] for s in profile['skills']] if profile['skills'] else []
-        degree = profile.get('degree') or 'Not specified'
-        career_goal = profile.get('career_goal') or 'Exploring options'
 
-        # Build prompt
-        prompt = f"""You are a career guidance counselor for college students. Analyze this student profile and provide career recommendations.
+def build_career_prompt(degree, skill_names, career_goal):
+    """Career path prompt for a student profile"""
+    return f"""You are a career guidance counselor for college students. Analyze this student profile and provide career recommendations.
 
 Student Profile:
 - Degree/Major: {degree}
@@ -91,47 +57,42 @@ Return ONLY a valid JSON array with this exact structure:
 Be specific, practical, and encouraging. Focus on careers achievable for college students and recent graduates.
 Important: Return ONLY the JSON array, no other text."""
 
-        # Call Gemini API
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
-
-        # Get response text
-        response_text = response.text.strip()
-
-        # Log the response for debugging
-        print(f"Gemini API Response: {response_text[:200]}...")
-
-        # Extract JSON from response (remove markdown code blocks if present)
-        if '```json' in response_text:
-            # Extract content between ```json and ```
-            response_text = response_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in response_text:
-            # Extract content between first ``` and next ```
-            parts = response_text.split('```')
-            if len(parts) >= 2:
-                response_text = parts[1].strip()
-
-        # Try to parse JSON
-        try:
-            career_paths = json.loads(response_text)
-        except json.JSONDecodeError:
-            # If JSON parsing fails, try to find JSON array in text
-            import re
-            json_match = re.search(r'\[[\s\S]*\]', response_text)
-            if json_match:
-                career_paths = json.loads(json_match.group(0))
-            else:
-                raise json.JSONDecodeError("No valid JSON array found", response_text, 0)
-
-        # Validate the structure
-        if not isinstance(career_paths, list) or len(career_paths) == 0:
-            raise ValueError("Invalid career paths format")
-
-        # Ensure each path has required fields
-        for path in career_paths:
-            if not all(key in path for key in ['title', 'fit_reason', 'missing_skills', 'roadmap']):
-                raise ValueError("Missing required fields in career path")
 
+def career_inputs(profile):
+    """Prompt inputs for a profile and their cache fingerprint"""
+    skill_names = [s['skill_name'] for s in profile['skills']] if profile['skills'] else []
+    degree = profile.get('degree') or 'Not specified'
+    career_goal = profile.get('career_goal') or 'Exploring options'
+    fingerprint = profile_fingerprint(degree, skill_names, career_goal, CAREER_PROMPT_VERSION)
+    return skill_names, degree, career_goal, fingerprint
+
+
+def submit_refine(profile, fingerprint):
+    """Queue a personalized generation behind a cluster answer; returns the job id or None"""
+    try:
+        job = jobs.queue.submit(
+            "career_path_refine", fingerprint,
+            lambda: career_path_result(profile, use_clusters=False),
+            priority=jobs.PRIORITY_BACKGROUND, user_id=profile['user_id'],
+            parent=jobs.current_job.get()  # set when running as /path/async
+        )
+    except jobs.QueueFull:
+        return None
+    return job.job_id
+
+
+async def career_path_result(profile, use_clusters=True):
+    """Career path response for a profile; raises if generation fails
+
+    Profiles close to a precomputed cluster get its paths at once, plus a
+    background job id for their own paths when refining is enabled.
+    """
+    skill_names, degree, career_goal, fingerprint = career_inputs(profile)
+
+    # Serve from cache when the profile inputs have been seen before
+    cached_paths = get_cached_paths(fingerprint)
+
+    if cached_paths:
         return {
             "success": True,
             "profile": {
@@ -139,66 +100,119 @@ Important: Return ONLY the JSON array, no other text."""
                 "skills": skill_names,
                 "career_goal": career_goal
             },
-            "career_paths": career_paths
+            "career_paths": cached_paths,
+            "cached": True
         }
 
-    except json.JSONDecodeError as e:
-        print(f"JSON parsing error: {e}")
-        print(f"Response text: {response_text}")
-
-        # Return a fallback response
-        return {
+    # Close enough to a precomputed cluster: answer now, personalize later
+    cluster = None
+    if use_clusters:
+        cluster = await career_clusters.lookup(degree, skill_names, career_goal, CAREER_PROMPT_VERSION)
+    if cluster:
+        result = {
             "success": True,
             "profile": {
-                "degree": profile.get('degree') or 'Not specified',
-                "skills": skill_names if 'skill_names' in locals() else [],
-                "career_goal": profile.get('career_goal') or 'Exploring options'
+                "degree": degree,
+                "skills": skill_names,
+                "career_goal": career_goal
             },
-            "career_paths": [
-                {
-                    "title": "Software Developer",
-                    "fit_reason": "Based on your profile, software development is a strong match. This role combines technical skills with problem-solving abilities.",
-                    "missing_skills": ["Advanced Programming", "System Design", "Version Control (Git)"],
-                    "roadmap": [
-                        "Complete a full-stack web development course",
-                        "Build 3-5 portfolio projects showcasing your skills",
-                        "Contribute to open-source projects on GitHub",
-                        "Practice coding interview questions on LeetCode"
-                    ]
-                },
-                {
-                    "title": "Data Analyst",
-                    "fit_reason": "Your analytical mindset and interest in data make this a viable career path. Data analysts are in high demand across industries.",
-                    "missing_skills": ["SQL", "Data Visualization (Tableau/PowerBI)", "Statistical Analysis"],
-                    "roadmap": [
-                        "Learn SQL and practice with real datasets",
-                        "Master Excel and a visualization tool",
-                        "Complete online courses in statistics and data analysis",
-                        "Work on data analysis projects using public datasets"
-                    ]
-                },
-                {
-                    "title": "Product Manager",
-                    "fit_reason": "This role bridges technology and business, perfect for those who understand tech but want to focus on strategy and user needs.",
-                    "missing_skills": ["Product Strategy", "User Research", "Agile Methodologies"],
-                    "roadmap": [
-                        "Study product management frameworks and principles",
-                        "Learn about user research and UX design basics",
-                        "Work on a side project managing a small product",
-                        "Network with product managers and attend PM meetups"
-                    ]
-                }
-            ]
+            "career_paths": cluster['career_paths'],
+            "cached": True,
+            "cluster_similarity": cluster['similarity']
         }
+        if career_clusters.CAREER_CLUSTER_REFINE:
+            result["refine_job_id"] = submit_refine(profile, fingerprint)
+        return result
+
+    prompt = build_career_prompt(degree, skill_names, career_goal)
+
+    # Concurrent requests for the same profile share one generation
+    career_paths = await llm.coalesce(
+        ("career_path", fingerprint),
+        lambda: generate_career_paths(prompt, fingerprint)
+    )
+
+    return {
+        "success": True,
+        "profile": {
+            "degree": degree,
+            "skills": skill_names,
+            "career_goal": career_goal
+        },
+        "career_paths": career_paths,
+        "cached": False
+    }
+
+
+def fallback_career_paths(profile):
+    """Generic career paths used when generation fails"""
+    return {
+        "success": True,
+        "profile": {
+            "degree": profile.get('degree') or 'Not specified',
+            "skills": [s['skill_name'] for s in profile['skills']],
+            "career_goal": profile.get('career_goal') or 'Exploring options'
+        },
+        "career_paths": [
+            {
+                "title": "Software Developer",
+                "fit_reason": "Based on your profile, software development is a strong match. This role combines technical skills with problem-solving abilities.",
+                "missing_skills": ["Advanced Programming", "System Design", "Version Control (Git)"],
+                "roadmap": [
+                    "Complete a full-stack web development course",
+                    "Build 3-5 portfolio projects showcasing your skills",
+                    "Contribute to open-source projects on GitHub",
+                    "Practice coding interview questions on LeetCode"
+                ]
+            },
+            {
+                "title": "Data Analyst",
+                "fit_reason": "Your analytical mindset and interest in data make this a viable career path. Data analysts are in high demand across industries.",
+                "missing_skills": ["SQL", "Data Visualization (Tableau/PowerBI)", "Statistical Analysis"],
+                "roadmap": [
+                    "Learn SQL and practice with real datasets",
+                    "Master Excel and a visualization tool",
+                    "Complete online courses in statistics and data analysis",
+                    "Work on data analysis projects using public datasets"
+                ]
+            },
+            {
+                "title": "Product Manager",
+                "fit_reason": "This role bridges technology and business, perfect for those who understand tech but want to focus on strategy and user needs.",
+                "missing_skills": ["Product Strategy", "User Research", "Agile Methodologies"],
+                "roadmap": [
+                    "Study product management frameworks and principles",
+                    "Learn about user research and UX design basics",
+                    "Work on a side project managing a small product",
+                    "Network with product managers and attend PM meetups"
+                ]
+            }
+        ]
+    }
+
+
+@router.post("/path", dependencies=[Depends(rate_limit("career_path"))])
+async def get_career_path(request: CareerPathRequest, profile: dict = Depends(get_current_profile)):
+    """Get AI-powered career path recommendations"""
+    try:
+        return await career_path_result(profile)
+
+    except json.JSONDecodeError as e:
+        print(f"JSON parsing error: {e}")
+        print(f"Response text: {e.doc}")
+
+        # Return a fallback response
+        llm.record_fallback("career_path", "json")
+        return fallback_career_paths(profile)
 
     except HTTPException:
         raise
 
     except Exception as e:
         print(f"Error generating career path: {e}")
-        print(f"Response text (if available): {response_text if response_text else 'No response'}")
 
         # Return fallback career paths
+        llm.record_fallback("career_path", "error")
         return {
             "success": True,
             "profile": {
@@ -244,24 +258,20 @@ Important: Return ONLY the JSON array, no other text."""
         }
 
 
-@router.post("/skills/analyze")
-async def analyze_skills(authorization: str = Header(None)):
-    """Analyze user skills and suggest improvements using FAISS"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
+@router.post("/path/async", dependencies=[Depends(rate_limit("career_path"))])
+async def submit_career_path(request: CareerPathRequest, profile: dict = Depends(get_current_profile)):
+    """Queue career path generation; poll /jobs/{job_id} or follow /jobs/{job_id}/events"""
+    fingerprint = career_inputs(profile)[3]
+    return jobs.submit_or_503(
+        "career_path", fingerprint, lambda: career_path_result(profile), profile['user_id'],
+        fallback=lambda: fallback_career_paths(profile)
+    )
 
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
 
+@router.post("/skills/analyze")
+async def analyze_skills(profile: dict = Depends(get_current_profile)):
+    """Analyze user skills and suggest improvements using FAISS"""
     try:
-        profile = get_user_profile(user_id)
-
-        if not profile:
-            raise HTTPException(status_code=404, detail="User not found")
-
         user_skill_ids = [s['skill_id'] for s in profile['skills']] if profile['skills'] else []
 
         # Get all skills
@@ -307,39 +317,21 @@ async def analyze_skills(authorization: str = Header(None)):
         raise HTTPException(status_code=500, detail=f"Error analyzing skills: {str(e)}")
 
 
-@router.get("/degree/map")
+@router.get("/degree/map", dependencies=[Depends(rate_limit("degree_map"))])
 async def map_degree_to_careers(degree: str):
     """Map a degree to potential career options"""
-    try:
-        prompt = f"""List 5 specific job roles/career paths for someone with a {degree} degree.
-
-Return ONLY a valid JSON array of strings:
-["Career 1", "Career 2", "Career 3", "Career 4", "Career 5"]
-
-Be specific with job titles (e.g., "Machine Learning Engineer" not just "Engineer")."""
+    if not normalize_degree(degree):
+        raise HTTPException(status_code=400, detail="Degree is required")
 
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
-
-        # Extract JSON safely from response
-        response_text = response.strip()
-
-        # Remove code fences if present
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1]
-            response_text = response_text.split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1]
-            response_text = response_text.split("```")[0].strip()
-
-        career_paths = json.loads(response_text)
+    try:
+        career_options = await get_career_options(degree)
 
         return {
             "success": True,
             "degree": degree,
-            "career_options": career_paths
+            "career_options": career_options
         }
 
     except Exception as e:
         print(f"Error mapping degree: {e}")
-        raise HTTPException(status_code=500, detail=f"Error mapping degree: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error mapping degree: {str(e)}")
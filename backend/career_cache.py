@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from backend.database import fetch_one, execute_query, delete_expired
+from backend import metrics
+
+# Persistent cache of parsed /career/path results.
+# The key is a hash of the normalized profile inputs plus the prompt version,
+# so editing degree, goal or skills (or the prompt) simply misses the old entry.
+
+CAREER_CACHE_TTL_HOURS = int(os.getenv('CAREER_CACHE_TTL_HOURS', 24 * 7))
+CAREER_CACHE_SWEEP_SECONDS = int(os.getenv('CAREER_CACHE_SWEEP_SECONDS', 3600))
+CAREER_CACHE_SWEEP_BATCH = 1000
+
+CACHE_QUERY = "SELECT career_paths FROM career_path_cache WHERE fingerprint = %s AND expires_at > NOW()"
+
+metrics.register_gauge(
+    "career_cache.hit_ratio",
+    lambda: metrics.hit_ratio("career_cache.hits", "career_cache.misses")
+)
+
+
+def normalize(text):
+    """Lowercase and collapse whitespace"""
+    return " ".join((text or "").lower().split())
+
+
+def profile_fingerprint(degree, skill_names, career_goal, prompt_version):
+    """Stable hash of the inputs that shape the career path prompt"""
+    key = {
+        "degree": normalize(degree),
+        "skills": sorted({normalize(s) for s in skill_names}),
+        "career_goal": normalize(career_goal),
+        "prompt_version": prompt_version
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def get_cached_paths(fingerprint):
+    """Return cached career paths or None"""
+    row = fetch_one(CACHE_QUERY, (fingerprint,))
+
+    if not row:
+        metrics.increment("career_cache.misses")
+        return None
+
+    metrics.increment("career_cache.hits")
+    return json.loads(row['career_paths'])
+
+
+def store_paths(fingerprint, career_paths, ttl_hours=CAREER_CACHE_TTL_HOURS):
+    """Store parsed career paths for a fingerprint"""
+    execute_query(
+        "REPLACE INTO career_path_cache (fingerprint, career_paths, expires_at) VALUES (%s, %s, %s)",
+        (fingerprint, json.dumps(career_paths), datetime.now() + timedelta(hours=ttl_hours))
+    )
+
+
+def sweep_expired(batch_size=CAREER_CACHE_SWEEP_BATCH):
+    """Delete expired cache rows in LIMIT-sized batches; returns rows removed"""
+    removed = delete_expired('career_path_cache', batch_size)
+    metrics.increment("career_cache.swept", removed)
+    return removed
+
+
+async def sweeper_loop():
+    """Background task removing expired cache rows every CAREER_CACHE_SWEEP_SECONDS"""
+    while True:
+        try:
+            removed = await asyncio.to_thread(sweep_expired)
+            if removed:
+                print(f"🧹 Swept {removed} expired career path cache rows")
+        except Exception as e:
+            print(f"Error sweeping career path cache: {e}")
+        await asyncio.sleep(CAREER_CACHE_SWEEP_SECONDS)
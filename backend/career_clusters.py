@@ -0,0 +1,270 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+import faiss
+import numpy as np
+from backend.database import fetch_all, execute_query, execute_write, get_catalog_version, bump_catalog_version
+from backend.faiss_utils import get_model
+from backend.career_cache import normalize, profile_fingerprint
+from backend.degree_map import normalize_degree
+from backend import metrics
+
+# Career paths precomputed per profile cluster. Most students share a
+# degree, a goal and a handful of skills with many others, so a batch job
+# embeds every profile, groups them with k-means and generates career paths
+# once per cluster from a representative profile:
+#
+#   python -m backend.career_clusters
+#
+# /career/path then answers a new profile from the nearest cluster right
+# away, when it is similar enough, and can queue a personalized generation
+# in the background. Each run stores a new generation of rows and bumps the
+# 'career_clusters' catalog version so running servers reload them.
+
+CAREER_CLUSTERS_ENABLED = os.getenv('CAREER_CLUSTERS_ENABLED', 'true').lower() == 'true'
+CAREER_CLUSTERS = int(os.getenv('CAREER_CLUSTERS', 40))
+CAREER_CLUSTER_THRESHOLD = float(os.getenv('CAREER_CLUSTER_THRESHOLD', 0.8))  # cosine similarity
+CAREER_CLUSTER_REFINE = os.getenv('CAREER_CLUSTER_REFINE', 'true').lower() == 'true'
+CAREER_CLUSTER_BATCH_DELAY = float(os.getenv('CAREER_CLUSTER_BATCH_DELAY', 2.0))  # seconds between LLM calls
+CAREER_CLUSTER_REFRESH_SECONDS = 300
+CAREER_CLUSTER_SKILLS = 8  # skills in a representative profile
+
+# Latest generation of clusters for a prompt version
+CLUSTERS_QUERY = """
+                 SELECT degree, career_goal, skills, members, centroid, career_paths
+                 FROM career_path_clusters
+                 WHERE prompt_version = %s
+                   AND generation = (SELECT MAX(generation) FROM career_path_clusters WHERE prompt_version = %s) \
+                 """
+
+_clusters = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+metrics.register_gauge(
+    "career_clusters.hit_ratio",
+    lambda: metrics.hit_ratio("career_clusters.hits", "career_clusters.misses")
+)
+metrics.register_gauge("career_clusters.loaded", lambda: len(_clusters) if _clusters else 0)
+
+
+def profile_text(degree, skill_names, career_goal):
+    """Text embedded for a profile; the same inputs as the career path prompt"""
+    skills = ", ".join(sorted({normalize(s) for s in skill_names})) or "none"
+    return f"Degree: {normalize_degree(degree) or 'unspecified'}. Goal: {normalize(career_goal)}. Skills: {skills}."
+
+
+def embed_profiles(texts):
+    vectors = get_model().encode(texts, normalize_embeddings=True)
+    return np.asarray(vectors, dtype='float32')
+
+
+def representative(members):
+    """Most common degree and goal plus the skills shared across a cluster"""
+    degrees = Counter(normalize_degree(m['degree']) for m in members)
+    goals = Counter(normalize(m['career_goal']) for m in members)
+    skills = Counter(normalize(s) for m in members for s in dict.fromkeys(m['skills']))
+
+    degree_key = degrees.most_common(1)[0][0]
+    goal_key = goals.most_common(1)[0][0]
+    degree = next(m['degree'] for m in members if normalize_degree(m['degree']) == degree_key)
+    career_goal = next(m['career_goal'] for m in members if normalize(m['career_goal']) == goal_key)
+
+    # Keep skills at least a third of the members have
+    common = [s for s, count in skills.most_common(CAREER_CLUSTER_SKILLS) if count * 3 >= len(members)]
+    names = {normalize(s): s for m in members for s in m['skills']}
+    return degree, [names[s] for s in common], career_goal
+
+
+def cluster_profiles(profiles, k=CAREER_CLUSTERS):
+    """Group profiles with spherical k-means; returns one dict per non-empty cluster"""
+    vectors = embed_profiles([profile_text(p['degree'], p['skills'], p['career_goal']) for p in profiles])
+    k = max(1, min(k, len(profiles) // 2))
+
+    kmeans = faiss.Kmeans(vectors.shape[1], k, niter=20, seed=1234, spherical=True)
+    kmeans.train(vectors)
+    _, labels = kmeans.index.search(vectors, 1)
+
+    groups = defaultdict(list)
+    for profile, label in zip(profiles, labels[:, 0]):
+        groups[int(label)].append(profile)
+
+    clusters = []
+    for label, members in groups.items():
+        degree, skills, career_goal = representative(members)
+        clusters.append({
+            "degree": degree,
+            "skills": skills,
+            "career_goal": career_goal,
+            "members": len(members),
+            # Search against the representative profile, which the paths describe
+            "centroid": embed_profiles([profile_text(degree, skills, career_goal)])[0]
+        })
+
+    return sorted(clusters, key=lambda c: -c['members'])
+
+
+class ClusterIndex:
+    """Loaded clusters with an inner-product index over their vectors"""
+
+    def __init__(self, rows, version):
+        self.version = version
+        self.rows = rows
+        self.index = None
+        if rows:
+            vectors = np.asarray([row['centroid'] for row in rows], dtype='float32')
+            self.index = faiss.IndexFlatIP(vectors.shape[1])
+            self.index.add(vectors)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def nearest(self, vector):
+        """(row, similarity) of the closest cluster, or (None, 0.0)"""
+        if self.index is None:
+            return None, 0.0
+        scores, ids = self.index.search(np.asarray([vector], dtype='float32'), 1)
+        return self.rows[ids[0][0]], float(scores[0][0])
+
+
+def load_clusters(prompt_version):
+    rows = fetch_all(CLUSTERS_QUERY, (prompt_version, prompt_version))
+
+    for row in rows or []:
+        for column in ("skills", "centroid", "career_paths"):
+            row[column] = json.loads(row[column])
+    return rows or []
+
+
+def get_clusters(prompt_version):
+    """Current clusters, reloaded when a batch run bumps the catalog version"""
+    global _clusters, _checked_at
+
+    if _clusters is not None and time.monotonic() - _checked_at < CAREER_CLUSTER_REFRESH_SECONDS:
+        return _clusters
+
+    # Only one thread reloads; the others keep serving the old clusters
+    if not _lock.acquire(blocking=_clusters is None):
+        return _clusters
+
+    try:
+        _checked_at = time.monotonic()
+        version = get_catalog_version('career_clusters')
+        if _clusters is None or _clusters.version != version:
+            _clusters = ClusterIndex(load_clusters(prompt_version), version)
+        return _clusters
+    except Exception as e:
+        print(f"Error loading career clusters: {e}")
+        return _clusters
+    finally:
+        _lock.release()
+
+
+async def lookup(degree, skill_names, career_goal, prompt_version):
+    """Nearest cluster's row with a "similarity" key, or None if none is close enough"""
+    if not CAREER_CLUSTERS_ENABLED:
+        return None
+
+    try:
+        clusters = await asyncio.to_thread(get_clusters, prompt_version)
+        if not clusters:
+            return None
+        vector = (await asyncio.to_thread(embed_profiles, [profile_text(degree, skill_names, career_goal)]))[0]
+        row, similarity = clusters.nearest(vector)
+    except Exception as e:
+        print(f"Career cluster lookup error: {e}")
+        return None
+
+    if row is None or similarity < CAREER_CLUSTER_THRESHOLD:
+        metrics.increment("career_clusters.misses")
+        return None
+
+    metrics.increment("career_clusters.hits")
+    return {**row, "similarity": round(similarity, 4)}
+
+
+def load_profiles():
+    """Degree, goal and skill names of every user"""
+    users = fetch_all("SELECT user_id, degree, career_goal FROM users")
+    skills = fetch_all("""
+                       SELECT us.user_id, s.skill_name
+                       FROM user_skills us
+                                JOIN skills s ON us.skill_id = s.skill_id
+                       ORDER BY us.user_id, us.proficiency DESC
+                       """)
+
+    skills_by_user = defaultdict(list)
+    for row in skills or []:
+        skills_by_user[row['user_id']].append(row['skill_name'])
+
+    return [{
+        "degree": user['degree'] or 'Not specified',
+        "career_goal": user['career_goal'] or 'Exploring options',
+        "skills": skills_by_user[user['user_id']]
+    } for user in users or []]
+
+
+def store_clusters(clusters, prompt_version):
+    """Insert a new generation of clusters, then drop older ones"""
+    generation = time.time_ns()
+    for cluster in clusters:
+        execute_query("""
+                      INSERT INTO career_path_clusters
+                          (generation, prompt_version, degree, career_goal, skills, members, centroid, career_paths)
+                      VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                      """, (
+            generation, prompt_version, cluster['degree'][:255], cluster['career_goal'][:255],
+            json.dumps(cluster['skills']), cluster['members'],
+            json.dumps([round(float(x), 6) for x in cluster['centroid']]), json.dumps(cluster['career_paths'])
+        ))
+
+    execute_write(
+        "DELETE FROM career_path_clusters WHERE prompt_version = %s AND generation < %s",
+        (prompt_version, generation)
+    )
+    bump_catalog_version('career_clusters')
+
+
+async def precompute_clusters(k=CAREER_CLUSTERS, delay=CAREER_CLUSTER_BATCH_DELAY):
+    """Cluster all profiles, generate paths per cluster and store them; returns counts"""
+    # Imported here because career imports this module for lookups
+    from backend.career import CAREER_PROMPT_VERSION, build_career_prompt, generate_career_paths
+
+    profiles = load_profiles()
+    if not profiles:
+        return {"profiles": 0, "clusters": 0, "generated": 0, "failed": 0}
+
+    clusters = await asyncio.to_thread(cluster_profiles, profiles, k)
+
+    generated = []
+    failed = 0
+    for cluster in clusters:
+        degree, skills, career_goal = cluster['degree'], cluster['skills'], cluster['career_goal']
+        fingerprint = profile_fingerprint(degree, skills, career_goal, CAREER_PROMPT_VERSION)
+        try:
+            cluster['career_paths'] = await generate_career_paths(
+                build_career_prompt(degree, skills, career_goal), fingerprint
+            )
+            generated.append(cluster)
+            print(f"✅ {cluster['members']:>4} students: {degree} / {career_goal} / {', '.join(skills) or '-'}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {degree} / {career_goal}: {e}")
+
+        # Stay well under the Gemini rate limit
+        await asyncio.sleep(delay)
+
+    if generated:
+        store_clusters(generated, CAREER_PROMPT_VERSION)
+
+    return {"profiles": len(profiles), "clusters": len(clusters), "generated": len(generated), "failed": failed}
+
+
+if __name__ == "__main__":
+    print("🧭 Precomputing career paths per profile cluster...\n")
+    summary = asyncio.run(precompute_clusters())
+    print(f"\n{summary['profiles']} profiles in {summary['clusters']} clusters: "
+          f"{summary['generated']} generated, {summary['failed']} failed")
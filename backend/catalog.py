@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+import numpy as np
+from backend.database import fetch_all, get_catalog_version
+
+# How often (seconds) to check catalog_versions for scraper changes
+CATALOG_REFRESH_SECONDS = int(os.getenv('CATALOG_REFRESH_SECONDS', 30))
+
+# Deadline value for opportunities without one (never matches deadline_after)
+NO_DEADLINE = -1
+
+CATALOG_QUERY = """
+                SELECT o.*, GROUP_CONCAT(DISTINCT s.skill_name) as required_skills,
+                       GROUP_CONCAT(DISTINCT os.skill_id) as skill_id_list
+                FROM opportunities o
+                         LEFT JOIN opportunity_skills os ON o.opportunity_id = os.opportunity_id
+                         LEFT JOIN skills s ON os.skill_id = s.skill_id
+                WHERE o.is_active = TRUE \
+                """
+
+ACTIVE_IDS_QUERY = "SELECT opportunity_id FROM opportunities WHERE is_active = TRUE"
+
+
+def format_row(row):
+    """Split GROUP_CONCAT columns; returns (row, skill_ids)"""
+    skill_id_list = row.pop('skill_id_list', None)
+    skill_ids = [int(s) for s in skill_id_list.split(',')] if skill_id_list else []
+    row['required_skills'] = row['required_skills'].split(',') if row['required_skills'] else []
+    return row, skill_ids
+
+
+def order_key(deadline, opportunity_id):
+    """Sort key matching DEADLINE_ORDER (undated opportunities last)"""
+    if deadline is None:
+        return 1, 0, opportunity_id
+    if isinstance(deadline, str):
+        deadline = date.fromisoformat(deadline)
+    return 0, deadline.toordinal(), opportunity_id
+
+
+class CatalogSnapshot:
+    """Immutable columnar view of active opportunities.
+
+    Rows are kept in deadline order so a filter mask maps straight onto a
+    sorted result page. Locations and sources are interned to small ints.
+    """
+
+    def __init__(self, entries, version=0, watermark=None, skill_names=None):
+        # entries: {opportunity_id: (row, skill_ids)}
+        ordered = sorted(entries.values(), key=lambda e: order_key(e[0]['deadline'], e[0]['opportunity_id']))
+
+        self.version = version
+        self.watermark = watermark
+        self.skill_names = skill_names or {}
+        self.entries = {row['opportunity_id']: (row, skill_ids) for row, skill_ids in ordered}
+        self.rows = [row for row, _ in ordered]
+        self.keys = [order_key(row['deadline'], row['opportunity_id']) for row in self.rows]
+
+        n = len(self.rows)
+        self.ids = np.fromiter((row['opportunity_id'] for row in self.rows), dtype=np.int64, count=n)
+        self.deadline_days = np.fromiter(
+            (row['deadline'].toordinal() if row['deadline'] else NO_DEADLINE for row in self.rows),
+            dtype=np.int32, count=n
+        )
+
+        self.locations, self.location_ids = self._intern([row.get('location') for row in self.rows])
+        self.sources, self.source_ids = self._intern([row.get('source') for row in self.rows])
+        self.locations_lower = [name.lower() for name in self.locations]
+
+        # Inverted index: skill_id -> sorted row positions
+        postings = {}
+        for position, (_, skill_ids) in enumerate(ordered):
+            for skill_id in skill_ids:
+                postings.setdefault(skill_id, []).append(position)
+        self.postings = {skill_id: np.array(p, dtype=np.int32) for skill_id, p in postings.items()}
+
+        # Sparse row x skill matrix (COO): entry i links row skill_rows[i] to skill_indices[i]
+        self.skill_counts = np.fromiter((len(skill_ids) for _, skill_ids in ordered), dtype=np.int32, count=n)
+        self.skill_rows = np.repeat(np.arange(n, dtype=np.int32), self.skill_counts)
+        self.skill_indices = np.fromiter(
+            (skill_id for _, skill_ids in ordered for skill_id in skill_ids),
+            dtype=np.int32, count=int(self.skill_counts.sum())
+        )
+
+    @staticmethod
+    def _intern(values):
+        """Map strings to dense int ids (-1 for NULL)"""
+        vocabulary = {}
+        ids = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            ids[i] = -1 if value is None else vocabulary.setdefault(value, len(vocabulary))
+        return list(vocabulary), ids
+
+    def __len__(self):
+        return len(self.rows)
+
+    def filter(self, skill_ids=None, location=None, deadline_after=None, after=None):
+        """Return row positions matching the filters, in deadline order.
+
+        Semantics follow the SQL version: any of `skill_ids`, case-insensitive
+        substring match on location, deadline on or after `deadline_after`.
+        `after` is an order_key; only rows strictly after it are returned.
+        """
+        mask = np.ones(len(self.rows), dtype=bool)
+
+        if skill_ids:
+            hits = [self.postings[s] for s in skill_ids if s in self.postings]
+            if not hits:
+                return np.empty(0, dtype=np.int64)
+            skill_mask = np.zeros(len(self.rows), dtype=bool)
+            skill_mask[np.concatenate(hits)] = True
+            mask &= skill_mask
+
+        if location:
+            needle = location.lower()
+            matching = [i for i, name in enumerate(self.locations_lower) if needle in name]
+            mask &= np.isin(self.location_ids, matching)
+
+        if deadline_after:
+            mask &= self.deadline_days >= deadline_after.toordinal()
+
+        start = bisect_right(self.keys, after) if after is not None else 0
+        return np.flatnonzero(mask[start:]) + start
+
+    def score(self, user_skills):
+        """Score every row against a user's skills in one vectorized pass.
+
+        `user_skills` maps skill_id -> proficiency (1-5). Returns (coverage,
+        weighted) arrays: the share of required skills the user has, and the
+        same share weighted by proficiency / 5.
+        """
+        n = len(self.rows)
+        if not n or not user_skills:
+            return np.zeros(n), np.zeros(n)
+
+        size = max(int(self.skill_indices.max(initial=0)), max(user_skills)) + 1
+        weights = np.zeros(size)
+        weights[list(user_skills)] = [min(max(p or 0, 0), 5) / 5 for p in user_skills.values()]
+
+        entry_weights = weights[self.skill_indices]
+        matched = np.bincount(self.skill_rows, weights=entry_weights > 0, minlength=n)
+        weighted = np.bincount(self.skill_rows, weights=entry_weights, minlength=n)
+
+        required = np.maximum(self.skill_counts, 1)
+        return matched / required, weighted / required
+
+    def recommend(self, user_skills, top_k=10, today=None):
+        """Return the top_k (position, coverage, score) among open opportunities"""
+        coverage, weighted = self.score(user_skills)
+
+        today = (today or date.today()).toordinal()
+        open_mask = (self.deadline_days == NO_DEADLINE) | (self.deadline_days >= today)
+        candidates = np.flatnonzero(open_mask & (coverage > 0))
+
+        if len(candidates) > top_k:
+            top = np.argpartition(-weighted[candidates], top_k - 1)[:top_k]
+            candidates = candidates[top]
+
+        # Best score first; ties keep deadline order (positions are deadline sorted)
+        candidates = candidates[np.lexsort((candidates, -coverage[candidates], -weighted[candidates]))]
+        return [(int(i), float(coverage[i]), float(weighted[i])) for i in candidates]
+
+    def skill_gap(self, position, user_skills):
+        """Split a row's required skills into (matched, missing) skill names"""
+        _, skill_ids = self.entries[self.rows[position]['opportunity_id']]
+        matched = [self.skill_names.get(s, str(s)) for s in skill_ids if s in user_skills]
+        missing = [self.skill_names.get(s, str(s)) for s in skill_ids if s not in user_skills]
+        return matched, missing
+
+
+class OpportunityCatalog:
+    """Process-wide snapshot of active opportunities, refreshed on version bumps"""
+
+    def __init__(self, refresh_seconds=CATALOG_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """Return the current snapshot, checking for changes at most every refresh_seconds"""
+        if self._snapshot is None or time.monotonic() - self._checked_at >= self.refresh_seconds:
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self, force=False):
+        """Reload changed rows if the catalog version moved"""
+        # Only one thread refreshes; the others keep serving the old snapshot
+        if not self._lock.acquire(blocking=self._snapshot is None):
+            return self._snapshot
+
+        try:
+            self._checked_at = time.monotonic()
+            current = self._snapshot
+
+            try:
+                version = get_catalog_version('opportunities')
+                if current is not None and not force and version == current.version:
+                    return current
+
+                if current is None or force:
+                    entries = self._load()
+                else:
+                    entries = self._load_changes(current)
+
+                skill_names = {row['skill_id']: row['skill_name']
+                               for row in fetch_all("SELECT skill_id, skill_name FROM skills")}
+
+                watermarks = [row['last_updated'] for row, _ in entries.values() if row.get('last_updated')]
+                self._snapshot = CatalogSnapshot(
+                    entries, version, max(watermarks) if watermarks else None, skill_names
+                )
+                print(f"✅ Opportunity catalog at version {version}: {len(self._snapshot)} active")
+
+            except Exception as e:
+                if current is None:
+                    raise
+                print(f"Error refreshing opportunity catalog, serving stale snapshot: {e}")
+
+            return self._snapshot
+
+        finally:
+            self._lock.release()
+
+    def _load(self, where="", params=()):
+        rows = fetch_all(CATALOG_QUERY + where + " GROUP BY o.opportunity_id", params)
+        return {row['opportunity_id']: format_row(row) for row in rows}
+
+    def _load_changes(self, current):
+        """Apply rows touched since the last snapshot and drop deactivated ones"""
+        entries = dict(current.entries)
+
+        if current.watermark is not None:
+            entries.update(self._load(" AND o.last_updated >= %s", (current.watermark,)))
+
+        # Deactivation does not touch last_updated, so diff the active id set
+        active_ids = {row['opportunity_id'] for row in
+                      fetch_all(ACTIVE_IDS_QUERY)}
+        entries = {opp_id: entry for opp_id, entry in entries.items() if opp_id in active_ids}
+
+        missing = list(active_ids - entries.keys())
+        if missing:
+            placeholders = ','.join(['%s'] * len(missing))
+            entries.update(self._load(f" AND o.opportunity_id IN ({placeholders})", tuple(missing)))
+
+        return entries
+
+
+catalog = OpportunityCatalog()
@@ -0,0 +1,99 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Circuit breaker for calls to a flaky dependency. While closed, calls go
+# through and their outcomes fill a sliding window. Once enough of the
+# recent calls failed, the breaker opens and calls fail immediately instead
+# of waiting out a timeout. After a cool-down it lets a few probe calls
+# through (half-open): a successful probe closes it, a failed one reopens it.
+#
+# Meant to be used from the event loop, so there is no locking.
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """The breaker is rejecting calls"""
+
+
+class CircuitBreaker:
+    def __init__(self, window=20, failure_rate=0.5, min_calls=10, open_seconds=30, probes=1, clock=time.monotonic):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self.clock = clock
+        self.outcomes = deque(maxlen=window)  # True for success
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = 0
+        self.opened = 0  # times the breaker tripped
+
+    def allow(self):
+        """Whether a call may go ahead; a half-open breaker admits a few probes"""
+        if self.state == OPEN:
+            if self.clock() - self.opened_at < self.open_seconds:
+                return False
+            self.state = HALF_OPEN
+            self.probing = 0
+
+        if self.state == HALF_OPEN:
+            if self.probing >= self.probes:
+                return False
+            self.probing += 1
+
+        return True
+
+    def record_success(self):
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.outcomes.clear()
+            self.probing = 0
+        self.outcomes.append(True)
+
+    def record_failure(self):
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+
+        self.outcomes.append(False)
+        if len(self.outcomes) >= self.min_calls:
+            failures = self.outcomes.count(False)
+            if failures / len(self.outcomes) >= self.failure_rate:
+                self._open()
+
+    def release(self):
+        """Give back a probe slot for a call abandoned without an outcome"""
+        if self.state == HALF_OPEN and self.probing > 0:
+            self.probing -= 1
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.outcomes.clear()
+        self.probing = 0
+        self.opened += 1
+
+    @contextmanager
+    def call(self, failures):
+        """Guard one call; exceptions in `failures` count against the dependency
+
+        Other exceptions (e.g. a rejected bad request) say nothing about the
+        dependency's health, so they are neutral: they neither fail the call
+        nor reset the failure count. Raises CircuitOpen if the call is not
+        allowed.
+        """
+        if not self.allow():
+            raise CircuitOpen("Circuit open")
+        try:
+            yield
+        except failures:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Not the dependency's fault, or cancelled mid-call: no verdict
+            self.release()
+            raise
+        else:
+            self.record_success()
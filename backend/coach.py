@@ -1,25 +1,34 @@
-from fastapi import APIRouter, HTTPException, Header
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from backend.database import fetch_one, fetch_all, execute_query
-from backend.auth import verify_session
-from backend.faiss_utils import search_faiss
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
-import json
-import re
-from typing import List
+from backend.dependencies import get_current_profile
+from backend.rate_limit import rate_limit
+from backend.streaming import SSE_HEADERS, MarkerSplitter, format_sse
+from backend.json_stream import FieldStream, extract_json, load_model
+from backend import llm, coach_cache, conversations, jobs, learning_plan
+from typing import List, Optional
 
-load_dotenv()
+router = APIRouter(prefix="/coach", tags=["Upskill Coach"])
 
-# Configure Gemini API
-genai.configure(api_key=os.getenv('GEMINI_API'))
+# Marker line the streaming prompt puts between the answer and its suggestions
+SUGGESTIONS_MARKER = "SUGGESTIONS:"
 
-router = APIRouter(prefix="/coach", tags=["Upskill Coach"])
+# Opening fence of a streamed reply that came back as JSON anyway
+JSON_FENCE = "```json"
+
+FALLBACK_RESPONSE = "I'm here to help you with your career journey! I can assist with skill development, career planning, learning resources, and more. What would you like to know?"
+
+FALLBACK_SUGGESTIONS = [
+    "What skills should I learn for my career goal?",
+    "Can you create a learning roadmap for me?",
+    "What are the best resources for learning Python?"
+]
 
 
 class ChatMessage(BaseModel):
     message: str
+    conversation_id: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
@@ -27,50 +36,10 @@ class ChatResponse(BaseModel):
     suggestions: List[str] = []
 
 
-def get_user_context(user_id):
-    """Get user profile for context"""
-    user = fetch_one(
-        "SELECT name, degree, career_goal FROM users WHERE user_id = %s",
-        (user_id,)
-    )
-
-    if not user:
-        return None
-
-    # Get skills
-    skills = fetch_all("""
-                       SELECT s.skill_name, us.proficiency
-                       FROM user_skills us
-                                JOIN skills s ON us.skill_id = s.skill_id
-                       WHERE us.user_id = %s
-                       """, (user_id,))
-
-    user['skills'] = skills or []
-    return user
-
-
-@router.post("/chat")
-async def chat_with_coach(chat: ChatMessage, authorization: str = Header(None)):
-    """Chat with AI coach"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
-
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
-
-    try:
-        # Get user context
-        user_context = get_user_context(user_id)
-
-        if not user_context:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Build context for AI
-        skill_names = [s['skill_name'] for s in user_context['skills']]
-        context = f"""You are MentoraX Coach, an AI career guidance assistant for college students.
+def build_context(user_context):
+    """Coach persona and student profile shared by every chat prompt"""
+    skill_names = [s['skill_name'] for s in user_context['skills']]
+    return f"""You are MentoraX Coach, an AI career guidance assistant for college students.
 
 Current Student Context:
 - Name: {user_context['name']}
@@ -85,13 +54,58 @@ Your Role:
 - Recommend relevant courses and resources
 - Help with skill development planning
 - Answer career-related questions
+"""
+
+
+def load_conversation(conversation_id, user_id):
+    """(conversation, history) to answer with; (None, "") if the store fails
+
+    Like remember(), a storage failure must not lose the answer, so the
+    coach then answers without memory.
+    """
+    try:
+        conversation = conversations.get_or_start(conversation_id, user_id)
+        return conversation, conversation.history()
+    except Exception as e:
+        print(f"Conversation store error: {e}")
+        return None, ""
+
+
+def remember(conversation, question, answer):
+    """Record an exchange; a storage failure must not lose the answer"""
+    if conversation is None:
+        return
+    try:
+        conversations.record_exchange(conversation, question, answer)
+    except Exception as e:
+        print(f"Conversation store error: {e}")
+
 
+@router.post("/chat", dependencies=[Depends(rate_limit("coach_chat"))])
+async def chat_with_coach(chat: ChatMessage, user_context: dict = Depends(get_current_profile)):
+    """Chat with AI coach"""
+    conversation, history = load_conversation(chat.conversation_id, user_context['user_id'])
+    conversation_id = conversation.conversation_id if conversation else chat.conversation_id
+
+    try:
+
+        # Answer paraphrases of earlier questions from the semantic cache;
+        # follow-ups depend on the conversation, so only standalone questions
+        vector = None
+        if not history:
+            vector, cached = await coach_cache.lookup(chat.message, user_context)
+            if cached:
+                remember(conversation, chat.message, cached['response'])
+                return {"success": True, **cached, "cached": True, "conversation_id": conversation_id}
+
+        # Build context for AI
+        context = build_context(user_context) + history + f"""
 Student's Question: {chat.message}
 
 Instructions:
 - Give a helpful, conversational response (2-3 paragraphs max)
 - Be specific and actionable
-- Reference their profile when relevant
+- Reference their profile and the conversation so far when relevant
 - At the end, provide 2-3 follow-up suggestions as a JSON array
 
 Return your response in this format:
@@ -103,114 +117,211 @@ Return your response in this format:
 Return ONLY valid JSON, no other text."""
 
         # Call Gemini API
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(context)
-
-        response_text = response.text.strip()
+        response_text = (await llm.generate(context, endpoint="coach_chat")).strip()
 
-        # Extract JSON
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
         try:
-            result = json.loads(response_text)
-        except json.JSONDecodeError:
-            # Try to find JSON in text
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                result = json.loads(json_match.group(0))
-            else:
-                # Fallback response
-                result = {
-                    "response": response_text,
-                    "suggestions": [
-                        "Tell me more about your career goals",
-                        "What skills would you like to develop?",
-                        "Would you like a personalized learning plan?"
-                    ]
-                }
+            result = load_model(response_text, ChatResponse)
+            parsed = True
+        except ValueError:
+            parsed = False
+            # Not the JSON we asked for: show the text as it is
+            llm.record_fallback("coach_chat", "json")
+            result = ChatResponse(response=response_text, suggestions=[
+                "Tell me more about your career goals",
+                "What skills would you like to develop?",
+                "Would you like a personalized learning plan?"
+            ])
+
+        answer = result.response
+        suggestions = result.suggestions
+        # Only well-formed answers are reused for paraphrased questions
+        if parsed:
+            coach_cache.store(vector, user_context, answer, suggestions)
+        remember(conversation, chat.message, answer)
 
         return {
             "success": True,
-            "response": result.get('response', response_text),
-            "suggestions": result.get('suggestions', [])
+            "response": answer,
+            "suggestions": suggestions,
+            "cached": False,
+            "conversation_id": conversation_id
         }
 
     except Exception as e:
         print(f"Coach chat error: {e}")
         # Fallback response
+        llm.record_fallback("coach_chat", "error")
         return {
             "success": True,
-            "response": "I'm here to help you with your career journey! I can assist with skill development, career planning, learning resources, and more. What would you like to know?",
-            "suggestions": [
-                "What skills should I learn for my career goal?",
-                "Can you create a learning roadmap for me?",
-                "What are the best resources for learning Python?"
-            ]
+            "response": FALLBACK_RESPONSE,
+            "suggestions": FALLBACK_SUGGESTIONS,
+            "conversation_id": conversation_id
         }
 
 
-@router.get("/plan")
-async def get_learning_plan(authorization: str = Header(None)):
-    """Generate a personalized learning plan"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
+def parse_suggestions(tail):
+    """Parse the JSON array that follows the suggestions marker"""
+    suggestions = extract_json(tail, "[") if tail else None
+    if not isinstance(suggestions, list):
+        return []
+    return [str(s) for s in suggestions if s][:3]
+
+
+class StreamedReply:
+    """Answer text and suggestions from a streamed reply
+
+    The streaming prompt asks for plain text and a suggestions marker line,
+    but models sometimes answer in the JSON format of /chat anyway. A reply
+    opening with "{" or a ```json fence has its "response" field forwarded
+    as it streams in and its suggestions taken from the finished object;
+    anything else, including text opening with another code block, goes
+    through the marker splitter.
+    """
+
+    def __init__(self):
+        self.head = ""  # start of the reply, until the format is known
+        self.splitter = None
+        self.reply = None
+
+    def _choose(self, final=False):
+        """Pick the format from the start of the reply; False while undecided"""
+        start = self.head.lstrip()
+        if not final and (not start or JSON_FENCE.startswith(start.lower())):
+            return False
+        if start.startswith("{") or start.lower().startswith(JSON_FENCE):
+            self.reply = FieldStream("response")
+        else:
+            self.splitter = MarkerSplitter(SUGGESTIONS_MARKER)
+        return True
+
+    def _forward(self, chunk):
+        if self.reply is not None:
+            return self.reply.feed(chunk)
+        return self.splitter.feed(chunk)
+
+    def feed(self, chunk):
+        """Add a chunk and return the answer text that is safe to forward now"""
+        if self.splitter is None and self.reply is None:
+            self.head += chunk
+            if not self._choose():
+                return ""
+            chunk, self.head = self.head, ""
+        return self._forward(chunk)
+
+    def finish(self):
+        """Return (remaining text, suggestions) at the end of the stream"""
+        text = ""
+        if self.splitter is None and self.reply is None:
+            self._choose(final=True)
+            text = self._forward(self.head)
+
+        if self.reply is not None:
+            if not self.reply.started:
+                # JSON was announced but never delivered: treat it as text
+                self.splitter = MarkerSplitter(SUGGESTIONS_MARKER)
+                text = self.splitter.feed(self.reply.extractor.text)
+            else:
+                try:
+                    suggestions = ChatResponse.model_validate(self.reply.extractor.value).suggestions
+                except ValueError:
+                    suggestions = []
+                return text, [s for s in suggestions if s][:3]
 
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
+        rest, tail = self.splitter.finish()
+        return text + rest, parse_suggestions(tail)
 
-    try:
-        user_context = get_user_context(user_id)
 
-        if not user_context:
-            raise HTTPException(status_code=404, detail="User not found")
+@router.post("/chat/stream", dependencies=[Depends(rate_limit("coach_chat"))])
+async def stream_chat_with_coach(chat: ChatMessage, user_context: dict = Depends(get_current_profile)):
+    """Chat with AI coach, streaming the answer as server-sent events
 
-        skill_names = [s['skill_name'] for s in user_context['skills']]
+    Emits `token` events with text as the model produces it, then one
+    `suggestions` event and a final `done` event carrying the conversation id.
+    """
+    async def events():
+        conversation, history = load_conversation(chat.conversation_id, user_context['user_id'])
+        conversation_id = conversation.conversation_id if conversation else chat.conversation_id
+        answer = []
 
-        # Find skill gaps and resources
-        career_goal = user_context.get('career_goal') or user_context.get('degree') or 'software development'
+        try:
 
-        # Get all skills to find missing ones
-        all_skills = fetch_all("SELECT skill_id, skill_name FROM skills")
-        user_skill_ids = [s['skill_id'] for s in user_context['skills']]
-        missing_skills = [s for s in all_skills if s['skill_id'] not in user_skill_ids]
+            vector = None
+            if not history:
+                vector, cached = await coach_cache.lookup(chat.message, user_context)
+                if cached:
+                    remember(conversation, chat.message, cached['response'])
+                    yield format_sse("token", {"text": cached['response']})
+                    yield format_sse("suggestions", {"suggestions": cached['suggestions']})
+                    yield format_sse("done", {"success": True, "conversation_id": conversation_id, "cached": True})
+                    return
+
+            context = build_context(user_context) + history + f"""
+Student's Question: {chat.message}
 
-        # Use FAISS to find relevant skills
-        relevant_skills = search_faiss(career_goal, index_type='skills', top_k=5)
+Instructions:
+- Give a helpful, conversational response (2-3 paragraphs max)
+- Be specific and actionable
+- Reference their profile and the conversation so far when relevant
+- Write the response as plain text, not JSON or markdown code blocks
+- Then, on a new line, write {SUGGESTIONS_MARKER} followed by 2-3 follow-up questions as a JSON array
+
+Example ending:
+{SUGGESTIONS_MARKER} ["Suggestion 1", "Suggestion 2", "Suggestion 3"]"""
+
+            reply = StreamedReply()
+            async for chunk in llm.stream(context, endpoint="coach_stream"):
+                text = reply.feed(chunk)
+                if text:
+                    answer.append(text)
+                    yield format_sse("token", {"text": text})
+
+            text, suggestions = reply.finish()
+            if text:
+                answer.append(text)
+                yield format_sse("token", {"text": text})
+
+            text = "".join(answer).strip()
+            if suggestions and text:
+                coach_cache.store(vector, user_context, text, suggestions)
+            if not suggestions:
+                llm.record_fallback("coach_stream", "suggestions")
+                suggestions = FALLBACK_SUGGESTIONS
+            remember(conversation, chat.message, text)
+
+        except Exception as e:
+            print(f"Coach stream error: {e}")
+            if not answer:
+                llm.record_fallback("coach_stream", "error")
+                yield format_sse("token", {"text": FALLBACK_RESPONSE})
+            suggestions = FALLBACK_SUGGESTIONS
+
+        yield format_sse("suggestions", {"suggestions": suggestions})
+        yield format_sse("done", {"success": True, "conversation_id": conversation_id, "cached": False})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
-        # Get relevant resources
-        resources = search_faiss(career_goal, index_type='resources', top_k=5)
 
-        return {
-            "success": True,
-            "plan": {
-                "current_skills": skill_names,
-                "recommended_skills": [s['skill_name'] for s in relevant_skills[:3]],
-                "learning_resources": [
-                    {
-                        "title": r['title'],
-                        "description": r['description'],
-                        "url": r['url']
-                    } for r in resources[:3]
-                ],
-                "next_steps": [
-                    "Review the recommended resources and pick one to start",
-                    "Practice by building small projects",
-                    "Join online communities related to your field",
-                    "Apply for internships to gain practical experience"
-                ]
-            }
-        }
+@router.get("/plan")
+async def get_learning_plan(user_context: dict = Depends(get_current_profile)):
+    """Generate a personalized learning plan"""
+    try:
+        return {"success": True, "plan": await learning_plan.get_learning_plan(user_context)}
 
     except Exception as e:
         print(f"Learning plan error: {e}")
         raise HTTPException(status_code=500, detail=f"Error generating learning plan: {str(e)}")
 
 
+@router.post("/plan/async")
+async def submit_learning_plan(user_context: dict = Depends(get_current_profile)):
+    """Queue learning plan generation; poll /jobs/{job_id} or follow /jobs/{job_id}/events"""
+    async def run():
+        return {"success": True, "plan": await learning_plan.get_learning_plan(user_context)}
+
+    key = await asyncio.to_thread(learning_plan.plan_key, user_context)
+    return jobs.submit_or_503("learning_plan", key, run, user_context['user_id'])
+
+
 @router.get("/suggestions")
 async def get_quick_suggestions():
     """Get quick suggestion prompts"""
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import threading
+from backend.faiss_utils import get_model
+from backend.semantic_cache import SemanticCache
+from backend.career_cache import normalize
+from backend.degree_map import normalize_degree
+from backend import metrics
+
+# Semantic answer cache for /coach/chat. Paraphrased questions from students
+# with a similar profile (same degree, goal and top skills) reuse an earlier
+# answer instead of calling Gemini again.
+
+COACH_CACHE_ENABLED = os.getenv('COACH_CACHE_ENABLED', 'true').lower() == 'true'
+COACH_CACHE_SIZE = int(os.getenv('COACH_CACHE_SIZE', 1000))
+COACH_CACHE_THRESHOLD = float(os.getenv('COACH_CACHE_THRESHOLD', 0.9))  # cosine similarity
+COACH_CACHE_TTL = int(os.getenv('COACH_CACHE_TTL', 24 * 3600))  # seconds
+
+# Answers address the student by name; store them with placeholders instead
+NAME_PLACEHOLDER = "{student_name}"
+FIRST_NAME_PLACEHOLDER = "{student_first_name}"
+
+_cache = None
+_cache_lock = threading.Lock()
+
+metrics.register_gauge("coach_cache.hits", lambda: _cache.hits if _cache else 0)
+metrics.register_gauge("coach_cache.misses", lambda: _cache.misses if _cache else 0)
+metrics.register_gauge("coach_cache.hit_ratio", lambda: _cache.hit_ratio() if _cache else 0.0)
+metrics.register_gauge("coach_cache.size", lambda: len(_cache) if _cache else 0)
+
+
+def get_cache():
+    """Create the cache on first use, sized to the embedding model"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache(
+                get_model().get_sentence_embedding_dimension(),
+                max_size=COACH_CACHE_SIZE,
+                threshold=COACH_CACHE_THRESHOLD,
+                ttl=COACH_CACHE_TTL
+            )
+        return _cache
+
+
+def profile_bucket(profile):
+    """Profile traits that change what a good answer looks like"""
+    # Strongest skills first, ties by name, so equal profiles share a bucket
+    # whatever order the database returned them in
+    ranked = sorted(profile['skills'], key=lambda s: (-(s.get('proficiency') or 0), normalize(s['skill_name'])))
+    top_skills = sorted(normalize(s['skill_name']) for s in ranked[:3])
+    return "|".join([
+        normalize_degree(profile.get('degree')),
+        normalize(profile.get('career_goal')),
+        ",".join(top_skills)
+    ])
+
+
+def embed(question):
+    return get_model().encode([normalize(question)])[0]
+
+
+async def lookup(question, profile):
+    """Return (embedding, cached answer or None) for a question
+
+    The embedding is handed back so a miss can be stored without encoding
+    the question twice.
+    """
+    if not COACH_CACHE_ENABLED:
+        return None, None
+
+    try:
+        vector = await asyncio.to_thread(embed, question)
+        cached = get_cache().get(vector, profile_bucket(profile))
+    except Exception as e:
+        print(f"Coach cache lookup error: {e}")
+        return None, None
+
+    if cached is None:
+        return vector, None
+
+    name = profile.get('name') or ''
+    first_name = name.split()[0] if name.split() else ''
+    response = cached['response'].replace(NAME_PLACEHOLDER, name).replace(FIRST_NAME_PLACEHOLDER, first_name)
+    return vector, {
+        "response": response,
+        "suggestions": list(cached['suggestions'])
+    }
+
+
+def store(vector, profile, response, suggestions):
+    """Cache an answer for the question embedded by lookup()"""
+    if vector is None or not response:
+        return
+
+    name = (profile.get('name') or '').strip()
+    if len(name) > 1:
+        response = response.replace(name, NAME_PLACEHOLDER)
+        first_name = name.split()[0]
+        if len(first_name) > 1 and first_name != name:
+            response = response.replace(first_name, FIRST_NAME_PLACEHOLDER)
+
+    get_cache().put(vector, profile_bucket(profile), {
+        "response": response,
+        "suggestions": list(suggestions)
+    })
@@ -0,0 +1,208 @@
+import asyncio
+import os
+import threading
+import uuid
+from collections import deque
+from cachetools import LRUCache
+from backend.database import fetch_one, fetch_all, execute_query, execute_write
+from backend import llm, metrics
+from backend.llm import CHARS_PER_TOKEN, estimate_tokens
+
+# Coach conversation memory. Turns are stored in coach_messages; each
+# conversation row keeps a rolling summary of the turns that no longer fit
+# in the prompt. Hot conversations stay in an in-process LRU.
+#
+# The prompt always gets the summary plus the newest turns that fit in
+# CONVERSATION_HISTORY_TOKENS, so its size stays flat however long the chat.
+# Turns that fall out of the window are folded into the summary in the
+# background after the reply has been sent. Each fold shrinks the window to
+# half the budget, so summarizing costs one extra LLM call every few turns.
+
+CONVERSATION_HISTORY_TOKENS = int(os.getenv('CONVERSATION_HISTORY_TOKENS', 1000))
+CONVERSATION_SUMMARY_TOKENS = int(os.getenv('CONVERSATION_SUMMARY_TOKENS', 250))
+CONVERSATION_CACHE_SIZE = int(os.getenv('CONVERSATION_CACHE_SIZE', 1000))
+CONVERSATION_MAX_TURNS = 50  # unsummarized turns kept in memory if summaries keep failing
+
+# Newest unsummarized turns of a conversation
+MESSAGES_QUERY = """
+                 SELECT message_id, role, content
+                 FROM coach_messages
+                 WHERE conversation_id = %s AND message_id > %s
+                 ORDER BY message_id DESC
+                 LIMIT %s \
+                 """
+
+_cache = LRUCache(maxsize=CONVERSATION_CACHE_SIZE)
+_cache_lock = threading.Lock()
+_summary_tasks = set()
+
+metrics.register_gauge(
+    "conversations.hit_ratio",
+    lambda: metrics.hit_ratio("conversations.hits", "conversations.misses")
+)
+metrics.register_gauge("conversations.cached", lambda: len(_cache))
+
+
+def truncate_to_tokens(text, budget):
+    """Cut text to roughly budget tokens on a word boundary"""
+    limit = budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def format_turn(turn):
+    speaker = "Student" if turn['role'] == "user" else "Coach"
+    return f"{speaker}: {turn['content']}"
+
+
+def pack_turns(turns, budget):
+    """Split turns into (dropped, kept): kept is the newest run that fits the budget"""
+    used = 0
+    start = len(turns)
+    while start > 0:
+        cost = estimate_tokens(format_turn(turns[start - 1]))
+        if used + cost > budget:
+            break
+        used += cost
+        start -= 1
+    return turns[:start], turns[start:]
+
+
+class Conversation:
+    def __init__(self, conversation_id, user_id, summary="", summary_upto=0, turns=()):
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.summary = summary or ""
+        self.summary_upto = summary_upto or 0  # last message_id folded into the summary
+        self.turns = deque(turns, maxlen=CONVERSATION_MAX_TURNS)
+        self.summarizing = False
+
+    def history(self, budget=None):
+        """Summary and recent turns to put in the prompt; empty for a new chat"""
+        dropped, kept = pack_turns(list(self.turns), budget or CONVERSATION_HISTORY_TOKENS)
+        if not kept and not self.summary:
+            return ""
+
+        lines = ["Conversation so far:"]
+        if self.summary:
+            lines.append(f"(Summary of earlier messages) {self.summary}")
+        lines.extend(format_turn(turn) for turn in kept)
+        return "\n" + "\n".join(lines) + "\n"
+
+    def overflow(self, budget=None):
+        """Turns that no longer fit in the window and still need summarizing"""
+        return pack_turns(list(self.turns), budget or CONVERSATION_HISTORY_TOKENS)[0]
+
+
+def _load(conversation_id, user_id):
+    row = fetch_one(
+        "SELECT summary, summary_upto FROM coach_conversations WHERE conversation_id = %s AND user_id = %s",
+        (conversation_id, user_id)
+    )
+    if not row:
+        return None
+
+    messages = fetch_all(MESSAGES_QUERY, (conversation_id, row['summary_upto'], CONVERSATION_MAX_TURNS))
+
+    return Conversation(conversation_id, user_id, row['summary'], row['summary_upto'], reversed(messages or []))
+
+
+def get_conversation(conversation_id, user_id):
+    """Conversation owned by the user, or None"""
+    with _cache_lock:
+        conversation = _cache.get(conversation_id)
+
+    if conversation is not None:
+        metrics.increment("conversations.hits")
+        return conversation if conversation.user_id == user_id else None
+
+    metrics.increment("conversations.misses")
+    conversation = _load(conversation_id, user_id)
+    if conversation is not None:
+        with _cache_lock:
+            _cache[conversation_id] = conversation
+    return conversation
+
+
+def start_conversation(user_id):
+    conversation = Conversation(uuid.uuid4().hex, user_id)
+    execute_query(
+        "INSERT INTO coach_conversations (conversation_id, user_id) VALUES (%s, %s)",
+        (conversation.conversation_id, user_id)
+    )
+    with _cache_lock:
+        _cache[conversation.conversation_id] = conversation
+    return conversation
+
+
+def get_or_start(conversation_id, user_id):
+    """Resume a conversation the user owns, or start a new one"""
+    if conversation_id:
+        conversation = get_conversation(conversation_id, user_id)
+        if conversation is not None:
+            return conversation
+    return start_conversation(user_id)
+
+
+def record_exchange(conversation, question, answer):
+    """Persist a question and answer, then summarize overflow in the background"""
+    # One row per INSERT: ids of a multi-row INSERT are only consecutive
+    # when auto_increment_increment is 1
+    ids = [execute_query(
+        "INSERT INTO coach_messages (conversation_id, role, content) VALUES (%s, %s, %s)",
+        (conversation.conversation_id, role, content)
+    ) for role, content in (("user", question), ("coach", answer))]
+    execute_write(
+        "UPDATE coach_conversations SET updated_at = NOW() WHERE conversation_id = %s",
+        (conversation.conversation_id,)
+    )
+
+    conversation.turns.append({"message_id": ids[0], "role": "user", "content": question})
+    conversation.turns.append({"message_id": ids[1], "role": "coach", "content": answer})
+
+    if conversation.overflow() and not conversation.summarizing:
+        conversation.summarizing = True
+        task = asyncio.get_running_loop().create_task(summarize(conversation))
+        _summary_tasks.add(task)
+        task.add_done_callback(_summary_tasks.discard)
+
+
+async def summarize(conversation, budget=None):
+    """Fold turns that left the window into the rolling summary"""
+    try:
+        overflow = conversation.overflow((budget or CONVERSATION_HISTORY_TOKENS) // 2)
+        if not overflow:
+            return
+
+        prompt = f"""You maintain a running summary of a career coaching chat between a student and their coach.
+
+Current summary:
+{conversation.summary or '(none yet)'}
+
+New messages to fold in:
+{chr(10).join(format_turn(turn) for turn in overflow)}
+
+Write the updated summary in under {CONVERSATION_SUMMARY_TOKENS * 3 // 4} words. Keep the student's goals,
+decisions, constraints and any advice they said they will follow. Return only the summary text."""
+
+        summary = await llm.generate(prompt, endpoint="conversation_summary")
+        summary = truncate_to_tokens(summary.strip(), CONVERSATION_SUMMARY_TOKENS)
+        summary_upto = overflow[-1]['message_id']
+
+        execute_write(
+            "UPDATE coach_conversations SET summary = %s, summary_upto = %s WHERE conversation_id = %s",
+            (summary, summary_upto, conversation.conversation_id)
+        )
+
+        conversation.summary = summary
+        conversation.summary_upto = summary_upto
+        while conversation.turns and conversation.turns[0]['message_id'] <= summary_upto:
+            conversation.turns.popleft()
+
+    except Exception as e:
+        # The window still bounds the prompt; the next exchange retries
+        print(f"Conversation summary error: {e}")
+
+    finally:
+        conversation.summarizing = False
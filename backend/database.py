@@ -43,6 +43,21 @@ def execute_query(query, params=None, fetch=False):
         cursor.close()
         conn.close()
 
+def execute_write(query, params=None):
+    """Execute an UPDATE/DELETE and return the number of affected rows"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params or ())
+        conn.commit()
+        return cursor.rowcount
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+        conn.close()
+
 def fetch_one(query, params=None):
     """Fetch a single row"""
     conn = get_connection()
@@ -59,6 +74,34 @@ def fetch_all(query, params=None):
     """Fetch all rows"""
     return execute_query(query, params, fetch=True)
 
+def get_catalog_version(name):
+    """Get the change version of a cached catalog (e.g. 'opportunities')"""
+    row = fetch_one("SELECT version FROM catalog_versions WHERE name = %s", (name,))
+    return row['version'] if row else 0
+
+def bump_catalog_version(name):
+    """Signal in-process caches that a catalog table changed"""
+    execute_query(
+        "INSERT INTO catalog_versions (name, version) VALUES (%s, 1) "
+        "ON DUPLICATE KEY UPDATE version = version + 1",
+        (name,)
+    )
+
+EXPIRED_DELETE_QUERY = "DELETE FROM {table} WHERE expires_at < NOW() ORDER BY expires_at LIMIT %s"
+
+def delete_expired(table, batch_size):
+    """Delete rows past expires_at in LIMIT-sized batches; returns rows removed
+
+    Small batches keep each DELETE's locks short. The table needs an index
+    on expires_at.
+    """
+    removed = 0
+    while True:
+        deleted = execute_write(EXPIRED_DELETE_QUERY.format(table=table), (batch_size,))
+        removed += deleted
+        if deleted < batch_size:
+            return removed
+
 # Test connection on import
 if __name__ == "__main__":
     try:
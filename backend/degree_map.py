@@ -0,0 +1,194 @@
+import asyncio
+import json
+import os
+import re
+import threading
+from cachetools import LRUCache
+from backend.database import fetch_one, fetch_all, execute_query
+from backend.json_stream import extract_json
+from backend import llm, metrics
+
+# Degree -> career options, persisted in degree_career_map and held in an
+# in-process LRU. Degree strings are normalized first so "B.Tech CSE" and
+# "Bachelor of Technology in Computer Science and Engineering" share a row.
+# The LLM is only called on a miss; the table can also be filled offline:
+#
+#   python -m backend.degree_map
+
+DEGREE_MAP_PROMPT_VERSION = "degree-map-v1"
+DEGREE_MAP_CACHE_SIZE = int(os.getenv('DEGREE_MAP_CACHE_SIZE', 4096))
+DEGREE_MAP_BATCH_DELAY = float(os.getenv('DEGREE_MAP_BATCH_DELAY', 1.0))  # seconds between batch LLM calls
+
+CAREER_OPTIONS_QUERY = "SELECT career_options FROM degree_career_map WHERE degree_key = %s AND prompt_version = %s"
+
+# Longest phrases first so "bachelor of technology" wins over "technology"
+DEGREE_ALIASES = [
+    ("bachelor of computer applications", "bca"),
+    ("master of computer applications", "mca"),
+    ("bachelor of business administration", "bba"),
+    ("master of business administration", "mba"),
+    ("bachelor of technology", "btech"),
+    ("master of technology", "mtech"),
+    ("bachelor of engineering", "be"),
+    ("master of engineering", "me"),
+    ("bachelor of science", "bsc"),
+    ("master of science", "msc"),
+    ("bachelor of arts", "ba"),
+    ("master of arts", "ma"),
+    ("b tech", "btech"),
+    ("m tech", "mtech"),
+    ("b sc", "bsc"),
+    ("m sc", "msc"),
+    ("b e", "be"),
+    ("m e", "me"),
+]
+
+SUBJECT_ALIASES = {
+    "cse": "computer science and engineering",
+    "cs": "computer science",
+    "it": "information technology",
+    "ece": "electronics and communication engineering",
+    "eee": "electrical and electronics engineering",
+    "ee": "electrical engineering",
+    "me": "mechanical engineering",
+    "ai": "artificial intelligence",
+    "ml": "machine learning",
+    "ds": "data science",
+}
+
+FILLER_WORDS = {"in", "degree", "with", "specialization", "specialisation", "major", "hons", "honours", "honors"}
+
+_cache = LRUCache(maxsize=DEGREE_MAP_CACHE_SIZE)
+_cache_lock = threading.Lock()
+
+metrics.register_gauge(
+    "degree_map.hit_ratio",
+    lambda: metrics.hit_ratio("degree_map.hits", "degree_map.misses")
+)
+
+
+def normalize_degree(degree):
+    """Canonical key for a free-text degree name"""
+    text = (degree or "").lower().replace("&", " and ")
+    text = " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+    for phrase, alias in DEGREE_ALIASES:
+        text = re.sub(rf"\b{phrase}\b", alias, text)
+
+    words = [w for w in text.split() if w not in FILLER_WORDS]
+
+    # Expand subject abbreviations, but keep the leading degree type as is
+    # ("me" is a degree before a subject and mechanical engineering after one)
+    if len(words) > 1:
+        words = words[:1] + [SUBJECT_ALIASES.get(w, w) for w in words[1:]]
+    elif words and words[0] in SUBJECT_ALIASES:
+        words = [SUBJECT_ALIASES[words[0]]]
+
+    return " ".join(words)[:255]
+
+
+def build_prompt(degree):
+    return f"""List 5 specific job roles/career paths for someone with a {degree} degree.
+
+Return ONLY a valid JSON array of strings:
+["Career 1", "Career 2", "Career 3", "Career 4", "Career 5"]
+
+Be specific with job titles (e.g., "Machine Learning Engineer" not just "Engineer")."""
+
+
+def parse_career_options(response_text):
+    """Extract the JSON array of job titles from a completion"""
+    career_options = extract_json(response_text, "[")
+
+    if not career_options:
+        raise ValueError("Invalid career options format")
+
+    return [str(option) for option in career_options]
+
+
+def load_career_options(degree_key):
+    """Read stored career options for a normalized degree or None"""
+    row = fetch_one(CAREER_OPTIONS_QUERY, (degree_key, DEGREE_MAP_PROMPT_VERSION))
+    return json.loads(row['career_options']) if row else None
+
+
+def store_career_options(degree_key, degree, career_options):
+    """Persist career options for a normalized degree"""
+    execute_query(
+        "REPLACE INTO degree_career_map (degree_key, degree, career_options, prompt_version) VALUES (%s, %s, %s, %s)",
+        (degree_key, degree[:255], json.dumps(career_options), DEGREE_MAP_PROMPT_VERSION)
+    )
+
+
+async def generate_career_options(degree_key, degree):
+    """Ask Gemini for career options and persist them"""
+    career_options = parse_career_options(await llm.generate(build_prompt(degree), endpoint="degree_map"))
+    store_career_options(degree_key, degree, career_options)
+    return career_options
+
+
+async def get_career_options(degree):
+    """Career options for a degree: memory, then table, then the LLM"""
+    degree_key = normalize_degree(degree)
+    if not degree_key:
+        raise ValueError("Degree is required")
+
+    with _cache_lock:
+        career_options = _cache.get(degree_key)
+
+    if career_options is not None:
+        metrics.increment("degree_map.hits")
+        return career_options
+
+    career_options = load_career_options(degree_key)
+
+    if career_options is None:
+        metrics.increment("degree_map.misses")
+        career_options = await llm.coalesce(
+            ("degree_map", degree_key),
+            lambda: generate_career_options(degree_key, degree)
+        )
+    else:
+        metrics.increment("degree_map.hits")
+
+    with _cache_lock:
+        _cache[degree_key] = career_options
+
+    return career_options
+
+
+async def precompute_user_degrees(delay=DEGREE_MAP_BATCH_DELAY):
+    """Fill the table for every distinct degree in users; returns counts"""
+    rows = fetch_all("SELECT DISTINCT degree FROM users WHERE degree IS NOT NULL AND degree != ''")
+
+    degrees = {}
+    for row in rows or []:
+        degree_key = normalize_degree(row['degree'])
+        if degree_key:
+            degrees.setdefault(degree_key, row['degree'])
+
+    generated = skipped = failed = 0
+    for degree_key, degree in degrees.items():
+        if load_career_options(degree_key) is not None:
+            skipped += 1
+            continue
+
+        try:
+            await generate_career_options(degree_key, degree)
+            generated += 1
+            print(f"✅ {degree_key}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {degree_key}: {e}")
+
+        # Stay well under the Gemini rate limit
+        await asyncio.sleep(delay)
+
+    return {"degrees": len(degrees), "generated": generated, "skipped": skipped, "failed": failed}
+
+
+if __name__ == "__main__":
+    print("🎓 Precomputing degree to career map...\n")
+    summary = asyncio.run(precompute_user_degrees())
+    print(f"\n{summary['degrees']} degrees: {summary['generated']} generated, "
+          f"{summary['skipped']} already stored, {summary['failed']} failed")
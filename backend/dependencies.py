@@ -0,0 +1,93 @@
+from fastapi import Depends, Header, HTTPException
+from cachetools import TTLCache
+from backend.database import fetch_one, fetch_all
+from backend.auth import verify_session
+from backend import metrics
+import os
+import threading
+
+# Shared FastAPI dependencies. FastAPI resolves each dependency once per
+# request, so routes that need both the user id and the profile pay for a
+# single session check and a single (cached) profile load.
+
+PROFILE_CACHE_TTL = int(os.getenv('PROFILE_CACHE_TTL', 300))
+PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', 10000))
+
+_profile_cache = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL)
+_profile_cache_lock = threading.Lock()
+
+metrics.register_gauge(
+    "profile_cache.hit_ratio",
+    lambda: metrics.hit_ratio("profile_cache.hits", "profile_cache.misses")
+)
+
+
+def get_current_user_id(authorization: str = Header(None)) -> int:
+    """Resolve the Bearer token to a user_id or fail with 401"""
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    token = authorization.replace("Bearer ", "")
+    user_id = verify_session(token)
+
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid session")
+
+    return user_id
+
+
+def fetch_profile(user_id):
+    """Load the canonical user profile with skills from the database"""
+    user = fetch_one(
+        "SELECT user_id, name, email, degree, career_goal, resume_url FROM users WHERE user_id = %s",
+        (user_id,)
+    )
+
+    if not user:
+        return None
+
+    # Get user skills with proficiency
+    skills = fetch_all("""
+                       SELECT s.skill_id, s.skill_name, us.proficiency
+                       FROM user_skills us
+                                JOIN skills s ON us.skill_id = s.skill_id
+                       WHERE us.user_id = %s
+                       ORDER BY us.proficiency DESC
+                       """, (user_id,))
+
+    user['skills'] = skills or []
+    return user
+
+
+def load_profile(user_id):
+    """Read-through cached profile; returns a copy callers may modify"""
+    with _profile_cache_lock:
+        cached = _profile_cache.get(user_id)
+
+    if cached is None:
+        metrics.increment("profile_cache.misses")
+        cached = fetch_profile(user_id)
+        if cached is None:
+            return None
+        with _profile_cache_lock:
+            _profile_cache[user_id] = cached
+    else:
+        metrics.increment("profile_cache.hits")
+
+    return {**cached, 'skills': [dict(s) for s in cached['skills']]}
+
+
+def invalidate_profile(user_id):
+    """Drop a cached profile after the user or their skills change"""
+    with _profile_cache_lock:
+        _profile_cache.pop(user_id, None)
+
+
+def get_current_profile(user_id: int = Depends(get_current_user_id)) -> dict:
+    """Profile of the authenticated user or 404"""
+    profile = load_profile(user_id)
+
+    if not profile:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return profile
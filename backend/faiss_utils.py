@@ -242,6 +242,50 @@ def search_faiss(query, index_type='skills', top_k=5):
         return []
 
 
+_loaded_indexes = {}  # index_type -> (mtime, index, item ids, item map)
+
+
+def load_index(index_type):
+    """Index and mapping for an index type, kept in memory until the file changes"""
+    index_path = f'data/faiss_indexes/{index_type}.index'
+    map_path = f'data/faiss_indexes/{index_type}_map.json'
+
+    if not os.path.exists(index_path):
+        return None
+
+    mtime = os.path.getmtime(index_path)
+    loaded = _loaded_indexes.get(index_type)
+    if loaded is None or loaded[0] != mtime:
+        with open(map_path, 'r') as f:
+            item_map = json.load(f)
+        loaded = (mtime, faiss.read_index(index_path), list(item_map.keys()), item_map)
+        _loaded_indexes[index_type] = loaded
+    return loaded[1:]
+
+
+def search_faiss_batch(queries, index_type='skills', top_k=5):
+    """Search several queries with one embedding pass and one index search
+
+    Returns one result list per query, shaped like search_faiss results.
+    """
+    if not queries:
+        return []
+
+    loaded = load_index(index_type)
+    if loaded is None:
+        return [[] for _ in queries]
+    index, item_ids, item_map = loaded
+
+    embeddings = np.array(get_model().encode(list(queries))).astype('float32')
+    distances, indices = index.search(embeddings, top_k)
+
+    return [
+        [{'id': item_ids[idx], 'distance': float(distance), **item_map[item_ids[idx]]}
+         for idx, distance in zip(row_indices, row_distances) if 0 <= idx < len(item_ids)]
+        for row_indices, row_distances in zip(indices, distances)
+    ]
+
+
 def build_all_indexes():
     """Build all FAISS indexes"""
     print("🚀 Building all FAISS indexes...\n")
@@ -0,0 +1,235 @@
+import asyncio
+import contextvars
+import itertools
+import os
+import random
+import time
+import uuid
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from backend.dependencies import get_current_user_id
+from backend.streaming import SSE_HEADERS, format_sse
+from backend import metrics
+
+# In-process queue for slow AI generations. Submitting returns a job id at
+# once; worker tasks run the job and clients poll GET /jobs/{id} or follow
+# GET /jobs/{id}/events. Jobs with the same kind and input fingerprint are
+# deduplicated while queued, running or recently finished, so identical
+# submissions share one run and one result.
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', 1000))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 600))  # seconds finished jobs stay available
+JOB_RETRY_BASE = 1.0
+JOB_HEARTBEAT_SECONDS = 15
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# The job a worker is running, so work it starts can be linked to it
+current_job = contextvars.ContextVar("current_job", default=None)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+class QueueFull(Exception):
+    """Too many jobs are waiting"""
+
+
+class Job:
+    def __init__(self, kind, fingerprint, fn, priority, user_id=None, fallback=None):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.fingerprint = fingerprint
+        self.fn = fn
+        self.fallback = fallback
+        self.priority = priority
+        self.owners = {user_id} if user_id is not None else set()
+        self.status = QUEUED
+        self.attempts = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.finished = asyncio.Event()
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobQueue:
+    def __init__(self, workers=JOB_WORKERS, max_size=JOB_QUEUE_SIZE,
+                 max_attempts=JOB_MAX_ATTEMPTS, result_ttl=JOB_RESULT_TTL):
+        self.workers = workers
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self.jobs = {}  # job_id -> Job
+        self.by_fingerprint = {}  # (kind, fingerprint) -> Job
+        self.queue = None
+        self.tasks = []
+        self.sequence = itertools.count()  # FIFO order within a priority
+
+    def start(self):
+        """Start the worker tasks; call from the running event loop"""
+        if not self.tasks:
+            self.queue = asyncio.PriorityQueue()
+            self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self.tasks
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def pending(self):
+        return self.queue.qsize() if self.queue else 0
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def submit(self, kind, fingerprint, fn, priority=PRIORITY_INTERACTIVE, user_id=None, fallback=None,
+               parent=None):
+        """Queue fn() unless an equivalent job exists; returns the Job
+
+        If every attempt fails and a fallback is given, the job still
+        finishes as done with fallback() as its result and the last error.
+        Failed and fallback jobs are not reused, so the next submission
+        tries again.
+
+        A job submitted with a parent is owned by everyone who owns the
+        parent, including users deduplicated onto it later, so a job id in
+        the parent's result works for all of them.
+        """
+        self._prune()
+
+        existing = self.by_fingerprint.get((kind, fingerprint))
+        if existing and existing.status != FAILED and not existing.error:
+            if user_id is not None:
+                existing.owners.add(user_id)
+            if parent is not None:
+                existing.owners |= parent.owners
+            metrics.increment("jobs.deduplicated")
+            return existing
+
+        if self.pending() >= self.max_size:
+            raise QueueFull("Job queue is full")
+
+        self.start()
+
+        job = Job(kind, fingerprint, fn, priority, user_id, fallback)
+        if parent is not None:
+            parent.owners |= job.owners
+            job.owners = parent.owners  # shared, so later joiners own both
+        self.jobs[job.job_id] = job
+        self.by_fingerprint[(kind, fingerprint)] = job
+        self.queue.put_nowait((priority, next(self.sequence), job))
+        metrics.increment("jobs.submitted")
+        return job
+
+    def _prune(self, now=None):
+        """Forget finished jobs older than the result TTL"""
+        now = time.time() if now is None else now
+        expired = [job for job in self.jobs.values()
+                   if job.finished_at and now - job.finished_at > self.result_ttl]
+        for job in expired:
+            del self.jobs[job.job_id]
+            if self.by_fingerprint.get((job.kind, job.fingerprint)) is job:
+                del self.by_fingerprint[(job.kind, job.fingerprint)]
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self.queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job):
+        job.status = RUNNING
+        current_job.set(job)
+
+        while True:
+            job.attempts += 1
+            try:
+                job.result = await job.fn()
+                job.status = DONE
+                metrics.increment("jobs.done")
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job {job.kind} {job.job_id} attempt {job.attempts} failed: {e}")
+                if job.attempts >= self.max_attempts:
+                    job.error = str(e)
+                    metrics.increment("jobs.failed")
+                    if job.fallback:
+                        job.result = job.fallback()
+                        job.status = DONE
+                    else:
+                        job.status = FAILED
+                    break
+                metrics.increment("jobs.retried")
+                await asyncio.sleep(random.uniform(0, JOB_RETRY_BASE * 2 ** job.attempts))
+
+        job.fn = job.fallback = None  # drop captured inputs once finished
+        job.finished_at = time.time()
+        job.finished.set()
+
+
+queue = JobQueue()
+
+metrics.register_gauge("jobs.pending", queue.pending)
+metrics.register_gauge("jobs.tracked", lambda: len(queue.jobs))
+
+
+def submit_or_503(kind, fingerprint, fn, user_id, priority=PRIORITY_INTERACTIVE, fallback=None):
+    """Submit from a route and shape the HTTP response"""
+    try:
+        job = queue.submit(kind, fingerprint, fn, priority=priority, user_id=user_id, fallback=fallback)
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Too many pending jobs, try again shortly")
+
+    return {"success": True, "job_id": job.job_id, "status": job.status}
+
+
+def get_owned_job(job_id, user_id):
+    job = queue.get(job_id)
+    if not job or user_id not in job.owners:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, user_id: int = Depends(get_current_user_id)):
+    """Poll a job's status and result"""
+    return {"success": True, "job": get_owned_job(job_id, user_id).to_dict()}
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str, user_id: int = Depends(get_current_user_id)):
+    """Follow a job as server-sent events until it finishes"""
+    job = get_owned_job(job_id, user_id)
+
+    async def events():
+        yield format_sse("status", {"status": job.status})
+        while not job.finished.is_set():
+            try:
+                await asyncio.wait_for(job.finished.wait(), JOB_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+        yield format_sse("result", job.to_dict())
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,204 @@
+import json
+
+# Incremental JSON extraction for LLM output.
+#
+# Models wrap the JSON we ask for in code fences, prose or both, and a
+# stream delivers it a few tokens at a time. JSONExtractor scans the text
+# once as it arrives, tracking strings, escapes and bracket depth, and stops
+# at the first complete top-level object or array. Balanced text that is
+# not JSON, like "[see below]" in prose, is skipped and the scan carries on
+# after it.
+#
+# While a top-level object is still streaming, partial() returns the text
+# of its string fields received so far and FieldStream forwards one field
+# chunk by chunk, so a reply can be rendered before the closing brace
+# arrives.
+
+OPENERS = {"{": "}", "[": "]"}
+
+
+class JSONExtractor:
+    """Find the first complete top-level JSON object or array in a stream"""
+
+    def __init__(self, openers="{["):
+        self.openers = openers
+        self.text = ""
+        self.pos = 0  # next character to scan
+        self.start = None  # index of the current candidate's opener
+        self.stack = []  # closers expected inside the candidate
+        self.in_string = False
+        self.escape = False
+        self.expect_key = False  # next top-level string is an object key
+        self.key_start = None
+        self.key = None  # key of the top-level value being read
+        self.fields = {}  # top-level string field -> (start, end or None)
+        self.value = None
+        self.done = False
+
+    def feed(self, chunk):
+        """Scan a chunk; returns True once a complete value has been found"""
+        if self.done:
+            return True
+        self.text += chunk
+
+        text = self.text
+        while self.pos < len(text):
+            char = text[self.pos]
+            self.pos += 1
+
+            if self.start is None:
+                if char in self.openers:
+                    self._begin(char)
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    self._end_string()
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self._begin_string()
+            elif char in OPENERS:
+                self.stack.append(OPENERS[char])
+            elif char in "]}":
+                if char != self.stack.pop():
+                    self._reset()  # mismatched brackets: not JSON
+                elif not self.stack and self._decode():
+                    return True
+            elif len(self.stack) == 1:
+                if char == ",":
+                    self.expect_key = True
+                elif char == ":":
+                    self.expect_key = False
+
+        return False
+
+    def _begin(self, char):
+        self.start = self.pos - 1
+        self.stack = [OPENERS[char]]
+        self.expect_key = char == "{"
+        self.key = None
+        self.fields = {}
+
+    def _reset(self):
+        """Drop the current candidate and keep scanning after it"""
+        self.start = None
+        self.stack = []
+        self.in_string = False
+        self.escape = False
+        self.fields = {}
+
+    def _begin_string(self):
+        if self.stack != ["}"]:
+            return
+        if self.expect_key:
+            self.key_start = self.pos
+        elif self.key is not None:
+            self.fields[self.key] = (self.pos, None)
+
+    def _end_string(self):
+        if self.stack != ["}"]:
+            return
+        if self.expect_key:
+            self.key = _decode_string(self.text[self.key_start:self.pos - 1])
+        elif self.key in self.fields:
+            self.fields[self.key] = (self.fields[self.key][0], self.pos - 1)
+
+    def _decode(self):
+        try:
+            self.value = json.loads(self.text[self.start:self.pos])
+        except json.JSONDecodeError:
+            self._reset()
+            return False
+        self.done = True
+        return True
+
+    def span(self, field):
+        """(start, end) of a top-level string field's raw text so far, or None"""
+        if field not in self.fields:
+            return None
+        start, end = self.fields[field]
+        return start, self.pos if end is None else end
+
+    def partial(self):
+        """Top-level string fields of the object being read, decoded so far"""
+        if self.done and isinstance(self.value, dict):
+            return {k: v for k, v in self.value.items() if isinstance(v, str)}
+        return {key: _decode_string(self.text[slice(*self.span(key))]) for key in self.fields}
+
+
+def _complete(raw):
+    """Length of raw without an escape sequence cut off at its end"""
+    cut = raw.rfind("\\")
+    if cut >= 0:
+        run = cut + 1 - len(raw[:cut + 1].rstrip("\\"))  # backslashes ending at cut
+        rest = raw[cut + 1:]
+        if run % 2 and (not rest or (rest[0] == "u" and len(rest) < 5)):
+            return cut
+    return len(raw)
+
+
+def _decode_string(raw):
+    """Decode the inside of a JSON string, ignoring a trailing partial escape"""
+    raw = raw[:_complete(raw)]
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return raw
+
+
+class FieldStream:
+    """Forward one top-level string field of a streamed JSON object as it arrives"""
+
+    def __init__(self, field):
+        self.field = field
+        self.extractor = JSONExtractor("{")
+        self.offset = 0  # raw text of the field already decoded
+
+    def feed(self, chunk):
+        """Add a chunk and return the field text it completed"""
+        self.extractor.feed(chunk)
+        span = self.extractor.span(self.field)
+        if span is None:
+            return ""
+
+        start, end = span
+        offset = max(self.offset, start)
+        raw = self.extractor.text[offset:end]
+        raw = raw[:_complete(raw)]
+        self.offset = offset + len(raw)
+        return _decode_string(raw)
+
+    @property
+    def started(self):
+        return self.extractor.span(self.field) is not None
+
+
+def extract_json(text, openers="{["):
+    """First complete top-level object or array in text, or None"""
+    extractor = JSONExtractor(openers)
+    return extractor.value if extractor.feed(text) else None
+
+
+def load_model(text, model):
+    """Validate the first JSON object in text as a pydantic model"""
+    value = extract_json(text, "{")
+    if value is None:
+        raise json.JSONDecodeError("No JSON object found", text, 0)
+    return model.model_validate(value)
+
+
+def load_models(text, model):
+    """Validate the first JSON array in text as a non-empty list of models"""
+    value = extract_json(text, "[")
+    if value is None:
+        raise json.JSONDecodeError("No JSON array found", text, 0)
+    if not value:
+        raise ValueError("Empty JSON array")
+    return [model.model_validate(item) for item in value]
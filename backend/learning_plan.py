@@ -0,0 +1,208 @@
+import asyncio
+import os
+import threading
+from cachetools import LRUCache
+from backend.catalog import catalog
+from backend.career_cache import profile_fingerprint
+from backend.faiss_utils import search_faiss_batch
+from backend import metrics
+
+# Deterministic learning plan for the coach, assembled without the LLM.
+#
+#   1. Rank skill gaps: skills close to the career goal (FAISS skills index)
+#      and skills many open opportunities ask for (catalog postings), minus
+#      what the student already knows well.
+#   2. Retrieve resources for every gap with one batched FAISS search.
+#   3. Estimate hours per gap and pack them into weeks of
+#      LEARNING_PLAN_HOURS_PER_WEEK.
+#
+# The same profile and catalog version always give the same plan, so plans
+# are cached per profile version in an in-process LRU.
+
+# Bump when the planner changes so cached plans are not reused
+LEARNING_PLAN_VERSION = "learning-plan-v2"
+
+LEARNING_PLAN_HOURS_PER_WEEK = int(os.getenv('LEARNING_PLAN_HOURS_PER_WEEK', 6))
+LEARNING_PLAN_SKILLS = int(os.getenv('LEARNING_PLAN_SKILLS', 5))
+LEARNING_PLAN_CACHE_SIZE = int(os.getenv('LEARNING_PLAN_CACHE_SIZE', 1000))
+
+CANDIDATE_SKILLS = 25  # goal matches and in-demand skills considered
+RESOURCES_PER_SKILL = 2
+RELEVANCE_WEIGHT = 0.6  # the rest of a gap's score is job demand
+TARGET_PROFICIENCY = 4  # skills at or above this level are not gaps
+NEW_SKILL_HOURS = 20
+HOURS_PER_LEVEL = 5
+
+_cache = LRUCache(maxsize=LEARNING_PLAN_CACHE_SIZE)
+_cache_lock = threading.Lock()
+
+metrics.register_gauge(
+    "learning_plan.hit_ratio",
+    lambda: metrics.hit_ratio("learning_plan.hits", "learning_plan.misses")
+)
+
+
+def goal_query(profile):
+    return profile.get('career_goal') or profile.get('degree') or 'software development'
+
+
+def similarity(distance):
+    """Cosine similarity from a squared L2 distance between unit vectors"""
+    return min(max(1 - distance / 2, 0.0), 1.0)
+
+
+def estimate_hours(proficiency):
+    """Study hours to bring a skill to the target level"""
+    if not proficiency:
+        return NEW_SKILL_HOURS
+    return max(TARGET_PROFICIENCY - proficiency, 1) * HOURS_PER_LEVEL
+
+
+def rank_skill_gaps(user_skills, relevant, demand, skill_names, limit=LEARNING_PLAN_SKILLS):
+    """Best skills to learn next, highest score first
+
+    user_skills maps skill_id -> proficiency, relevant maps skill_id -> goal
+    similarity (0-1) and demand maps skill_id -> open opportunities needing it.
+    """
+    in_demand = sorted(demand, key=lambda skill_id: (-demand[skill_id], skill_id))[:CANDIDATE_SKILLS]
+    top_demand = max(demand.values(), default=0) or 1
+
+    gaps = []
+    for skill_id in set(relevant) | set(in_demand):
+        proficiency = user_skills.get(skill_id)
+        if proficiency and proficiency >= TARGET_PROFICIENCY:
+            continue
+        if skill_id not in skill_names:
+            continue
+
+        relevance = relevant.get(skill_id, 0.0)
+        openings = demand.get(skill_id, 0)
+        gaps.append({
+            "skill_id": skill_id,
+            "skill_name": skill_names[skill_id],
+            "current_proficiency": proficiency or 0,
+            "relevance": round(relevance, 3),
+            "open_opportunities": openings,
+            "score": round(RELEVANCE_WEIGHT * relevance + (1 - RELEVANCE_WEIGHT) * openings / top_demand, 4),
+            "hours": estimate_hours(proficiency)
+        })
+
+    gaps.sort(key=lambda gap: (-gap['score'], gap['skill_name']))
+    return gaps[:limit]
+
+
+def assign_resources(gaps, results, per_skill=RESOURCES_PER_SKILL):
+    """Give each gap its closest resources, never repeating one across gaps"""
+    used = set()
+    for gap, matches in zip(gaps, results):
+        gap['resources'] = []
+        for match in matches:
+            if match['id'] in used:
+                continue
+            used.add(match['id'])
+            gap['resources'].append({
+                "title": match['title'],
+                "description": match['description'],
+                "url": match['url']
+            })
+            if len(gap['resources']) >= per_skill:
+                break
+    return gaps
+
+
+def activity(skill, first, last):
+    if first and last:
+        return f"Learn the basics of {skill} and build a small project with it"
+    if first:
+        return f"Learn the fundamentals of {skill}"
+    if last:
+        return f"Build a small project using {skill}"
+    return f"Practice {skill} with exercises"
+
+
+def schedule_weeks(gaps, hours_per_week=LEARNING_PLAN_HOURS_PER_WEEK):
+    """Pack gaps in rank order into weeks, splitting long ones across weeks"""
+    weeks = []
+    for gap in gaps:
+        remaining = gap['hours']
+        first = True
+        while remaining > 0:
+            if not weeks or weeks[-1]['hours'] >= hours_per_week:
+                weeks.append({"week": len(weeks) + 1, "hours": 0, "tasks": []})
+            week = weeks[-1]
+
+            hours = min(remaining, hours_per_week - week['hours'])
+            remaining -= hours
+            week['hours'] += hours
+            week['tasks'].append({
+                "skill": gap['skill_name'],
+                "hours": hours,
+                "activity": activity(gap['skill_name'], first, remaining == 0)
+            })
+            first = False
+    return weeks
+
+
+def plan_key(profile):
+    """Cache key: the plan inputs (skills with levels, goal), catalog and planner versions
+
+    Blocking: a cold or stale catalog snapshot reads the database.
+    """
+    return profile_fingerprint(
+        profile.get('degree'),
+        [f"{s['skill_name']}:{s.get('proficiency') or 0}" for s in profile['skills']],
+        profile.get('career_goal'),
+        f"{LEARNING_PLAN_VERSION}:{LEARNING_PLAN_HOURS_PER_WEEK}:{catalog.snapshot().version}"
+    )
+
+
+def build_plan(profile):
+    """Compute a plan; blocking (catalog snapshot and embedding work)"""
+    snapshot = catalog.snapshot()
+    demand = {skill_id: len(rows) for skill_id, rows in snapshot.postings.items()}
+    user_skills = {s['skill_id']: s.get('proficiency') or 0 for s in profile['skills']}
+
+    goal_matches = search_faiss_batch([goal_query(profile)], 'skills', top_k=CANDIDATE_SKILLS)[0]
+    relevant = {int(match['id']): similarity(match['distance']) for match in goal_matches}
+    skill_names = {**snapshot.skill_names, **{int(m['id']): m['skill_name'] for m in goal_matches}}
+
+    gaps = rank_skill_gaps(user_skills, relevant, demand, skill_names)
+    results = search_faiss_batch([gap['skill_name'] for gap in gaps], 'resources', top_k=RESOURCES_PER_SKILL * 3)
+    assign_resources(gaps, results)
+    weeks = schedule_weeks(gaps)
+
+    next_steps = [f"Week {week['week']}: " + "; ".join(task['activity'] for task in week['tasks'])
+                  for week in weeks[:3]]
+    if gaps:
+        in_demand = max(gaps, key=lambda gap: gap['open_opportunities'])
+        if in_demand['open_opportunities']:
+            next_steps.append(f"Apply to the {in_demand['open_opportunities']} open opportunities "
+                              f"that ask for {in_demand['skill_name']} once you have a project to show")
+
+    return {
+        "current_skills": [s['skill_name'] for s in profile['skills']],
+        "recommended_skills": [gap['skill_name'] for gap in gaps],
+        "learning_resources": [resource for gap in gaps for resource in gap['resources']],
+        "skill_gaps": gaps,
+        "weeks": weeks,
+        "hours_per_week": LEARNING_PLAN_HOURS_PER_WEEK,
+        "total_hours": sum(gap['hours'] for gap in gaps),
+        "next_steps": next_steps
+    }
+
+
+async def get_learning_plan(profile):
+    """Cached plan for a profile; computed off the event loop on a miss"""
+    key = await asyncio.to_thread(plan_key, profile)
+    with _cache_lock:
+        plan = _cache.get(key)
+
+    if plan is not None:
+        metrics.increment("learning_plan.hits")
+        return plan
+
+    metrics.increment("learning_plan.misses")
+    plan = await asyncio.to_thread(build_plan, profile)
+    with _cache_lock:
+        _cache[key] = plan
+    return plan
@@ -0,0 +1,300 @@
+import asyncio
+import hashlib
+import os
+import random
+import time
+from dotenv import load_dotenv
+from collections import deque
+from backend import metrics
+from backend.circuit_breaker import CircuitBreaker, CircuitOpen, CLOSED
+from backend.llm_providers import create_provider
+from backend.single_flight import SingleFlight
+
+# Shared async LLM client. Every LLM call goes through generate() or
+# stream(), which bound the number of in-flight requests, apply a timeout
+# and retry transient failures with jittered exponential backoff, so one
+# slow completion never blocks the event loop or piles up behind others.
+# Identical concurrent prompts share a single upstream request.
+# The upstream itself is a provider (see llm_providers.py) chosen by LLM_PROVIDER.
+#
+# Each upstream call is recorded under its endpoint label in /metrics:
+#   llm.<endpoint>.latency_ms      histogram, whole call including retries
+#   llm.<endpoint>.ttft_ms         histogram, time to first chunk (streams only)
+#   llm.<endpoint>.prompt_tokens / .response_tokens   token counters, as reported
+#                                  by the provider or else estimated from length
+#   llm.<endpoint>.retries / .timeouts / .errors       failure counters
+#   llm.<endpoint>.fallback.<reason>                   canned answers served
+#
+# A circuit breaker watches upstream attempts. When too many recent ones
+# failed, calls raise LLMUnavailable at once, so routes serve their fallback
+# content immediately instead of holding a worker for the full timeout;
+# after LLM_BREAKER_OPEN_SECONDS a probe call tests whether it recovered.
+# With LLM_HEDGE_ENABLED, a generate() attempt still running after the
+# endpoint's recent p95 latency gets a second, hedged request and the first
+# answer wins. Streams are not hedged.
+
+load_dotenv()
+
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'gemini')
+LLM_MODEL = os.getenv('LLM_MODEL', 'gemini-2.0-flash')
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', 30))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 8))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 0.5))
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', 8))
+
+LLM_BREAKER_WINDOW = int(os.getenv('LLM_BREAKER_WINDOW', 20))  # recent attempts considered
+LLM_BREAKER_FAILURE_RATE = float(os.getenv('LLM_BREAKER_FAILURE_RATE', 0.5))
+LLM_BREAKER_MIN_CALLS = int(os.getenv('LLM_BREAKER_MIN_CALLS', 10))
+LLM_BREAKER_OPEN_SECONDS = float(os.getenv('LLM_BREAKER_OPEN_SECONDS', 30))
+LLM_HEDGE_ENABLED = os.getenv('LLM_HEDGE_ENABLED', 'false').lower() == 'true'
+LLM_HEDGE_QUANTILE = float(os.getenv('LLM_HEDGE_QUANTILE', 0.95))
+LLM_HEDGE_MIN_SAMPLES = 20
+LLM_HEDGE_WINDOW = 200  # recent latencies kept per endpoint
+
+CHARS_PER_TOKEN = 4  # rough average for English text with Gemini's tokenizer
+
+provider = create_provider(LLM_PROVIDER)
+
+_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+_flights = SingleFlight()
+_latencies = {}  # endpoint -> recent successful attempt latencies, seconds
+
+breaker = CircuitBreaker(
+    window=LLM_BREAKER_WINDOW,
+    failure_rate=LLM_BREAKER_FAILURE_RATE,
+    min_calls=LLM_BREAKER_MIN_CALLS,
+    open_seconds=LLM_BREAKER_OPEN_SECONDS
+)
+
+metrics.register_gauge("llm.requests_coalesced", lambda: _flights.joined)
+metrics.register_gauge("llm.requests_in_flight", lambda: len(_flights))
+metrics.register_gauge("llm.circuit_state", lambda: breaker.state)
+metrics.register_gauge("llm.circuit_opened", lambda: breaker.opened)
+
+
+class LLMError(Exception):
+    """The LLM call failed after all retries"""
+
+
+class LLMTimeout(LLMError):
+    """The LLM did not answer within the timeout"""
+
+
+class LLMUnavailable(LLMError):
+    """The circuit breaker is open; the call was not attempted"""
+
+
+def set_provider(new_provider):
+    """Swap the upstream provider, e.g. for tests or benchmarks"""
+    global provider
+    provider = new_provider
+
+
+def retryable_errors():
+    """Errors worth another attempt: timeouts plus the provider's transient errors"""
+    return (asyncio.TimeoutError,) + tuple(provider.retryable_errors)
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt"""
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+
+def estimate_tokens(text):
+    """Cheap token estimate; close enough for budgeting"""
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def _count_tokens(endpoint, prompt, usage, response_estimate):
+    """Add a call's token counters, preferring the provider's own counts
+
+    usage is the Completion carrying the counts, if any; the estimates
+    cover providers that report none, like the stub, and failed calls.
+    """
+    prompt_tokens = getattr(usage, 'prompt_tokens', None)
+    response_tokens = getattr(usage, 'response_tokens', None)
+    metrics.increment(f"llm.{endpoint}.prompt_tokens",
+                      estimate_tokens(prompt) if prompt_tokens is None else prompt_tokens)
+    metrics.increment(f"llm.{endpoint}.response_tokens",
+                      response_estimate if response_tokens is None else response_tokens)
+
+
+def _failure(error, endpoint):
+    if isinstance(error, CircuitOpen):
+        metrics.increment(f"llm.{endpoint}.short_circuited")
+        return LLMUnavailable("LLM temporarily unavailable")
+    if isinstance(error, asyncio.TimeoutError):
+        metrics.increment(f"llm.{endpoint}.timeouts")
+        return LLMTimeout("LLM request timed out")
+    metrics.increment(f"llm.{endpoint}.errors")
+    return LLMError(str(error))
+
+
+def _retry(endpoint, attempt, error):
+    metrics.increment(f"llm.{endpoint}.retries")
+    print(f"LLM {endpoint} attempt {attempt + 1} failed ({error!r}), retrying")
+    return asyncio.sleep(backoff_delay(attempt))
+
+
+def _elapsed_ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def hedge_delay(endpoint):
+    """Seconds to wait before hedging an attempt, or None to not hedge"""
+    samples = _latencies.get(endpoint)
+    if not LLM_HEDGE_ENABLED or not samples or len(samples) < LLM_HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * LLM_HEDGE_QUANTILE))]
+
+
+async def _race(tasks, timeout):
+    """Result of the first task to succeed; the last error if all fail"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    pending = set(tasks)
+    error = None
+    while pending:
+        done, pending = await asyncio.wait(
+            pending, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            raise asyncio.TimeoutError()
+        for task in done:
+            if task.exception() is None:
+                return task.result()
+            error = task.exception()
+    raise error
+
+
+async def _attempt(prompt, model, timeout, endpoint):
+    """One upstream generate, hedged once it runs past the recent p95"""
+    start = time.perf_counter()
+    hedged = False
+
+    async with _semaphore:
+        tasks = [asyncio.ensure_future(provider.generate(prompt, model or LLM_MODEL))]
+        try:
+            delay = hedge_delay(endpoint)
+            if delay is not None and delay < timeout:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                # Only hedge with a spare slot and a healthy upstream
+                if not done and not _semaphore.locked() and breaker.state == CLOSED:
+                    await _semaphore.acquire()
+                    hedged = True
+                    metrics.increment(f"llm.{endpoint}.hedged")
+                    tasks.append(asyncio.ensure_future(provider.generate(prompt, model or LLM_MODEL)))
+                timeout -= delay
+
+            text = await _race(tasks, timeout)
+        finally:
+            for task in tasks:
+                if task.done() and not task.cancelled():
+                    task.exception()  # mark as retrieved
+                task.cancel()
+            if hedged:
+                _semaphore.release()
+
+    _latencies.setdefault(endpoint, deque(maxlen=LLM_HEDGE_WINDOW)).append(time.perf_counter() - start)
+    return text
+
+
+def record_fallback(endpoint, reason):
+    """Count a canned answer served instead of a generated one"""
+    metrics.increment(f"llm.{endpoint}.fallback.{reason}")
+
+
+def prompt_fingerprint(prompt, model=None):
+    """Hash identifying identical requests to the same model"""
+    return hashlib.sha256(f"{model or LLM_MODEL}\n{prompt}".encode()).hexdigest()
+
+
+async def coalesce(key, fn):
+    """Share one call of fn() between concurrent callers with the same key
+
+    Use this around generate-and-parse steps so joiners also reuse the
+    parsed result. The result object is shared, so treat it as read-only.
+    """
+    return await _flights.do(key, fn)
+
+
+async def generate(prompt, model=None, timeout=None, retries=None, endpoint="other"):
+    """Generate a completion and return its text
+
+    endpoint labels the call's metrics, e.g. "career_path".
+    """
+    return await coalesce(
+        ("generate", prompt_fingerprint(prompt, model)),
+        lambda: _generate(prompt, model, timeout, retries, endpoint)
+    )
+
+
+async def _generate(prompt, model, timeout, retries, endpoint):
+    timeout = timeout or LLM_TIMEOUT_SECONDS
+    retries = LLM_MAX_RETRIES if retries is None else retries
+    retryable = retryable_errors()
+    start = time.perf_counter()
+    text = None
+
+    try:
+        for attempt in range(retries + 1):
+            try:
+                with breaker.call(retryable):
+                    text = await _attempt(prompt, model, timeout, endpoint)
+                return text
+            except retryable as e:
+                if attempt >= retries:
+                    raise _failure(e, endpoint) from e
+                await _retry(endpoint, attempt, e)
+            except Exception as e:
+                raise _failure(e, endpoint) from e
+    finally:
+        metrics.observe(f"llm.{endpoint}.latency_ms", _elapsed_ms(start))
+        _count_tokens(endpoint, prompt, text, estimate_tokens(text) if text is not None else 0)
+
+
+async def stream(prompt, model=None, timeout=None, retries=None, endpoint="other"):
+    """Yield completion text chunks as they arrive
+
+    The timeout applies to each wait for the next chunk. Failures are only
+    retried before the first chunk, since the caller may already have
+    forwarded earlier text.
+    """
+    timeout = timeout or LLM_TIMEOUT_SECONDS
+    retries = LLM_MAX_RETRIES if retries is None else retries
+    retryable = retryable_errors()
+    start = time.perf_counter()
+    received = 0
+    usage = None  # last chunk reporting token counts
+
+    try:
+        for attempt in range(retries + 1):
+            started = False
+            try:
+                with breaker.call(retryable):
+                    async with _semaphore:
+                        chunks = provider.stream(prompt, model or LLM_MODEL).__aiter__()
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                            except StopAsyncIteration:
+                                break
+                            if not started:
+                                metrics.observe(f"llm.{endpoint}.ttft_ms", _elapsed_ms(start))
+                                started = True
+                            received += len(chunk)
+                            if getattr(chunk, 'response_tokens', None) is not None:
+                                usage = chunk
+                            yield chunk
+                return
+            except retryable as e:
+                if started or attempt >= retries:
+                    raise _failure(e, endpoint) from e
+                await _retry(endpoint, attempt, e)
+            except Exception as e:
+                raise _failure(e, endpoint) from e
+    finally:
+        metrics.observe(f"llm.{endpoint}.latency_ms", _elapsed_ms(start))
+        _count_tokens(endpoint, prompt, usage, received // CHARS_PER_TOKEN)
@@ -0,0 +1,98 @@
+import os
+from abc import ABC, abstractmethod
+
+# LLM providers behind backend.llm. A provider turns a prompt into text,
+# either all at once or as a stream of chunks; timeouts, retries, the
+# concurrency limit and coalescing stay in backend.llm.
+#
+# LLM_PROVIDER picks one at startup:
+#   gemini  Google Gemini (default)
+#   stub    deterministic local stand-in for offline benchmarks, see llm_stub.py
+
+
+class Completion(str):
+    """Completion text with the token counts the provider reported
+
+    Providers that know their usage return these instead of plain strings;
+    backend.llm estimates the counts a provider leaves out.
+    """
+
+    def __new__(cls, text, prompt_tokens=None, response_tokens=None):
+        completion = super().__new__(cls, text)
+        completion.prompt_tokens = prompt_tokens
+        completion.response_tokens = response_tokens
+        return completion
+
+
+class LLMProvider(ABC):
+    """Interface every provider implements"""
+
+    name = None
+
+    # Provider errors worth retrying, in addition to timeouts
+    retryable_errors = ()
+
+    @abstractmethod
+    async def generate(self, prompt, model):
+        """Return the full completion text, a str or Completion"""
+
+    @abstractmethod
+    def stream(self, prompt, model):
+        """Return an async iterator of completion text chunks
+
+        A chunk that is a Completion carries the usage of the whole
+        stream so far; the last one reported counts.
+        """
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self):
+        import google.generativeai as genai
+        from google.api_core import exceptions
+
+        genai.configure(api_key=os.getenv('GEMINI_API'))
+        self.genai = genai
+        self.models = {}
+        self.retryable_errors = (
+            exceptions.ResourceExhausted,
+            exceptions.ServiceUnavailable,
+            exceptions.DeadlineExceeded,
+            exceptions.InternalServerError,
+        )
+
+    def get_model(self, name):
+        """Model objects are created once and reused"""
+        if name not in self.models:
+            self.models[name] = self.genai.GenerativeModel(name)
+        return self.models[name]
+
+    @staticmethod
+    def completion(response):
+        """Text of a response or stream chunk with its usage_metadata counts"""
+        usage = getattr(response, 'usage_metadata', None)
+        return Completion(
+            response.text,
+            getattr(usage, 'prompt_token_count', None) or None,
+            getattr(usage, 'candidates_token_count', None) or None
+        )
+
+    async def generate(self, prompt, model):
+        response = await self.get_model(model).generate_content_async(prompt)
+        return self.completion(response)
+
+    async def stream(self, prompt, model):
+        response = await self.get_model(model).generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            yield self.completion(chunk)
+
+
+def create_provider(name):
+    """Build the provider registered under name"""
+    if name == "gemini":
+        return GeminiProvider()
+    if name == "stub":
+        from backend.llm_stub import StubProvider
+        return StubProvider.from_env()
+    raise ValueError(f"Unknown LLM provider: {name}")
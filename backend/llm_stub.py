@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+from backend.llm_providers import LLMProvider
+
+# Deterministic local stand-in for the LLM, for load tests and offline
+# benchmarks of the career and coach endpoints without API keys or quota.
+#
+#   LLM_PROVIDER=stub uvicorn backend.main:app
+#
+# Outputs are canned but shaped like the real ones (career paths matching
+# models.CareerPath, degree map titles, coach answers with suggestions,
+# conversation summaries) and depend only on the prompt and LLM_STUB_SEED,
+# so runs are repeatable. Timing follows configurable distributions:
+#
+#   LLM_STUB_TTFT            time to first token, ms (default lognormal:400,0.5)
+#   LLM_STUB_TOKENS_PER_SEC  streaming speed after the first token (default 80)
+#   LLM_STUB_ERROR_RATE      fraction of calls failing with a retryable error (default 0)
+#
+# Distributions are "fixed:ms", "uniform:low,high", "normal:mean,stddev" or
+# "lognormal:median,sigma", all in milliseconds.
+
+CHARS_PER_TOKEN = 4
+CHUNK_TOKENS = 4  # tokens per streamed chunk
+
+CAREER_TITLES = [
+    "Software Developer", "Data Analyst", "Machine Learning Engineer", "Cloud Engineer",
+    "DevOps Engineer", "Product Analyst", "QA Automation Engineer", "Business Analyst",
+    "Frontend Developer", "Data Engineer", "Cybersecurity Analyst", "UX Researcher"
+]
+SKILLS = [
+    "Python", "SQL", "Git", "Docker", "AWS", "Statistics", "React", "Linux",
+    "Data Visualization", "System Design", "Communication", "Machine Learning"
+]
+SUGGESTIONS = [
+    "What projects should I build next?",
+    "How do I prepare for technical interviews?",
+    "Which certifications are worth it?",
+    "How should I structure my resume?",
+    "What internships should I target?"
+]
+
+
+class StubUnavailable(Exception):
+    """Injected transient failure; retried like an upstream 503"""
+
+
+class LatencyDistribution:
+    def __init__(self, kind, params):
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec):
+        """Build from "kind:a,b" with values in milliseconds"""
+        kind, _, values = spec.partition(":")
+        return cls(kind.strip(), [float(v) for v in values.split(",") if v.strip()])
+
+    def sample(self, rng):
+        """Draw one latency in seconds"""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            ms = rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            ms = rng.lognormvariate(math.log(median), sigma)
+        return max(ms, 0) / 1000
+
+
+class StubProvider(LLMProvider):
+    name = "stub"
+    retryable_errors = (StubUnavailable,)
+
+    def __init__(self, ttft="fixed:0", tokens_per_sec=0, error_rate=0.0, seed="mentorax"):
+        self.ttft = LatencyDistribution.parse(ttft) if isinstance(ttft, str) else ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.seed = seed
+        self.calls = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            ttft=os.getenv('LLM_STUB_TTFT', 'lognormal:400,0.5'),
+            tokens_per_sec=float(os.getenv('LLM_STUB_TOKENS_PER_SEC', 80)),
+            error_rate=float(os.getenv('LLM_STUB_ERROR_RATE', 0)),
+            seed=os.getenv('LLM_STUB_SEED', 'mentorax')
+        )
+
+    def rng(self, prompt):
+        """Random source fixed by the prompt, so answers repeat across runs"""
+        digest = hashlib.sha256(f"{self.seed}\x00{prompt}".encode("utf-8")).hexdigest()
+        return random.Random(digest)
+
+    def token_delay(self, text):
+        if not self.tokens_per_sec:
+            return 0
+        return len(text) / CHARS_PER_TOKEN / self.tokens_per_sec
+
+    async def start(self, rng):
+        """Wait out the first-token latency; fail now and then if configured"""
+        self.calls += 1
+        # Drawn from the shared source so errors vary per call, not per prompt
+        failed = self.error_rate and random.random() < self.error_rate
+        await asyncio.sleep(self.ttft.sample(rng))
+        if failed:
+            raise StubUnavailable("Injected stub failure")
+
+    async def generate(self, prompt, model):
+        rng = self.rng(prompt)
+        text = respond(prompt, rng)
+        await self.start(rng)
+        await asyncio.sleep(self.token_delay(text))
+        return text
+
+    async def stream(self, prompt, model):
+        rng = self.rng(prompt)
+        text = respond(prompt, rng)
+        await self.start(rng)
+        for chunk in split_chunks(text):
+            yield chunk
+            await asyncio.sleep(self.token_delay(chunk))
+
+
+def split_chunks(text, size=CHUNK_TOKENS * CHARS_PER_TOKEN):
+    """Cut text into roughly token-sized chunks on word boundaries"""
+    chunks = []
+    current = ""
+    for word in re.findall(r"\S+\s*|\s+", text):
+        current += word
+        if len(current) >= size:
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def profile_field(prompt, label, default):
+    match = re.search(rf"- {label}: (.+)", prompt)
+    return match.group(1).strip() if match else default
+
+
+def career_paths(prompt, rng):
+    goal = profile_field(prompt, "Career Goal", "a tech career")
+    degree = profile_field(prompt, "Degree/Major", "their degree")
+    paths = []
+    for title in rng.sample(CAREER_TITLES, 3):
+        missing = rng.sample(SKILLS, 3)
+        paths.append({
+            "title": title,
+            "fit_reason": f"Your {degree} background and interest in {goal} translate well to a {title} role. "
+                          f"Entry-level openings are common for recent graduates.",
+            "missing_skills": missing,
+            "roadmap": [
+                f"Learn {missing[0]} fundamentals",
+                f"Build a small project using {missing[1]}",
+                f"Practice {missing[2]} with real datasets or codebases",
+                f"Apply for {title} internships"
+            ]
+        })
+    # Gemini usually fences JSON, so the stub does too
+    return "```json\n" + json.dumps(paths, indent=2) + "\n```"
+
+
+def coach_answer(rng):
+    skills = rng.sample(SKILLS, 2)
+    return (f"Focus on {skills[0]} first, since most entry-level roles expect it. "
+            f"Then build one portfolio project that also uses {skills[1]}, and write up what you learned. "
+            f"Consistent weekly practice matters more than long occasional sessions.")
+
+
+def respond(prompt, rng):
+    """Canned completion shaped like what the prompt asks for"""
+    if '"fit_reason"' in prompt:
+        return career_paths(prompt, rng)
+
+    if "specific job roles/career paths" in prompt:
+        return json.dumps(rng.sample(CAREER_TITLES, 5))
+
+    if "running summary" in prompt:
+        return "The student is exploring entry-level tech roles and plans to practice SQL and Python weekly."
+
+    if "SUGGESTIONS:" in prompt:
+        return coach_answer(rng) + "\nSUGGESTIONS: " + json.dumps(rng.sample(SUGGESTIONS, 3))
+
+    if '"suggestions"' in prompt:
+        return json.dumps({"response": coach_answer(rng), "suggestions": rng.sample(SUGGESTIONS, 3)})
+
+    return coach_answer(rng)
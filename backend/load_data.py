@@ -1,5 +1,5 @@
 import json
-from database import execute_query, fetch_one
+from database import execute_query, fetch_one, bump_catalog_version
 
 
 def load_opportunities():
@@ -53,6 +53,9 @@ def load_opportunities():
         except Exception as e:
             print(f"❌ Error loading {opp['title']}: {e}")
 
+    if loaded_count:
+        bump_catalog_version('opportunities')
+
     print(f"\n🎉 Successfully loaded {loaded_count} new opportunities!")
 
 
@@ -2,8 +2,9 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+import asyncio
 import os
-from . import auth, opportunities, career, profile, resources, coach
+from . import auth, opportunities, career, career_cache, profile, resources, coach, metrics, jobs
 
 app = FastAPI(title="MentoraX API")
 
@@ -27,10 +28,25 @@ app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
 # async def root():
 #     return {"status": "MentoraX API Running", "version": "1.0"}
 
+# Keep references so background tasks are not garbage collected
+background_tasks = []
+
+@app.on_event("startup")
+async def start_background_tasks():
+    background_tasks.append(asyncio.create_task(auth.session_sweeper_loop()))
+    background_tasks.append(asyncio.create_task(career_cache.sweeper_loop()))
+    if auth.SESSION_SECRET:
+        background_tasks.append(asyncio.create_task(auth.revocation_sync_loop()))
+    background_tasks.extend(jobs.queue.start())
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def get_metrics():
+    return {"success": True, "metrics": metrics.get_metrics()}
+
 # Serve frontend pages
 @app.get("/")
 async def serve_landing():
@@ -80,4 +96,5 @@ app.include_router(career.router)
 app.include_router(opportunities.router)
 app.include_router(profile.router)
 app.include_router(resources.router)
-app.include_router(coach.router)
\ No newline at end of file
+app.include_router(coach.router)
+app.include_router(jobs.router)
\ No newline at end of file
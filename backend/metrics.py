@@ -0,0 +1,97 @@
+import bisect
+import threading
+
+# Process-local metrics, exposed as JSON at GET /metrics
+
+# Upper bounds in milliseconds; anything slower lands in the +Inf bucket
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles are the upper bound of their bucket"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        buckets = {f"le_{bound}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets
+        }
+
+
+def increment(name, value=1):
+    """Add `value` to a counter"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, value):
+    """Record a value (e.g. a latency in ms) in a histogram"""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(value)
+
+
+def register_gauge(name, fn):
+    """Register a callable evaluated each time metrics are read"""
+    _gauges[name] = fn
+
+
+def hit_ratio(hits, misses):
+    """hits / (hits + misses) for two counters (0.0 when nothing was counted)"""
+    with _lock:
+        hit_count = _counters.get(hits, 0)
+        total = hit_count + _counters.get(misses, 0)
+    return round(hit_count / total, 4) if total else 0.0
+
+
+def get_metrics():
+    """Snapshot of all counters, gauges and histograms"""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {name: histogram.snapshot() for name, histogram in _histograms.items()}
+
+    gauges = {}
+    for name, fn in _gauges.items():
+        try:
+            gauges[name] = fn()
+        except Exception as e:
+            gauges[name] = f"error: {e}"
+
+    return {"counters": counters, "gauges": gauges, "histograms": histograms}
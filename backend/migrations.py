@@ -0,0 +1,300 @@
+from backend.database import fetch_one, fetch_all, execute_query
+
+# Schema changes applied on top of setup_db.sql, in order.
+# Each step is idempotent so it is safe on databases that were patched by hand.
+
+
+def column_exists(table, column):
+    """Check if a column exists in the current database"""
+    row = fetch_one("""
+                    SELECT COUNT(*) as count
+                    FROM information_schema.columns
+                    WHERE table_schema = DATABASE()
+                      AND table_name = %s
+                      AND column_name = %s
+                    """, (table, column))
+    return row['count'] > 0
+
+
+def index_exists(table, index_name):
+    """Check if an index exists in the current database"""
+    row = fetch_one("""
+                    SELECT COUNT(*) as count
+                    FROM information_schema.statistics
+                    WHERE table_schema = DATABASE()
+                      AND table_name = %s
+                      AND index_name = %s
+                    """, (table, index_name))
+    return row['count'] > 0
+
+
+def add_column(table, column, definition):
+    """Add a column unless it already exists"""
+    if not column_exists(table, column):
+        execute_query(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def add_index(table, index_name, columns, kind="INDEX"):
+    """Add an index unless it already exists"""
+    if not index_exists(table, index_name):
+        execute_query(f"ALTER TABLE {table} ADD {kind} {index_name} ({columns})")
+
+
+def migration_001_scraper_schema():
+    """Scraper columns on opportunities, plus courses and scraping_logs tables"""
+    add_column('opportunities', 'url_hash', "VARCHAR(64) DEFAULT NULL")
+    add_column('opportunities', 'company_name', "VARCHAR(255) DEFAULT NULL")
+    add_column('opportunities', 'job_type', "VARCHAR(50) DEFAULT NULL")
+    add_column('opportunities', 'scraped_at', "DATETIME DEFAULT NULL")
+    add_column('opportunities', 'last_updated', "DATETIME DEFAULT CURRENT_TIMESTAMP")
+    add_column('opportunities', 'is_active', "BOOLEAN NOT NULL DEFAULT TRUE")
+
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS courses (
+                      course_id INT AUTO_INCREMENT PRIMARY KEY,
+                      title VARCHAR(255) NOT NULL,
+                      description TEXT,
+                      url TEXT,
+                      url_hash VARCHAR(64) NOT NULL,
+                      provider VARCHAR(100),
+                      price_type VARCHAR(20) DEFAULT 'free',
+                      price DECIMAL(10, 2) DEFAULT 0,
+                      currency VARCHAR(10) DEFAULT 'USD',
+                      duration VARCHAR(100) DEFAULT NULL,
+                      rating DECIMAL(3, 2) DEFAULT NULL,
+                      thumbnail_url TEXT,
+                      level VARCHAR(20) DEFAULT 'beginner',
+                      scraped_at DATETIME DEFAULT NULL,
+                      last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+                      is_active BOOLEAN NOT NULL DEFAULT TRUE,
+                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                      UNIQUE KEY unique_course_url_hash (url_hash)
+                  )
+                  """)
+
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS course_skills (
+                      id INT AUTO_INCREMENT PRIMARY KEY,
+                      course_id INT NOT NULL,
+                      skill_id INT NOT NULL,
+                      FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
+                      FOREIGN KEY (skill_id) REFERENCES skills(skill_id) ON DELETE CASCADE,
+                      UNIQUE KEY unique_course_skill (course_id, skill_id)
+                  )
+                  """)
+
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS scraping_logs (
+                      log_id INT AUTO_INCREMENT PRIMARY KEY,
+                      source VARCHAR(100) NOT NULL,
+                      scrape_type VARCHAR(50) NOT NULL,
+                      items_found INT DEFAULT 0,
+                      items_added INT DEFAULT 0,
+                      items_updated INT DEFAULT 0,
+                      items_duplicate INT DEFAULT 0,
+                      status VARCHAR(20) DEFAULT 'success',
+                      error_message TEXT,
+                      started_at DATETIME,
+                      completed_at DATETIME
+                  )
+                  """)
+
+
+def migration_002_hot_query_indexes():
+    """Secondary indexes for the predicates and sort keys the routers use"""
+    # Opportunities: dedup lookup, keyset listing, filters and cleanup
+    add_index('opportunities', 'unique_opp_url_hash', 'url_hash', kind="UNIQUE INDEX")
+    add_index('opportunities', 'idx_opp_deadline', 'deadline, opportunity_id')
+    add_index('opportunities', 'idx_opp_active_deadline', 'is_active, deadline, opportunity_id')
+    add_index('opportunities', 'idx_opp_active_updated', 'is_active, last_updated')
+    add_index('opportunities', 'idx_opp_source', 'source')
+    add_index('opportunities', 'idx_opp_location', 'location')
+
+    # Skill filter looks opportunities up by skill_id first
+    add_index('opportunity_skills', 'idx_opp_skills_skill', 'skill_id, opportunity_id')
+
+    # Session expiry checks and saved list ordering
+    add_index('sessions', 'idx_sessions_expires', 'expires_at')
+    add_index('saved_opportunities', 'idx_saved_user_created', 'user_id, created_at')
+
+    # Resource keyset listing
+    add_index('resources', 'idx_resources_created', 'created_at, resource_id')
+
+    # Scraper maintenance
+    add_index('courses', 'idx_courses_active_updated', 'is_active, last_updated')
+    add_index('scraping_logs', 'idx_logs_source_started', 'source, started_at')
+
+
+def migration_003_opportunity_fulltext():
+    """FULLTEXT index backing /opportunities/search"""
+    add_index('opportunities', 'ft_opp_search', 'title, description, company_name', kind="FULLTEXT INDEX")
+
+
+def migration_004_catalog_versions():
+    """Change counters that tell in-process catalogs when to refresh"""
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS catalog_versions (
+                      name VARCHAR(50) PRIMARY KEY,
+                      version BIGINT NOT NULL DEFAULT 0,
+                      updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                  )
+                  """)
+    execute_query("INSERT IGNORE INTO catalog_versions (name, version) VALUES ('opportunities', 0)")
+
+
+def migration_005_revoked_tokens():
+    """Deny-list for signed session tokens"""
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS revoked_tokens (
+                      token_id VARCHAR(64) PRIMARY KEY,
+                      expires_at DATETIME NOT NULL,
+                      revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                      INDEX idx_revoked_at (revoked_at),
+                      INDEX idx_revoked_expires (expires_at)
+                  )
+                  """)
+
+
+def migration_006_password_hash_length():
+    """Room for salted scrypt hashes (legacy SHA-256 digests are 64 chars)"""
+    execute_query("ALTER TABLE users MODIFY password VARCHAR(255) NOT NULL")
+
+
+def migration_007_career_path_cache():
+    """Persistent cache of parsed career paths keyed by profile fingerprint"""
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS career_path_cache (
+                      fingerprint CHAR(64) PRIMARY KEY,
+                      career_paths JSON NOT NULL,
+                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                      expires_at DATETIME NOT NULL,
+                      INDEX idx_career_cache_expires (expires_at)
+                  )
+                  """)
+
+
+def migration_008_degree_career_map():
+    """Precomputed career options per normalized degree name"""
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS degree_career_map (
+                      degree_key VARCHAR(255) PRIMARY KEY,
+                      degree VARCHAR(255) NOT NULL,
+                      career_options JSON NOT NULL,
+                      prompt_version VARCHAR(32) NOT NULL,
+                      updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                  )
+                  """)
+
+
+def migration_009_coach_conversations():
+    """Coach conversations with a rolling summary, and their messages"""
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS coach_conversations (
+                      conversation_id CHAR(32) PRIMARY KEY,
+                      user_id INT NOT NULL,
+                      summary TEXT,
+                      summary_upto BIGINT NOT NULL DEFAULT 0,
+                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                      updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                      INDEX idx_conversations_user (user_id, updated_at),
+                      FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+                  )
+                  """)
+
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS coach_messages (
+                      message_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                      conversation_id CHAR(32) NOT NULL,
+                      role ENUM('user', 'coach') NOT NULL,
+                      content TEXT NOT NULL,
+                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                      INDEX idx_messages_conversation (conversation_id, message_id),
+                      FOREIGN KEY (conversation_id) REFERENCES coach_conversations(conversation_id) ON DELETE CASCADE
+                  )
+                  """)
+
+
+def migration_010_career_path_clusters():
+    """Career paths precomputed per profile cluster by backend.career_clusters"""
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS career_path_clusters (
+                      cluster_id INT AUTO_INCREMENT PRIMARY KEY,
+                      generation BIGINT NOT NULL,
+                      prompt_version VARCHAR(32) NOT NULL,
+                      degree VARCHAR(255) NOT NULL,
+                      career_goal VARCHAR(255) NOT NULL,
+                      skills JSON NOT NULL,
+                      members INT NOT NULL,
+                      centroid JSON NOT NULL,
+                      career_paths JSON NOT NULL,
+                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                      INDEX idx_career_clusters_generation (prompt_version, generation)
+                  )
+                  """)
+
+
+MIGRATIONS = [
+    (1, "Scraper columns, courses and scraping_logs tables", migration_001_scraper_schema),
+    (2, "Indexes for hot query predicates", migration_002_hot_query_indexes),
+    (3, "FULLTEXT index on opportunity title, description and company", migration_003_opportunity_fulltext),
+    (4, "Catalog change versions", migration_004_catalog_versions),
+    (5, "Revoked signed session tokens", migration_005_revoked_tokens),
+    (6, "Widen users.password for salted hashes", migration_006_password_hash_length),
+    (7, "Career path cache", migration_007_career_path_cache),
+    (8, "Degree to career map", migration_008_degree_career_map),
+    (9, "Coach conversations and messages", migration_009_coach_conversations),
+    (10, "Career path clusters", migration_010_career_path_clusters),
+]
+
+
+def ensure_migrations_table():
+    """Create the table that records applied schema versions"""
+    execute_query("""
+                  CREATE TABLE IF NOT EXISTS schema_migrations (
+                      version INT PRIMARY KEY,
+                      description VARCHAR(255) NOT NULL,
+                      applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                  )
+                  """)
+
+
+def get_current_version():
+    """Return the highest applied migration version (0 if none)"""
+    ensure_migrations_table()
+    row = fetch_one("SELECT COALESCE(MAX(version), 0) as version FROM schema_migrations")
+    return row['version']
+
+
+def run_migrations(target=None):
+    """Apply all pending migrations up to `target` (default: latest)"""
+    current = get_current_version()
+    applied = []
+
+    for version, description, migrate in MIGRATIONS:
+        if version <= current or (target is not None and version > target):
+            continue
+
+        print(f"🔨 Applying migration {version}: {description}")
+        migrate()
+        execute_query(
+            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+            (version, description)
+        )
+        applied.append(version)
+
+    if applied:
+        print(f"✅ Schema is at version {applied[-1]}")
+    else:
+        print(f"✅ Schema already up to date (version {current})")
+
+    return applied
+
+
+def list_migrations():
+    """Return applied migrations with timestamps"""
+    ensure_migrations_table()
+    return fetch_all("SELECT version, description, applied_at FROM schema_migrations ORDER BY version")
+
+
+if __name__ == "__main__":
+    run_migrations()
@@ -36,6 +36,9 @@ class OpportunityFilter(BaseModel):
     location: Optional[str] = None
     deadline_after: Optional[date] = None
 
+class OpportunitySearch(OpportunityFilter):
+    query: str
+
 class ResourceSearch(BaseModel):
     query: str
     skill_filter: Optional[List[int]] = None
@@ -1,24 +1,99 @@
-from fastapi import APIRouter, HTTPException, Header
-from .models import OpportunityFilter
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from .models import OpportunityFilter, OpportunitySearch
 from .database import fetch_all, execute_query, fetch_one
-from .auth import verify_session
+from .dependencies import get_current_user_id, get_current_profile
+from .pagination import DEFAULT_PAGE_SIZE, clamp_page_size, decode_cursor, paginate
+from .catalog import catalog, order_key
 
 router = APIRouter(prefix="/opportunities", tags=["Opportunities"])
 
+# Keyset order: dated opportunities first by deadline, undated ones last
+DEADLINE_ORDER = " ORDER BY o.deadline IS NULL, o.deadline ASC, o.opportunity_id ASC"
+
+SAVED_QUERY = """
+              SELECT o.*, GROUP_CONCAT(s.skill_name) as required_skills, so.created_at as saved_at
+              FROM saved_opportunities so
+                       JOIN opportunities o ON so.opportunity_id = o.opportunity_id
+                       LEFT JOIN opportunity_skills os ON o.opportunity_id = os.opportunity_id
+                       LEFT JOIN skills s ON os.skill_id = s.skill_id
+              WHERE so.user_id = %s
+              GROUP BY o.opportunity_id
+              ORDER BY so.created_at DESC \
+              """
+
+
+def apply_deadline_cursor(query, params, cursor):
+    """Append the keyset predicate for rows after (deadline, opportunity_id)"""
+    if not cursor:
+        return query
+
+    try:
+        deadline, opportunity_id = decode_cursor(cursor, 2)
+        opportunity_id = int(opportunity_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if deadline is None:
+        query += " AND o.deadline IS NULL AND o.opportunity_id > %s"
+        params.append(opportunity_id)
+    else:
+        query += " AND (o.deadline IS NULL OR o.deadline > %s OR (o.deadline = %s AND o.opportunity_id > %s))"
+        params.extend([deadline, deadline, opportunity_id])
+
+    return query
+
+
+def apply_filters(query, params, filters):
+    """Append the skill, location and deadline predicates from an OpportunityFilter"""
+    # Filter by skills
+    if filters.skill_ids and len(filters.skill_ids) > 0:
+        placeholders = ','.join(['%s'] * len(filters.skill_ids))
+        query += f" AND o.opportunity_id IN (SELECT opportunity_id FROM opportunity_skills WHERE skill_id IN ({placeholders}))"
+        params.extend(filters.skill_ids)
+
+    # Filter by location
+    if filters.location:
+        query += " AND o.location LIKE %s"
+        params.append(f"%{filters.location}%")
+
+    # Filter by deadline
+    if filters.deadline_after:
+        query += " AND o.deadline >= %s"
+        params.append(filters.deadline_after)
+
+    return query
+
+
+def deadline_key(opp):
+    """Sort key matching DEADLINE_ORDER"""
+    return opp['deadline'], opp['opportunity_id']
+
+
+def list_query(limit, cursor=None):
+    """(query, params) for one page of the listing ordered by DEADLINE_ORDER"""
+    query = """
+            SELECT o.*, GROUP_CONCAT(s.skill_name) as required_skills
+            FROM opportunities o
+                     LEFT JOIN opportunity_skills os ON o.opportunity_id = os.opportunity_id
+                     LEFT JOIN skills s ON os.skill_id = s.skill_id
+            WHERE 1 = 1 \
+            """
+    params = []
+    query = apply_deadline_cursor(query, params, cursor)
+    query += " GROUP BY o.opportunity_id" + DEADLINE_ORDER + " LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
 
 @router.get("/all")
-async def get_all_opportunities():
-    """Get all opportunities"""
+async def get_all_opportunities(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
+    """Get opportunities one page at a time, ordered by deadline"""
+    limit = clamp_page_size(limit)
+
     try:
-        query = """
-                SELECT o.*, GROUP_CONCAT(s.skill_name) as required_skills
-                FROM opportunities o
-                         LEFT JOIN opportunity_skills os ON o.opportunity_id = os.opportunity_id
-                         LEFT JOIN skills s ON os.skill_id = s.skill_id
-                GROUP BY o.opportunity_id
-                ORDER BY o.deadline ASC \
-                """
-        opportunities = fetch_all(query)
+        query, params = list_query(limit, cursor)
+        opportunities, next_cursor = paginate(fetch_all(query, tuple(params)), limit, deadline_key)
 
         # Format the results
         for opp in opportunities:
@@ -27,44 +102,97 @@ async def get_all_opportunities():
             else:
                 opp['required_skills'] = []
 
-        return {"success": True, "opportunities": opportunities}
+        return {"success": True, "opportunities": opportunities, "next_cursor": next_cursor}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching opportunities: {str(e)}")
 
 
 @router.post("/filter")
-async def filter_opportunities(filters: OpportunityFilter):
-    """Filter opportunities by skills, location, deadline"""
+async def filter_opportunities(filters: OpportunityFilter, limit: int = DEFAULT_PAGE_SIZE,
+                               cursor: Optional[str] = None):
+    """Filter active opportunities by skills, location, deadline using the in-memory catalog"""
+    limit = clamp_page_size(limit)
+
+    after = None
+    if cursor:
+        try:
+            deadline, opportunity_id = decode_cursor(cursor, 2)
+            after = order_key(deadline, int(opportunity_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    try:
+        snapshot = catalog.snapshot()
+        positions = snapshot.filter(
+            skill_ids=filters.skill_ids,
+            location=filters.location,
+            deadline_after=filters.deadline_after,
+            after=after
+        )
+
+        rows = [snapshot.rows[i] for i in positions[:limit + 1]]
+        opportunities, next_cursor = paginate(rows, limit, deadline_key)
+
+        return {
+            "success": True,
+            "opportunities": opportunities,
+            "count": len(opportunities),
+            "next_cursor": next_cursor
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error filtering opportunities: {str(e)}")
+
+
+def search_query(search, limit, cursor=None):
+    """(query, params) for one page of full-text results, by relevance"""
+    query = """
+            SELECT o.*, GROUP_CONCAT(DISTINCT s.skill_name) as required_skills,
+                   MATCH(o.title, o.description, o.company_name) AGAINST (%s IN NATURAL LANGUAGE MODE) as relevance
+            FROM opportunities o
+                     LEFT JOIN opportunity_skills os ON o.opportunity_id = os.opportunity_id
+                     LEFT JOIN skills s ON os.skill_id = s.skill_id
+            WHERE MATCH(o.title, o.description, o.company_name) AGAINST (%s IN NATURAL LANGUAGE MODE) \
+            """
+    params = [search.query, search.query]
+    query = apply_filters(query, params, search)
+    query += " GROUP BY o.opportunity_id"
+
+    # Keyset predicate for rows after (relevance DESC, opportunity_id ASC)
+    if cursor:
+        try:
+            relevance, opportunity_id = decode_cursor(cursor, 2)
+            relevance, opportunity_id = float(relevance), int(opportunity_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        query += " HAVING relevance < %s OR (relevance = %s AND o.opportunity_id > %s)"
+        params.extend([relevance, relevance, opportunity_id])
+
+    query += " ORDER BY relevance DESC, o.opportunity_id ASC LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
+
+@router.post("/search")
+async def search_opportunities(search: OpportunitySearch, limit: int = DEFAULT_PAGE_SIZE,
+                               cursor: Optional[str] = None):
+    """Full-text search over title, description and company, ranked by relevance"""
+    limit = clamp_page_size(limit)
+
+    if not search.query.strip():
+        raise HTTPException(status_code=400, detail="Search query is required")
+
     try:
-        query = """
-                SELECT DISTINCT o.*, GROUP_CONCAT(DISTINCT s.skill_name) as required_skills
-                FROM opportunities o
-                         LEFT JOIN opportunity_skills os ON o.opportunity_id = os.opportunity_id
-                         LEFT JOIN skills s ON os.skill_id = s.skill_id
-                WHERE 1 = 1 \
-                """
-        params = []
-
-        # Filter by skills
-        if filters.skill_ids and len(filters.skill_ids) > 0:
-            placeholders = ','.join(['%s'] * len(filters.skill_ids))
-            query += f" AND o.opportunity_id IN (SELECT opportunity_id FROM opportunity_skills WHERE skill_id IN ({placeholders}))"
-            params.extend(filters.skill_ids)
-
-        # Filter by location
-        if filters.location:
-            query += " AND o.location LIKE %s"
-            params.append(f"%{filters.location}%")
-
-        # Filter by deadline
-        if filters.deadline_after:
-            query += " AND o.deadline >= %s"
-            params.append(filters.deadline_after)
-
-        query += " GROUP BY o.opportunity_id ORDER BY o.deadline ASC"
-
-        opportunities = fetch_all(query, tuple(params))
+        query, params = search_query(search, limit, cursor)
+        opportunities, next_cursor = paginate(
+            fetch_all(query, tuple(params)),
+            limit,
+            lambda o: (o['relevance'], o['opportunity_id'])
+        )
 
         # Format results
         for opp in opportunities:
@@ -73,24 +201,49 @@ async def filter_opportunities(filters: OpportunityFilter):
             else:
                 opp['required_skills'] = []
 
-        return {"success": True, "opportunities": opportunities, "count": len(opportunities)}
+        return {
+            "success": True,
+            "query": search.query,
+            "opportunities": opportunities,
+            "count": len(opportunities),
+            "next_cursor": next_cursor
+        }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error filtering opportunities: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching opportunities: {str(e)}")
 
 
-@router.post("/save/{opportunity_id}")
-async def save_opportunity(opportunity_id: int, authorization: str = Header(None)):
-    """Save/bookmark an opportunity"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
+@router.get("/recommended")
+async def get_recommended_opportunities(top_k: int = 10, profile: dict = Depends(get_current_profile)):
+    """Rank open opportunities by how well they match the user's skills"""
+    top_k = clamp_page_size(top_k)
 
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
+    try:
+        user_skills = {s['skill_id']: s['proficiency'] for s in profile['skills']}
+
+        snapshot = catalog.snapshot()
+        recommendations = []
+        for position, coverage, score in snapshot.recommend(user_skills, top_k):
+            matched, missing = snapshot.skill_gap(position, user_skills)
+            recommendations.append({
+                **snapshot.rows[position],
+                "match_score": round(score, 3),
+                "coverage": round(coverage, 3),
+                "matched_skills": matched,
+                "missing_skills": missing
+            })
+
+        return {"success": True, "opportunities": recommendations, "count": len(recommendations)}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching recommendations: {str(e)}")
 
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
 
+@router.post("/save/{opportunity_id}")
+async def save_opportunity(opportunity_id: int, user_id: int = Depends(get_current_user_id)):
+    """Save/bookmark an opportunity"""
     try:
         # Check if opportunity exists
         opp = fetch_one("SELECT opportunity_id FROM opportunities WHERE opportunity_id = %s", (opportunity_id,))
@@ -121,17 +274,8 @@ async def save_opportunity(opportunity_id: int, authorization: str = Header(None
 
 
 @router.delete("/unsave/{opportunity_id}")
-async def unsave_opportunity(opportunity_id: int, authorization: str = Header(None)):
+async def unsave_opportunity(opportunity_id: int, user_id: int = Depends(get_current_user_id)):
     """Remove saved opportunity"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
-
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
-
     try:
         result = execute_query(
             "DELETE FROM saved_opportunities WHERE user_id = %s AND opportunity_id = %s",
@@ -145,29 +289,10 @@ async def unsave_opportunity(opportunity_id: int, authorization: str = Header(No
 
 
 @router.get("/saved")
-async def get_saved_opportunities(authorization: str = Header(None)):
+async def get_saved_opportunities(user_id: int = Depends(get_current_user_id)):
     """Get user's saved opportunities"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
-
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
-
     try:
-        query = """
-                SELECT o.*, GROUP_CONCAT(s.skill_name) as required_skills, so.created_at as saved_at
-                FROM saved_opportunities so
-                         JOIN opportunities o ON so.opportunity_id = o.opportunity_id
-                         LEFT JOIN opportunity_skills os ON o.opportunity_id = os.opportunity_id
-                         LEFT JOIN skills s ON os.skill_id = s.skill_id
-                WHERE so.user_id = %s
-                GROUP BY o.opportunity_id
-                ORDER BY so.created_at DESC \
-                """
-        opportunities = fetch_all(query, (user_id,))
+        opportunities = fetch_all(SAVED_QUERY, (user_id,))
 
         # Format the results
         for opp in opportunities:
@@ -183,17 +308,8 @@ async def get_saved_opportunities(authorization: str = Header(None)):
 
 
 @router.get("/is_saved/{opportunity_id}")
-async def check_if_saved(opportunity_id: int, authorization: str = Header(None)):
+async def check_if_saved(opportunity_id: int, user_id: int = Depends(get_current_user_id)):
     """Check if opportunity is saved by user"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
-
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
-
     try:
         saved = fetch_one(
             "SELECT id FROM saved_opportunities WHERE user_id = %s AND opportunity_id = %s",
@@ -0,0 +1,56 @@
+import base64
+import json
+from datetime import date, datetime
+
+# Page size limits for list endpoints
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def clamp_page_size(limit):
+    """Clamp a requested page size into [1, MAX_PAGE_SIZE]"""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def _to_json_value(value):
+    """Convert date/datetime keys to ISO strings so they survive JSON"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row into an opaque cursor string"""
+    payload = json.dumps([_to_json_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor back into its list of key values.
+
+    Raises ValueError if the cursor is malformed or has the wrong number of keys.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+
+    return values
+
+
+def paginate(rows, limit, key):
+    """Split a LIMIT n+1 result into (page, next_cursor).
+
+    `key` maps a row to the tuple of values the query is ordered by.
+    """
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[:limit]
+    return page, encode_cursor(key(page[-1]))
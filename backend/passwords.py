@@ -0,0 +1,93 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Salted scrypt password hashing, run in a bounded thread pool so it never
+# blocks the event loop (hashlib.scrypt releases the GIL while it works).
+#
+# Stored format: scrypt$<log2 N>$<r>$<p>$<salt>$<hash>
+# Legacy accounts hold an unsalted SHA-256 hex digest; they are accepted
+# once and rehashed on the next successful login.
+
+PASSWORD_HASH_COST = int(os.getenv('PASSWORD_HASH_COST', 14))  # log2 of scrypt N
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip('=')
+
+
+def _unb64(data: str) -> bytes:
+    return base64.b64decode(data + '=' * (-len(data) % 4))
+
+
+def _scrypt(password: str, salt: bytes, cost: int, r: int, p: int) -> bytes:
+    n = 2 ** cost
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * r * n, dklen=HASH_BYTES
+    )
+
+
+def is_legacy_hash(stored: str) -> bool:
+    """Check for an old unsalted SHA-256 hex digest"""
+    return not stored.startswith("scrypt$")
+
+
+def hash_password_sync(password: str, cost: int = None) -> str:
+    """Hash a password with a fresh random salt"""
+    cost = cost or PASSWORD_HASH_COST
+    salt = os.urandom(SALT_BYTES)
+    digest = _scrypt(password, salt, cost, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${cost}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password_sync(password: str, stored: str) -> bool:
+    """Check a password against a stored scrypt or legacy SHA-256 hash"""
+    if not stored:
+        return False
+
+    if is_legacy_hash(stored):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, stored)
+
+    try:
+        _, cost, r, p, salt, digest = stored.split("$")
+        expected = _unb64(digest)
+        actual = _scrypt(password, _unb64(salt), int(cost), int(r), int(p))
+    except (ValueError, TypeError):
+        return False
+
+    return hmac.compare_digest(actual, expected)
+
+
+def needs_rehash(stored: str, cost: int = None) -> bool:
+    """True for legacy hashes or hashes made with a different cost"""
+    if is_legacy_hash(stored):
+        return True
+    try:
+        return int(stored.split("$")[1]) != (cost or PASSWORD_HASH_COST)
+    except (IndexError, ValueError):
+        return True
+
+
+async def hash_password(password: str, cost: int = None) -> str:
+    """Hash a password on the hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, hash_password_sync, password, cost)
+
+
+async def verify_password(password: str, stored: str) -> bool:
+    """Verify a password on the hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, verify_password_sync, password, stored)
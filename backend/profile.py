@@ -1,7 +1,7 @@
-from fastapi import APIRouter, HTTPException, Header, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from backend.models import UpdateProfile, UserProfile
 from backend.database import fetch_one, fetch_all, execute_query
-from backend.auth import verify_session
+from backend.dependencies import get_current_user_id, load_profile, invalidate_profile
 import boto3
 import os
 from datetime import datetime
@@ -22,43 +22,11 @@ BUCKET_NAME = os.getenv('AWS_S3_BUCKET_NAME')
 router = APIRouter(prefix="/user", tags=["User Profile"])
 
 
-def get_complete_profile(user_id):
-    """Get complete user profile with skills"""
-    user = fetch_one(
-        "SELECT user_id, name, email, degree, career_goal, resume_url FROM users WHERE user_id = %s",
-        (user_id,)
-    )
-
-    if not user:
-        return None
-
-    # Get user skills with proficiency
-    skills = fetch_all("""
-                       SELECT s.skill_id, s.skill_name, us.proficiency
-                       FROM user_skills us
-                                JOIN skills s ON us.skill_id = s.skill_id
-                       WHERE us.user_id = %s
-                       ORDER BY us.proficiency DESC
-                       """, (user_id,))
-
-    user['skills'] = skills or []
-    return user
-
-
 @router.get("/profile")
-async def get_profile(authorization: str = Header(None)):
+async def get_profile(user_id: int = Depends(get_current_user_id)):
     """Get user profile"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
-
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
-
     try:
-        profile = get_complete_profile(user_id)
+        profile = load_profile(user_id)
 
         if not profile:
             raise HTTPException(status_code=404, detail="User not found")
@@ -75,17 +43,8 @@ async def get_profile(authorization: str = Header(None)):
 
 
 @router.post("/update")
-async def update_profile(profile_update: UpdateProfile, authorization: str = Header(None)):
+async def update_profile(profile_update: UpdateProfile, user_id: int = Depends(get_current_user_id)):
     """Update user profile"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
-
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
-
     try:
         # Update basic profile info
         update_fields = []
@@ -117,7 +76,8 @@ async def update_profile(profile_update: UpdateProfile, authorization: str = Hea
                 )
 
         # Get updated profile
-        updated_profile = get_complete_profile(user_id)
+        invalidate_profile(user_id)
+        updated_profile = load_profile(user_id)
 
         return {
             "success": True,
@@ -130,17 +90,8 @@ async def update_profile(profile_update: UpdateProfile, authorization: str = Hea
 
 
 @router.post("/upload_resume")
-async def upload_resume(file: UploadFile = File(...), authorization: str = Header(None)):
+async def upload_resume(file: UploadFile = File(...), user_id: int = Depends(get_current_user_id)):
     """Upload resume to AWS S3"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
-
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
-
     try:
         # Validate file type
         if not file.filename.endswith('.pdf'):
@@ -173,6 +124,7 @@ async def upload_resume(file: UploadFile = File(...), authorization: str = Heade
             "UPDATE users SET resume_url = %s WHERE user_id = %s",
             (s3_url, user_id)
         )
+        invalidate_profile(user_id)
 
         return {
             "success": True,
@@ -201,17 +153,8 @@ async def get_all_skills():
 
 
 @router.get("/stats")
-async def get_user_stats(authorization: str = Header(None)):
+async def get_user_stats(user_id: int = Depends(get_current_user_id)):
     """Get user statistics"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_session(token)
-
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid session")
-
     try:
         # Count user skills
         skill_count = fetch_one(
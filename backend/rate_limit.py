@@ -0,0 +1,191 @@
+import asyncio
+import math
+import os
+import sqlite3
+import threading
+import time
+from fastapi import Depends, HTTPException
+from backend.dependencies import get_current_user_id
+from backend import metrics
+
+# Per-user token buckets for the LLM-backed routes, so one student cannot
+# spend the Gemini quota for everyone. Each limit has a capacity (burst)
+# and refills at capacity per period; an empty bucket answers 429 with
+# Retry-After. Routes that share a limit name share the bucket, e.g. the
+# plain and streaming coach chat.
+#
+# Limits are "requests/seconds" and can be overridden per limit with
+# RATE_LIMIT_<NAME>, e.g. RATE_LIMIT_COACH_CHAT=20/60. RATE_LIMIT_STORE
+# picks where buckets live:
+#   memory              this process only (default)
+#   sqlite:<path>       a SQLite file shared by every worker on the host
+
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'memory')
+RATE_LIMIT_MAX_KEYS = 100000  # idle buckets are swept past this many
+RATE_LIMIT_SWEEP_SECONDS = 300  # how often the SQLite store deletes refilled buckets
+
+DEFAULT_LIMITS = {
+    "coach_chat": "10/60",
+    "career_path": "5/60",
+    "degree_map": "10/60",
+}
+
+
+def parse_limit(spec):
+    """(capacity, tokens per second) from "requests/seconds" """
+    requests, _, seconds = spec.partition("/")
+    capacity = float(requests)
+    return capacity, capacity / float(seconds or 60)
+
+
+def get_limit(name):
+    return parse_limit(os.getenv(f"RATE_LIMIT_{name.upper()}", DEFAULT_LIMITS[name]))
+
+
+class MemoryStore:
+    """Buckets in a dict, for one process
+
+    take() never awaits, so calls from the event loop cannot interleave
+    and need no lock; a bucket is one tuple replaced in a single store.
+    """
+
+    blocking = False
+
+    def __init__(self, max_keys=RATE_LIMIT_MAX_KEYS, clock=time.monotonic):
+        self.buckets = {}  # key -> (tokens, updated, seconds to refill from empty)
+        self.max_keys = max_keys
+        self.clock = clock
+
+    def take(self, key, capacity, rate):
+        """Spend a token; returns 0 if allowed, else seconds until one is available"""
+        now = self.clock()
+        bucket = self.buckets.get(key)
+        tokens = capacity if bucket is None else min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        full_after = capacity / rate
+
+        if tokens >= 1:
+            self.buckets[key] = (tokens - 1, now, full_after)
+            if bucket is None and len(self.buckets) > self.max_keys:
+                self._sweep(now)
+            return 0.0
+
+        self.buckets[key] = (tokens, now, full_after)
+        return (1 - tokens) / rate
+
+    def _sweep(self, now):
+        """Forget buckets idle long enough to have refilled under their own limit"""
+        for key, (_, updated, full_after) in list(self.buckets.items()):
+            if now - updated > full_after:
+                del self.buckets[key]
+
+
+class SQLiteStore:
+    """Buckets in a SQLite file so every worker process shares them
+
+    Each row records when its bucket will be full again; rows past that
+    are deleted every sweep_seconds, since a missing row means a full bucket.
+    """
+
+    blocking = True
+
+    def __init__(self, path, sweep_seconds=RATE_LIMIT_SWEEP_SECONDS):
+        self.path = path
+        self.sweep_seconds = sweep_seconds
+        self.swept_at = 0.0
+        self.local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, "
+            "full_at REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(buckets)")}
+        if "full_at" not in columns:
+            # Files from before full_at existed: old rows are swept on the first pass
+            conn.execute("ALTER TABLE buckets ADD COLUMN full_at REAL NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets_full_at ON buckets (full_at)")
+
+    def _connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.local.conn = conn
+        return conn
+
+    def take(self, key, capacity, rate):
+        conn = self._connect()
+        now = time.time()  # wall clock: monotonic clocks differ between processes
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + max(now - row[1], 0) * rate)
+            retry_after = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if tokens >= 1:
+                tokens -= 1
+            full_at = now + (capacity - tokens) / rate
+            conn.execute(
+                "REPLACE INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                (key, tokens, now, full_at)
+            )
+            if now - self.swept_at > self.sweep_seconds:
+                self.swept_at = now
+                conn.execute("DELETE FROM buckets WHERE full_at < ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+
+def create_store(spec):
+    if spec == "memory":
+        return MemoryStore()
+    if spec.startswith("sqlite:"):
+        return SQLiteStore(spec[len("sqlite:"):])
+    raise ValueError(f"Unknown rate limit store: {spec}")
+
+
+store = create_store(RATE_LIMIT_STORE)
+
+
+def set_store(new_store):
+    """Swap the bucket store, e.g. for tests"""
+    global store
+    store = new_store
+
+
+async def check(name, user_id):
+    """Spend one request from the user's bucket for a limit or raise 429"""
+    capacity, rate = get_limit(name)
+    key = f"{name}:{user_id}"
+
+    try:
+        if store.blocking:
+            retry_after = await asyncio.to_thread(store.take, key, capacity, rate)
+        else:
+            retry_after = store.take(key, capacity, rate)
+    except Exception as e:
+        # Fail open: a broken store must not take the endpoints down with it
+        print(f"Rate limit store error: {e}")
+        return
+
+    if retry_after:
+        metrics.increment(f"rate_limit.{name}.limited")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+def rate_limit(name):
+    """Route dependency enforcing the named per-user limit"""
+    get_limit(name)  # fail at import time on a bad limit
+
+    async def dependency(user_id: int = Depends(get_current_user_id)):
+        if RATE_LIMIT_ENABLED:
+            await check(name, user_id)
+
+    return dependency
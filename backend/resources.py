@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
+from typing import Optional
 from backend.models import ResourceSearch
 from backend.database import fetch_all
 from backend.faiss_utils import search_faiss
+from backend.pagination import DEFAULT_PAGE_SIZE, clamp_page_size, decode_cursor, paginate
 
 router = APIRouter(prefix="/resources", tags=["Learning Resources"])
 
@@ -36,16 +38,46 @@ async def search_resources(search: ResourceSearch):
         raise HTTPException(status_code=500, detail=f"Error searching resources: {str(e)}")
 
 
+def list_query(limit, cursor=None):
+    """(query, params) for one page of resources, newest first"""
+    query = "SELECT * FROM resources WHERE 1 = 1"
+    params = []
+
+    # Keyset predicate for rows after (created_at, resource_id)
+    if cursor:
+        try:
+            created_at, resource_id = decode_cursor(cursor, 2)
+            resource_id = int(resource_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        query += " AND (created_at < %s OR (created_at = %s AND resource_id < %s))"
+        params.extend([created_at, created_at, resource_id])
+
+    query += " ORDER BY created_at DESC, resource_id DESC LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
+
 @router.get("/all")
-async def get_all_resources():
-    """Get all resources"""
+async def get_all_resources(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
+    """Get resources one page at a time, newest first"""
+    limit = clamp_page_size(limit)
+
+    query, params = list_query(limit, cursor)
+
     try:
-        resources = fetch_all("SELECT * FROM resources ORDER BY created_at DESC")
+        resources, next_cursor = paginate(
+            fetch_all(query, tuple(params)),
+            limit,
+            lambda r: (r['created_at'], r['resource_id'])
+        )
 
         return {
             "success": True,
             "resources": resources,
-            "count": len(resources)
+            "count": len(resources),
+            "next_cursor": next_cursor
         }
 
     except Exception as e:
@@ -2,10 +2,18 @@ import hashlib
 import time
 import random
 from datetime import datetime, timedelta
-from backend.database import fetch_one, execute_query, fetch_all
+from backend.database import fetch_one, execute_query, fetch_all, bump_catalog_version
 import requests
 from bs4 import BeautifulSoup
 
+DUPLICATE_QUERY = "SELECT * FROM {table} WHERE url_hash = %s"
+DEACTIVATE_STALE_QUERY = """
+                         UPDATE {table}
+                         SET is_active = FALSE
+                         WHERE last_updated < DATE_SUB(NOW(), INTERVAL %s DAY)
+                           AND is_active = TRUE \
+                         """
+
 
 class ScraperBase:
     """Base class for all scrapers with common utilities"""
@@ -43,8 +51,7 @@ class ScraperBase:
 
     def check_duplicate(self, url_hash, table='opportunities'):
         """Check if item already exists in database"""
-        query = f"SELECT * FROM {table} WHERE url_hash = %s"
-        result = fetch_one(query, (url_hash,))
+        result = fetch_one(DUPLICATE_QUERY.format(table=table), (url_hash,))
         return result
 
     def random_delay(self, min_seconds=1, max_seconds=3):
@@ -178,6 +185,7 @@ class OpportunityInserter:
                         opportunity_data.get('job_type'),
                         existing['opportunity_id']
                     ))
+                    bump_catalog_version('opportunities')
                     return existing['opportunity_id'], 'updated'
                 else:
                     # Mark as active (in case it was inactive)
@@ -185,6 +193,7 @@ class OpportunityInserter:
                         "UPDATE opportunities SET is_active=TRUE, last_updated=NOW() WHERE opportunity_id=%s",
                         (existing['opportunity_id'],)
                     )
+                    bump_catalog_version('opportunities')
                     return existing['opportunity_id'], 'duplicate'
             else:
                 # Insert new
@@ -217,6 +226,7 @@ class OpportunityInserter:
                         except:
                             pass
 
+                bump_catalog_version('opportunities')
                 return opp_id, 'added'
 
         except Exception as e:
@@ -303,13 +313,8 @@ class CourseInserter:
 def cleanup_old_opportunities(days=30):
     """Mark opportunities older than X days as inactive"""
     try:
-        query = """
-                UPDATE opportunities
-                SET is_active = FALSE
-                WHERE last_updated < DATE_SUB(NOW(), INTERVAL %s DAY)
-                  AND is_active = TRUE \
-                """
-        execute_query(query, (days,))
+        execute_query(DEACTIVATE_STALE_QUERY.format(table='opportunities'), (days,))
+        bump_catalog_version('opportunities')
         print(f"✅ Cleaned up opportunities older than {days} days")
     except Exception as e:
         print(f"Error cleaning up old opportunities: {e}")
@@ -318,13 +323,7 @@ def cleanup_old_opportunities(days=30):
 def cleanup_old_courses(days=90):
     """Mark courses older than X days as inactive"""
     try:
-        query = """
-                UPDATE courses
-                SET is_active = FALSE
-                WHERE last_updated < DATE_SUB(NOW(), INTERVAL %s DAY)
-                  AND is_active = TRUE \
-                """
-        execute_query(query, (days,))
+        execute_query(DEACTIVATE_STALE_QUERY.format(table='courses'), (days,))
         print(f"✅ Cleaned up courses older than {days} days")
     except Exception as e:
         print(f"Error cleaning up old courses: {e}")
\ No newline at end of file
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+import faiss
+import numpy as np
+
+# Similarity cache for LLM answers. Questions are stored as normalized
+# embeddings in one FAISS inner-product index (inner product == cosine
+# similarity); a lookup only considers entries from the caller's bucket and
+# returns the best one at or above the similarity threshold.
+# Entries expire after ttl seconds and the least recently used entry is
+# evicted once the cache is full.
+
+
+class SemanticCache:
+    def __init__(self, dimension, max_size=1000, threshold=0.9, ttl=86400):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl = ttl
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+        self.entries = OrderedDict()  # id -> (bucket, value, created_at), oldest use first
+        self.buckets = {}  # bucket -> set of ids
+        self.next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype='float32').reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _remove(self, ids):
+        for entry_id in ids:
+            bucket = self.entries.pop(entry_id)[0]
+            self.buckets[bucket].discard(entry_id)
+            if not self.buckets[bucket]:
+                del self.buckets[bucket]
+        self.index.remove_ids(np.array(ids, dtype='int64'))
+
+    def get(self, vector, bucket, now=None):
+        """Best cached value for a similar vector in the bucket, or None"""
+        now = time.time() if now is None else now
+
+        with self.lock:
+            ids = self.buckets.get(bucket)
+            if not ids:
+                self.misses += 1
+                return None
+
+            expired = [i for i in ids if now - self.entries[i][2] > self.ttl]
+            if expired:
+                self._remove(expired)
+                ids = self.buckets.get(bucket)
+                if not ids:
+                    self.misses += 1
+                    return None
+
+            selector = faiss.IDSelectorBatch(np.fromiter(ids, dtype='int64'))
+            scores, found = self.index.search(
+                self._normalize(vector), 1, params=faiss.SearchParameters(sel=selector)
+            )
+
+            entry_id, score = int(found[0][0]), float(scores[0][0])
+            if entry_id < 0 or score < self.threshold:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(entry_id)
+            self.hits += 1
+            return self.entries[entry_id][1]
+
+    def put(self, vector, bucket, value, now=None):
+        """Cache a value, evicting the least recently used entry if full"""
+        now = time.time() if now is None else now
+
+        with self.lock:
+            if len(self.entries) >= self.max_size:
+                self._remove([next(iter(self.entries))])
+
+            entry_id = self.next_id
+            self.next_id += 1
+            self.index.add_with_ids(self._normalize(vector), np.array([entry_id], dtype='int64'))
+            self.entries[entry_id] = (bucket, value, now)
+            self.buckets.setdefault(bucket, set()).add(entry_id)
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return round(self.hits / total, 4) if total else 0.0
@@ -0,0 +1,71 @@
+import base64
+import hashlib
+import hmac
+import threading
+import uuid
+from datetime import datetime
+
+# Signed session tokens: "s1.<user_id>.<expires_ts>.<token_id>.<signature>".
+# They carry everything verify_session needs, so checking one is pure CPU.
+TOKEN_PREFIX = "s1"
+
+
+def _sign(payload: str, secret: str) -> str:
+    digest = hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode().rstrip('=')
+
+
+def is_signed_token(token: str) -> bool:
+    """Check if a token uses the signed format (uuid tokens never contain '.')"""
+    return token.startswith(TOKEN_PREFIX + ".")
+
+
+def create_signed_token(user_id: int, expires_at: datetime, secret: str) -> str:
+    """Issue a signed token for user_id valid until expires_at"""
+    token_id = uuid.uuid4().hex
+    payload = f"{TOKEN_PREFIX}.{user_id}.{int(expires_at.timestamp())}.{token_id}"
+    return f"{payload}.{_sign(payload, secret)}"
+
+
+def parse_signed_token(token: str, secret: str):
+    """Verify a signed token; returns (user_id, expires_at, token_id) or None"""
+    try:
+        prefix, user_id, expires_ts, token_id, signature = token.split(".")
+    except ValueError:
+        return None
+
+    if prefix != TOKEN_PREFIX:
+        return None
+
+    expected = _sign(f"{prefix}.{user_id}.{expires_ts}.{token_id}", secret)
+    if not hmac.compare_digest(signature, expected):
+        return None
+
+    try:
+        return int(user_id), datetime.fromtimestamp(int(expires_ts)), token_id
+    except ValueError:
+        return None
+
+
+class DenyList:
+    """Revoked token ids, kept only until the token would have expired anyway"""
+
+    def __init__(self):
+        self._revoked = {}  # token_id -> expires_at
+        self._lock = threading.Lock()
+
+    def __contains__(self, token_id):
+        return token_id in self._revoked
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def add(self, token_id, expires_at):
+        with self._lock:
+            self._revoked[token_id] = expires_at
+
+    def prune(self, now=None):
+        """Forget revocations for tokens that are past expiry"""
+        now = now or datetime.now()
+        with self._lock:
+            self._revoked = {t: exp for t, exp in self._revoked.items() if exp > now}
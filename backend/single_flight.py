@@ -0,0 +1,38 @@
+import asyncio
+
+# Request coalescing: concurrent callers asking for the same key share one
+# in-flight call and its result instead of each starting their own.
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; later callers join it"""
+
+    def __init__(self):
+        self._calls = {}
+        self.started = 0
+        self.joined = 0
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key, fn):
+        """Await fn() for key, or the call already running for it"""
+        task = self._calls.get(key)
+
+        if task is None:
+            self.started += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.joined += 1
+
+        # A caller that disconnects must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the error as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
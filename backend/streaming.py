@@ -0,0 +1,55 @@
+import json
+
+# Server-sent event helpers for streaming LLM output to the browser.
+#
+# Streamed answers are plain text followed by a marker line and a JSON tail,
+# e.g. "...answer text...\nSUGGESTIONS: [...]". MarkerSplitter forwards the
+# text part as it arrives and keeps back anything after the marker.
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"  # stop nginx from buffering the stream
+}
+
+
+def format_sse(event, data):
+    """Encode one SSE frame with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class MarkerSplitter:
+    """Split a chunked stream into text before a marker and the tail after it"""
+
+    def __init__(self, marker):
+        self.marker = marker
+        self.pending = ""
+        self.tail = None  # set once the marker has been seen
+
+    def feed(self, chunk):
+        """Add a chunk and return the text that is safe to forward now"""
+        if self.tail is not None:
+            self.tail += chunk
+            return ""
+
+        self.pending += chunk
+        index = self.pending.find(self.marker)
+        if index >= 0:
+            text, self.tail = self.pending[:index], self.pending[index + len(self.marker):]
+            self.pending = ""
+            return text
+
+        # Hold back a suffix that could be the start of a split marker
+        keep = 0
+        for size in range(min(len(self.marker) - 1, len(self.pending)), 0, -1):
+            if self.marker.startswith(self.pending[-size:]):
+                keep = size
+                break
+
+        text = self.pending[:len(self.pending) - keep]
+        self.pending = self.pending[len(self.pending) - keep:]
+        return text
+
+    def finish(self):
+        """Return (remaining text, tail or None) at the end of the stream"""
+        text, self.pending = self.pending, ""
+        return text, self.tail
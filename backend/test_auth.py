@@ -0,0 +1,19 @@
+from backend import auth, database
+
+
+def test_sweep_deletes_in_batches(monkeypatch):
+    """Test the sweeper repeats full batches and stops at the first short one"""
+    deleted = {"sessions": [100, 100, 37], "revoked_tokens": [5]}
+    calls = []
+
+    def execute_write(query, params):
+        table = query.split()[2]
+        calls.append((table, params))
+        return deleted[table].pop(0)
+
+    monkeypatch.setattr(database, "execute_write", execute_write)
+
+    assert auth.sweep_expired_sessions(batch_size=100) == 242
+    assert calls == [("sessions", (100,))] * 3 + [("revoked_tokens", (100,))]
+    assert not deleted["sessions"], "no DELETE after the short batch"
+    print("✅ Session sweep test passed")
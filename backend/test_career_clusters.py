@@ -0,0 +1,61 @@
+from backend import career_clusters
+from backend.career_clusters import ClusterIndex, cluster_profiles, representative
+import asyncio
+import re
+import numpy as np
+import pytest
+
+VOCAB = ["computer", "science", "commerce", "software", "engineer", "accountant", "python", "sql", "tally", "excel"]
+
+
+class BagOfWords:
+    """Stands in for the sentence model: one dimension per vocabulary word"""
+
+    def encode(self, texts, normalize_embeddings=True):
+        vectors = np.zeros((len(texts), len(VOCAB)), dtype='float32')
+        for i, text in enumerate(texts):
+            for word in re.findall(r"[a-z]+", text.lower()):
+                if word in VOCAB:
+                    vectors[i, VOCAB.index(word)] += 1
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+def student(degree, goal, skills):
+    return {"degree": degree, "career_goal": goal, "skills": skills}
+
+
+@pytest.fixture
+def profiles(monkeypatch):
+    monkeypatch.setattr(career_clusters, "get_model", lambda: BagOfWords())
+    engineers = [student("B.Tech Computer Science", "Software Engineer", ["Python", "SQL"][:1 + i % 2]) for i in range(6)]
+    accountants = [student("B.Com", "Accountant", ["Tally", "Excel"]) for _ in range(4)]
+    return engineers + accountants
+
+
+def test_representative_profile():
+    """Test a cluster is described by its common degree, goal and shared skills"""
+    members = [
+        student("B.Tech CSE", "Data Scientist", ["Python", "SQL"]),
+        student("btech cse", "data scientist", ["Python", "Statistics"]),
+        student("B.Sc Maths", "Data Scientist", ["Python"]),
+    ]
+    degree, skills, goal = representative(members)
+    assert degree == "B.Tech CSE" and goal == "Data Scientist"
+    assert skills[0] == "Python" and set(skills) <= {"Python", "SQL", "Statistics"}
+    print("✅ Representative profile test passed")
+
+
+def test_clusters_and_nearest_lookup(profiles, monkeypatch):
+    """Test profiles split into their groups and lookups respect the threshold"""
+    clusters = cluster_profiles(profiles, k=2)
+
+    assert [c['members'] for c in clusters] == [6, 4]
+    assert clusters[0]['career_goal'] == "Software Engineer" and clusters[1]['skills'] == ["Tally", "Excel"]
+
+    rows = [{**c, "centroid": c['centroid'].tolist(), "career_paths": [{"title": c['career_goal']}]} for c in clusters]
+    monkeypatch.setattr(career_clusters, "get_clusters", lambda version: ClusterIndex(rows, version=1))
+
+    match = asyncio.run(career_clusters.lookup("B.Com", ["Excel", "Tally"], "Accountant", "v1"))
+    assert match['career_paths'] == [{"title": "Accountant"}] and match['similarity'] > 0.99
+    assert asyncio.run(career_clusters.lookup("MBBS", ["Anatomy"], "Doctor", "v1")) is None
+    print("✅ Career cluster test passed")
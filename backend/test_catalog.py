@@ -0,0 +1,89 @@
+from backend.catalog import CatalogSnapshot, order_key
+from datetime import date, datetime
+
+
+def make_entries():
+    """Small catalog: (id, deadline, location, source, skill_ids)"""
+    data = [
+        (1, date(2025, 1, 10), 'Bangalore', 'Internshala', [1, 3]),
+        (2, date(2025, 1, 5), 'Remote', 'LinkedIn', [1]),
+        (3, None, 'Pune', 'Internshala', [3]),
+        (4, date(2025, 2, 1), 'Bangalore, India', 'LinkedIn', []),
+        (5, date(2025, 1, 5), None, 'AngelList', [2]),
+    ]
+    entries = {}
+    for opp_id, deadline, location, source, skill_ids in data:
+        row = {
+            'opportunity_id': opp_id,
+            'deadline': deadline,
+            'location': location,
+            'source': source,
+            'required_skills': [],
+            'last_updated': datetime(2025, 1, 1)
+        }
+        entries[opp_id] = (row, skill_ids)
+    return entries
+
+
+def ids(snapshot, positions):
+    return [snapshot.rows[i]['opportunity_id'] for i in positions]
+
+
+def test_deadline_order():
+    """Test rows are ordered by deadline with undated rows last"""
+    snapshot = CatalogSnapshot(make_entries())
+    assert ids(snapshot, snapshot.filter()) == [2, 5, 1, 4, 3]
+    print("✅ Deadline order test passed")
+
+
+def test_filters():
+    """Test skill, location and deadline filters match the SQL semantics"""
+    snapshot = CatalogSnapshot(make_entries())
+
+    assert ids(snapshot, snapshot.filter(skill_ids=[3])) == [1, 3]
+    assert ids(snapshot, snapshot.filter(skill_ids=[1, 2])) == [2, 5, 1], "Any of the skills should match"
+    assert ids(snapshot, snapshot.filter(skill_ids=[99])) == []
+    assert ids(snapshot, snapshot.filter(location='bangalore')) == [1, 4], "Location is a substring match"
+    assert ids(snapshot, snapshot.filter(deadline_after=date(2025, 1, 10))) == [1, 4]
+    assert ids(snapshot, snapshot.filter(skill_ids=[1], location='remote')) == [2]
+    print("✅ Filter test passed")
+
+
+def test_cursor():
+    """Test `after` resumes strictly after the cursor key"""
+    snapshot = CatalogSnapshot(make_entries())
+    assert ids(snapshot, snapshot.filter(after=order_key('2025-01-05', 2))) == [5, 1, 4, 3]
+    assert ids(snapshot, snapshot.filter(after=order_key(date(2025, 2, 1), 4))) == [3]
+    assert ids(snapshot, snapshot.filter(after=order_key(None, 3))) == []
+    print("✅ Cursor test passed")
+
+
+def test_recommend():
+    """Test skill-match scoring, ranking and skill gaps"""
+    snapshot = CatalogSnapshot(make_entries(), skill_names={1: 'Python', 2: 'Java', 3: 'JavaScript'})
+    user_skills = {1: 5, 3: 2}
+
+    coverage, weighted = snapshot.score(user_skills)
+    by_id = dict(zip(ids(snapshot, range(len(snapshot))), zip(coverage, weighted)))
+    assert by_id[1] == (1.0, (1.0 + 0.4) / 2)
+    assert by_id[4] == (0.0, 0.0), "Opportunities without skills score zero"
+
+    ranked = snapshot.recommend(user_skills, top_k=2, today=date(2025, 1, 1))
+    assert ids(snapshot, [p for p, _, _ in ranked]) == [2, 1], "Full Python match outranks weaker mix"
+
+    position = ranked[1][0]
+    assert snapshot.skill_gap(position, {1: 5}) == (['Python'], ['JavaScript'])
+
+    # Expired opportunities are not recommended
+    ranked = snapshot.recommend(user_skills, top_k=5, today=date(2025, 1, 6))
+    assert 2 not in ids(snapshot, [p for p, _, _ in ranked])
+    print("✅ Recommendation test passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Opportunity Catalog...\n")
+
+    test_deadline_order()
+    test_filters()
+    test_cursor()
+    test_recommend()
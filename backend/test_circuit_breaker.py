@@ -0,0 +1,63 @@
+from backend.circuit_breaker import CircuitBreaker, CircuitOpen, CLOSED, OPEN, HALF_OPEN
+import pytest
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_opens_on_failure_rate_and_recovers():
+    """Test the breaker trips, waits, probes once, then closes"""
+    clock = Clock()
+    breaker = CircuitBreaker(window=10, failure_rate=0.5, min_calls=4, open_seconds=30, clock=clock)
+
+    for ok in (True, False, False):
+        breaker.record_success() if ok else breaker.record_failure()
+    assert breaker.state == CLOSED, "too few calls to judge"
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now = 31
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow(), "one probe at a time"
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+    print("✅ Circuit breaker recovery test passed")
+
+
+def test_failed_probe_reopens_and_abandoned_probe_is_released():
+    """Test probe failures reopen and cancelled probes free their slot"""
+    clock = Clock()
+    breaker = CircuitBreaker(min_calls=1, open_seconds=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 11
+    with pytest.raises(KeyboardInterrupt):
+        with breaker.call(failures=(TimeoutError,)):
+            raise KeyboardInterrupt()
+    assert breaker.state == HALF_OPEN and breaker.probing == 0
+
+    with pytest.raises(TimeoutError):
+        with breaker.call(failures=(TimeoutError,)):
+            raise TimeoutError()
+    assert breaker.state == OPEN and breaker.opened == 2
+
+    with pytest.raises(CircuitOpen):
+        with breaker.call(failures=(TimeoutError,)):
+            pass
+    print("✅ Circuit breaker probe test passed")
+
+
+def test_other_errors_are_neutral():
+    """Test errors outside `failures` neither trip nor reset the breaker"""
+    breaker = CircuitBreaker(window=10, failure_rate=0.75, min_calls=4)
+    for error in (TimeoutError, ValueError, TimeoutError, ValueError, TimeoutError, TimeoutError):
+        with pytest.raises(error):
+            with breaker.call(failures=(TimeoutError,)):
+                raise error()
+    assert breaker.state == OPEN, "only the timeouts were counted"
+    print("✅ Circuit breaker neutral error test passed")
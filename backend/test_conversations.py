@@ -0,0 +1,76 @@
+from backend import conversations
+from backend.conversations import Conversation, estimate_tokens, pack_turns
+import asyncio
+
+
+def turn(message_id, content, role="user"):
+    return {"message_id": message_id, "role": role, "content": content}
+
+
+def test_pack_turns_keeps_newest_within_budget():
+    """Test the window holds the newest turns and never exceeds the budget"""
+    turns = [turn(i, "word " * 40) for i in range(1, 21)]
+    budget = 300
+
+    dropped, kept = pack_turns(turns, budget)
+
+    assert dropped + kept == turns
+    assert kept[-1] == turns[-1] and len(kept) < len(turns)
+    assert sum(estimate_tokens(conversations.format_turn(t)) for t in kept) <= budget
+    print("✅ Turn packing test passed")
+
+
+def test_history_size_stays_flat():
+    """Test prompt history stops growing once the window is full"""
+    conversation = Conversation("c" * 32, user_id=1, summary="Wants a data analyst role by June.")
+    sizes = []
+
+    for i in range(1, 41):
+        conversation.turns.append(turn(i, f"Question {i} about SQL and dashboards " * 5))
+        sizes.append(estimate_tokens(conversation.history(budget=200)))
+
+    assert conversation.history().startswith("\nConversation so far:")
+    assert "data analyst role" in conversation.history(budget=200)
+    assert max(sizes[-20:]) <= 200 + estimate_tokens(conversation.summary) + 20
+    assert Conversation("d" * 32, user_id=1).history() == "", "new chats add nothing"
+    print("✅ Flat history test passed")
+
+
+def test_summarize_folds_overflow(monkeypatch):
+    """Test overflow turns are folded into the summary and dropped from memory"""
+    writes = []
+
+    async def generate(prompt, endpoint=None):
+        assert "Question 1 " in prompt
+        return "Student is learning SQL for analytics."
+
+    monkeypatch.setattr(conversations.llm, "generate", generate)
+    monkeypatch.setattr(conversations, "execute_write", lambda query, params: writes.append(params))
+    monkeypatch.setattr(conversations, "CONVERSATION_HISTORY_TOKENS", 100)
+
+    conversation = Conversation("e" * 32, user_id=1)
+    for i in range(1, 11):
+        conversation.turns.append(turn(i, f"Question {i} " + "about SQL " * 10))
+
+    overflow = conversation.overflow(budget=50)
+    asyncio.run(conversations.summarize(conversation))
+
+    assert conversation.summary == "Student is learning SQL for analytics."
+    assert conversation.summary_upto == overflow[-1]['message_id']
+    assert all(t['message_id'] > conversation.summary_upto for t in conversation.turns)
+    assert writes == [(conversation.summary, conversation.summary_upto, "e" * 32)]
+    assert not conversation.summarizing
+    print("✅ Summary folding test passed")
+
+
+def test_record_exchange_uses_inserted_ids(monkeypatch):
+    """Test turns keep the ids the database assigned, even when they are not consecutive"""
+    ids = iter([101, 111])  # auto_increment_increment = 10
+    monkeypatch.setattr(conversations, "execute_query", lambda query, params: next(ids))
+    monkeypatch.setattr(conversations, "execute_write", lambda query, params: 1)
+
+    conversation = Conversation("f" * 32, user_id=1)
+    conversations.record_exchange(conversation, "How do I learn SQL?", "Start with SELECT.")
+
+    assert [(t['message_id'], t['role']) for t in conversation.turns] == [(101, "user"), (111, "coach")]
+    print("✅ Exchange ids test passed")
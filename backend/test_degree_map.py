@@ -0,0 +1,56 @@
+from backend import degree_map
+import asyncio
+import json
+
+
+def test_normalize_degree():
+    """Test spellings of the same degree share one key"""
+    same = [
+        "B.Tech CSE",
+        "b tech - computer science & engineering",
+        "Bachelor of Technology in Computer Science and Engineering",
+        "  BTECH (CSE) ",
+    ]
+    keys = {degree_map.normalize_degree(d) for d in same}
+    assert keys == {"btech computer science and engineering"}
+
+    assert degree_map.normalize_degree("M.E. Mechanical") == "me mechanical"
+    assert degree_map.normalize_degree("BE ME") == "be mechanical engineering"
+    assert degree_map.normalize_degree("CS") == "computer science"
+    assert degree_map.normalize_degree(" .. ") == ""
+    print("✅ Degree normalization test passed")
+
+
+def test_lookup_hits_llm_only_once(monkeypatch):
+    """Test a miss generates and stores, and later lookups never call the LLM"""
+    table = {}
+    prompts = []
+
+    def fetch_one(query, params):
+        row = table.get(params[0])
+        return {"career_options": row} if row else None
+
+    def execute_query(query, params):
+        table[params[0]] = params[2]
+
+    async def generate(prompt, endpoint=None):
+        prompts.append(prompt)
+        return '```json\n["Software Engineer", "Data Analyst"]\n```'
+
+    monkeypatch.setattr(degree_map, "fetch_one", fetch_one)
+    monkeypatch.setattr(degree_map, "execute_query", execute_query)
+    monkeypatch.setattr(degree_map.llm, "generate", generate)
+    monkeypatch.setattr(degree_map, "_cache", {})
+
+    first = asyncio.run(degree_map.get_career_options("B.Tech CSE"))
+    again = asyncio.run(degree_map.get_career_options("Bachelor of Technology in CSE"))
+
+    assert first == again == ["Software Engineer", "Data Analyst"]
+    assert len(prompts) == 1
+    assert json.loads(table["btech computer science and engineering"]) == first
+
+    # A fresh process reads the stored row instead of asking again
+    monkeypatch.setattr(degree_map, "_cache", {})
+    assert asyncio.run(degree_map.get_career_options("btech cse")) == first
+    assert len(prompts) == 1
+    print("✅ Degree map lookup test passed")
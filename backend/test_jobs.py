@@ -0,0 +1,122 @@
+from backend import jobs
+from backend.jobs import JobQueue, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+import asyncio
+
+
+def test_priority_and_dedup():
+    """Test interactive jobs jump the queue and duplicates share one run"""
+    order = []
+
+    def task(name):
+        async def run():
+            order.append(name)
+            return name
+        return run
+
+    async def main():
+        queue = JobQueue(workers=1)
+        queue.start()
+        await asyncio.sleep(0)
+
+        # Occupy the only worker so the rest have to queue
+        gate = asyncio.Event()
+
+        async def blocker():
+            await gate.wait()
+        queue.submit("block", "b", blocker)
+        await asyncio.sleep(0)
+
+        batch = queue.submit("career_path", "fp-batch", task("batch"), priority=PRIORITY_BACKGROUND)
+        first = queue.submit("career_path", "fp-user", task("user"), priority=PRIORITY_INTERACTIVE, user_id=1)
+        again = queue.submit("career_path", "fp-user", task("user-again"), user_id=2)
+
+        gate.set()
+        await asyncio.gather(batch.finished.wait(), first.finished.wait())
+        await queue.stop()
+        return first, again, batch
+
+    first, again, batch = asyncio.run(main())
+
+    assert again is first and first.owners == {1, 2}
+    assert order == ["user", "batch"], "higher priority runs first"
+    assert first.result == "user" and batch.result == "batch"
+    print("✅ Job priority and dedup test passed")
+
+
+def test_retry_then_fallback(monkeypatch):
+    """Test failing jobs retry, then fail or fall back"""
+    monkeypatch.setattr(jobs, "JOB_RETRY_BASE", 0)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise RuntimeError("LLM timeout")
+        return {"ok": True}
+
+    async def broken():
+        raise RuntimeError("still down")
+
+    async def main():
+        queue = JobQueue(workers=2, max_attempts=3)
+        recovered = queue.submit("plan", "a", flaky)
+        failed = queue.submit("plan", "b", broken)
+        degraded = queue.submit("plan", "c", broken, fallback=lambda: {"generic": True})
+        await asyncio.gather(*(job.finished.wait() for job in (recovered, failed, degraded)))
+
+        assert queue.submit("plan", "a", flaky) is recovered, "good results are reused"
+        assert queue.submit("plan", "c", broken) is not degraded, "fallback results are not"
+        await queue.stop()
+        return recovered, failed, degraded
+
+    recovered, failed, degraded = asyncio.run(main())
+
+    assert recovered.status == "done" and recovered.attempts == 2 and recovered.result == {"ok": True}
+    assert failed.status == "failed" and failed.attempts == 3 and failed.error == "still down"
+    assert degraded.status == "done" and degraded.result == {"generic": True}
+    print("✅ Job retry test passed")
+
+
+def test_finished_jobs_expire():
+    """Test finished jobs are forgotten after the result TTL"""
+    async def main():
+        queue = JobQueue(workers=1, result_ttl=60)
+
+        async def work():
+            return 1
+        job = queue.submit("plan", "a", work)
+        await job.finished.wait()
+
+        assert queue.submit("plan", "a", work) is job, "recent results are reused"
+        queue._prune(now=job.finished_at + 61)
+        await queue.stop()
+        return queue, job
+
+    queue, job = asyncio.run(main())
+    assert queue.get(job.job_id) is None and not queue.by_fingerprint
+    print("✅ Job expiry test passed")
+
+
+def test_child_jobs_share_owners():
+    """Test users joining a job also own the jobs it starts"""
+    async def main():
+        queue = JobQueue(workers=1)
+        gate = asyncio.Event()
+        children = []
+
+        async def parent_work():
+            await gate.wait()
+            children.append(queue.submit("refine", "fp", gate.wait, parent=jobs.current_job.get()))
+
+        parent = queue.submit("career_path", "fp", parent_work, user_id=1)
+        await asyncio.sleep(0)
+        queue.submit("career_path", "fp", parent_work, user_id=2)
+        gate.set()
+        await parent.finished.wait()
+        queue.submit("career_path", "fp", parent_work, user_id=3)
+        await queue.stop()
+        return children[0]
+
+    child = asyncio.run(main())
+    assert child.owners == {1, 2, 3}
+    print("✅ Child job ownership test passed")
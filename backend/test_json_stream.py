@@ -0,0 +1,73 @@
+import json
+import pytest
+from backend.json_stream import FieldStream, JSONExtractor, extract_json, load_model, load_models
+from backend.models import CareerPath
+
+PATHS = [{
+    "title": "Data Analyst",
+    "fit_reason": "You like [structured] problems and \"clean\" data.",
+    "missing_skills": ["SQL", "Tableau"],
+    "roadmap": ["Learn SQL", "Build a dashboard"]
+}]
+
+
+def test_extract_from_fences_and_prose():
+    """Test the first complete value is found around fences, prose and brackets in strings"""
+    fenced = "Sure! Here are your paths:\n```json\n" + json.dumps(PATHS, indent=2) + "\n```\nGood luck {name}!"
+    assert extract_json(fenced) == PATHS
+
+    prose = "See the list below [as requested]:\n" + json.dumps(PATHS) + "\n[1, 2]"
+    assert extract_json(prose, "[") == PATHS, "balanced prose that is not JSON is skipped"
+
+    assert extract_json('{"a": [1, 2} oops ] {"b": "}"}') == {"b": "}"}
+    assert extract_json("no json here") is None
+    assert extract_json('{"response": "cut off') is None
+    print("✅ JSON extraction test passed")
+
+
+def test_extract_across_chunks():
+    """Test a value split into arbitrary chunks is found once it completes"""
+    text = "```json\n" + json.dumps({"response": "Caf\u00e9 \\ \"ok\"", "suggestions": ["Next?"]}) + "\n```"
+
+    for size in (1, 2, 5, len(text)):
+        extractor = JSONExtractor("{")
+        found = [extractor.feed(text[i:i + size]) for i in range(0, len(text), size)]
+        assert found[-1] and extractor.value["suggestions"] == ["Next?"], f"chunk size {size}"
+        assert found.index(True) == text.index("}\n") // size, "found with the closing brace"
+    print("✅ Chunked extraction test passed")
+
+
+def test_field_stream_renders_progressively():
+    """Test a string field is forwarded chunk by chunk, escapes included"""
+    value = 'Start with "Python".\nThen SQL \u2014 then projects \\o/'
+    text = '{"suggestions": ["a"], "response": ' + json.dumps(value, ensure_ascii=True) + ', "x": 1}'
+
+    for size in (1, 3, 8):
+        stream = FieldStream("response")
+        parts = [stream.feed(text[i:i + size]) for i in range(0, len(text), size)]
+        assert "".join(parts) == value, f"chunk size {size}"
+        assert sum(1 for part in parts if part) > 1
+    print("✅ Field stream test passed")
+
+
+def test_partial_fields():
+    """Test partial() exposes top-level string fields before the object closes"""
+    extractor = JSONExtractor()
+    extractor.feed('Reply: {"response": "Learn SQL fir')
+    assert extractor.partial() == {"response": "Learn SQL fir"}
+
+    extractor.feed('st", "nested": {"response": "no"}, "suggestions": ["Why?"]}')
+    assert extractor.partial() == {"response": "Learn SQL first"}
+    print("✅ Partial fields test passed")
+
+
+def test_load_models_validates():
+    """Test arrays are validated against the pydantic model"""
+    paths = load_models("```\n" + json.dumps(PATHS) + "\n```", CareerPath)
+    assert paths[0].missing_skills == ["SQL", "Tableau"]
+
+    with pytest.raises(ValueError):
+        load_models('[{"title": "Data Analyst"}]', CareerPath)
+    with pytest.raises(json.JSONDecodeError):
+        load_model("Sorry, I cannot help with that.", CareerPath)
+    print("✅ Model validation test passed")
@@ -0,0 +1,49 @@
+from backend.learning_plan import (
+    NEW_SKILL_HOURS, assign_resources, rank_skill_gaps, schedule_weeks, similarity
+)
+
+SKILLS = {1: "Python", 2: "SQL", 3: "Tableau", 4: "Statistics", 5: "Excel"}
+
+
+def test_rank_skill_gaps():
+    """Test gaps combine goal relevance and demand and skip mastered skills"""
+    user_skills = {1: 5, 2: 2}  # strong Python, weak SQL
+    relevant = {1: 0.9, 2: 0.8, 3: 0.7, 4: 0.6}
+    demand = {2: 40, 5: 30, 3: 2}
+
+    gaps = rank_skill_gaps(user_skills, relevant, demand, SKILLS, limit=4)
+
+    assert [gap['skill_name'] for gap in gaps] == ["SQL", "Tableau", "Statistics", "Excel"]
+    assert gaps[0]['current_proficiency'] == 2 and gaps[0]['hours'] < NEW_SKILL_HOURS
+    assert gaps == rank_skill_gaps(user_skills, relevant, demand, SKILLS, limit=4), "deterministic"
+    assert similarity(0.0) == 1.0 and similarity(4.0) == 0.0
+    print("✅ Skill gap ranking test passed")
+
+
+def test_resources_are_not_repeated():
+    """Test each gap gets its closest unused resources"""
+    gaps = [{"skill_name": "SQL"}, {"skill_name": "Tableau"}]
+    shared = {"id": "7", "title": "SQL for Data Analysis", "description": "", "url": "u7"}
+    results = [
+        [shared, {"id": "8", "title": "Databases", "description": "", "url": "u8"}],
+        [shared, {"id": "9", "title": "Dashboards", "description": "", "url": "u9"}],
+    ]
+
+    assign_resources(gaps, results, per_skill=2)
+
+    assert [r['title'] for r in gaps[0]['resources']] == ["SQL for Data Analysis", "Databases"]
+    assert [r['title'] for r in gaps[1]['resources']] == ["Dashboards"]
+    print("✅ Resource assignment test passed")
+
+
+def test_schedule_packs_weeks_by_effort():
+    """Test effort is split across weeks without exceeding the weekly hours"""
+    gaps = [{"skill_name": "SQL", "hours": 10}, {"skill_name": "Tableau", "hours": 4}]
+
+    weeks = schedule_weeks(gaps, hours_per_week=6)
+
+    assert [week['hours'] for week in weeks] == [6, 6, 2]
+    assert weeks[0]['tasks'][0]['activity'] == "Learn the fundamentals of SQL"
+    assert [(t['skill'], t['hours']) for t in weeks[1]['tasks']] == [("SQL", 4), ("Tableau", 2)]
+    assert weeks[2]['tasks'][0]['activity'] == "Build a small project using Tableau"
+    print("✅ Weekly schedule test passed")
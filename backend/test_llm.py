@@ -0,0 +1,228 @@
+from backend import llm, metrics
+from backend.circuit_breaker import CircuitBreaker
+from backend.llm_providers import Completion, LLMProvider
+from backend.llm_stub import StubProvider, LatencyDistribution, split_chunks
+from backend.models import CareerPath
+import asyncio
+import json
+import random
+import pytest
+
+
+class Busy(Exception):
+    """Stands in for a provider's rate limit or overload error"""
+
+
+class FakeProvider(LLMProvider):
+    """Fails with the queued errors, then answers"""
+
+    retryable_errors = (Busy,)
+
+    def __init__(self, errors=(), delay=0, chunks=None):
+        self.errors = list(errors)
+        self.delay = delay
+        self.chunks = chunks or ["answer"]
+        self.calls = 0
+
+    async def start(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+
+    async def generate(self, prompt, model):
+        await self.start()
+        return "".join(self.chunks)
+
+    async def stream(self, prompt, model):
+        await self.start()
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.fixture
+def fake_provider(monkeypatch):
+    monkeypatch.setattr(llm, "backoff_delay", lambda attempt: 0)
+    monkeypatch.setattr(llm, "breaker", CircuitBreaker(window=4, min_calls=4, open_seconds=60))
+    monkeypatch.setattr(llm, "_latencies", {})
+
+    def install(provider):
+        monkeypatch.setattr(llm, "provider", provider)
+        return provider
+    return install
+
+
+def test_retries_transient_errors(fake_provider):
+    """Test rate limits are retried and the answer returned"""
+    provider = fake_provider(FakeProvider(errors=[Busy("slow down")]))
+
+    assert asyncio.run(llm.generate("prompt", retries=2)) == "answer"
+    assert provider.calls == 2
+    print("✅ Retry test passed")
+
+
+def test_timeout_and_permanent_errors(fake_provider):
+    """Test timeouts surface as LLMTimeout and bad requests are not retried"""
+    fake_provider(FakeProvider(delay=1))
+    with pytest.raises(llm.LLMTimeout):
+        asyncio.run(llm.generate("prompt", timeout=0.01, retries=1))
+
+    provider = fake_provider(FakeProvider(errors=[ValueError("bad prompt")]))
+    with pytest.raises(llm.LLMError):
+        asyncio.run(llm.generate("prompt", retries=3))
+    assert provider.calls == 1
+    print("✅ Timeout and error test passed")
+
+
+def test_identical_prompts_coalesce(fake_provider):
+    """Test concurrent identical prompts make a single upstream call"""
+    provider = fake_provider(FakeProvider(delay=0.01))
+
+    async def burst():
+        return await asyncio.gather(*(llm.generate("same prompt") for _ in range(5)), llm.generate("other"))
+
+    assert asyncio.run(burst()) == ["answer"] * 6
+    assert provider.calls == 2
+    print("✅ Coalescing test passed")
+
+
+def test_stream_yields_chunks(fake_provider):
+    """Test streamed text arrives chunk by chunk after a retried start"""
+    fake_provider(FakeProvider(errors=[Busy("busy")], chunks=["Hel", "lo"]))
+
+    async def collect():
+        return [chunk async for chunk in llm.stream("prompt", retries=1)]
+
+    assert asyncio.run(collect()) == ["Hel", "lo"]
+    print("✅ Stream test passed")
+
+
+def test_incomplete_provider_fails_on_creation():
+    """Test a provider missing part of the interface cannot be instantiated"""
+    class GenerateOnly(LLMProvider):
+        async def generate(self, prompt, model):
+            return "answer"
+
+    with pytest.raises(TypeError):
+        GenerateOnly()
+    print("✅ Provider interface test passed")
+
+
+def test_backoff_delay_is_bounded():
+    """Test jittered backoff never exceeds the cap"""
+    for attempt in range(10):
+        delay = llm.backoff_delay(attempt)
+        assert 0 <= delay <= min(llm.LLM_BACKOFF_MAX, llm.LLM_BACKOFF_BASE * 2 ** attempt)
+    print("✅ Backoff test passed")
+
+
+def test_stub_outputs_are_deterministic_and_valid():
+    """Test the stub answers each prompt shape in the format callers parse"""
+    stub = StubProvider(ttft="fixed:0")
+    career_prompt = 'Return ONLY a valid JSON array:\n[{"title": "", "fit_reason": ""}]\n- Career Goal: Data science'
+
+    async def run():
+        first = await stub.generate(career_prompt, "model")
+        again = await stub.generate(career_prompt, "model")
+        chunks = [chunk async for chunk in stub.stream("Reply, then\nSUGGESTIONS: [...]", "model")]
+        return first, again, chunks
+
+    first, again, chunks = asyncio.run(run())
+
+    assert first == again
+    paths = [CareerPath(**path) for path in json.loads(first.split("```")[1][4:])]
+    assert len(paths) == 3 and "Data science" in paths[0].fit_reason
+    assert len(chunks) > 1 and "\nSUGGESTIONS: [" in "".join(chunks)
+    print("✅ Stub provider test passed")
+
+
+def test_stub_latency_distributions():
+    """Test latency specs parse and sample in seconds"""
+    rng = random.Random(1)
+    assert LatencyDistribution.parse("fixed:250").sample(rng) == 0.25
+    assert all(0.1 <= LatencyDistribution.parse("uniform:100,200").sample(rng) <= 0.2 for _ in range(50))
+    samples = sorted(LatencyDistribution.parse("lognormal:400,0.5").sample(rng) for _ in range(1001))
+    assert 0.3 < samples[500] < 0.5, "median is close to the configured one"
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("pareto:1")
+    assert "".join(split_chunks("one two three " * 10)) == "one two three " * 10
+    print("✅ Stub latency test passed")
+
+
+def test_calls_are_instrumented(fake_provider):
+    """Test latency, tokens and failures are recorded per endpoint"""
+    fake_provider(FakeProvider(chunks=["Hel", "lo world"]))
+
+    async def run():
+        await llm.generate("a prompt of some length", endpoint="test_generate")
+        return [chunk async for chunk in llm.stream("prompt", endpoint="test_stream")]
+
+    asyncio.run(run())
+    fake_provider(FakeProvider(errors=[ValueError("bad prompt")]))
+    with pytest.raises(llm.LLMError):
+        asyncio.run(llm.generate("broken", endpoint="test_generate"))
+
+    snapshot = metrics.get_metrics()
+    counters, histograms = snapshot["counters"], snapshot["histograms"]
+    assert histograms["llm.test_generate.latency_ms"]["count"] == 2
+    assert histograms["llm.test_stream.ttft_ms"]["count"] == 1
+    assert counters["llm.test_generate.prompt_tokens"] > 0
+    assert counters["llm.test_stream.response_tokens"] == len("Hello world") // llm.CHARS_PER_TOKEN
+    assert counters["llm.test_generate.errors"] == 1
+    print("✅ LLM instrumentation test passed")
+
+
+def test_reported_usage_beats_estimate(fake_provider):
+    """Test token counters use the provider's counts when it reports them"""
+    class ReportingProvider(FakeProvider):
+        async def generate(self, prompt, model):
+            await self.start()
+            return Completion("Hello world", 7, 3)
+
+    fake_provider(ReportingProvider(chunks=[Completion("Hel", 5, 1), Completion("lo world", 5, 2), "!"]))
+
+    async def run():
+        await llm.generate("a prompt of some length", endpoint="test_usage_generate")
+        return [chunk async for chunk in llm.stream("prompt", endpoint="test_usage_stream")]
+
+    assert "".join(asyncio.run(run())) == "Hello world!"
+
+    counters = metrics.get_metrics()["counters"]
+    assert counters["llm.test_usage_generate.prompt_tokens"] == 7
+    assert counters["llm.test_usage_generate.response_tokens"] == 3
+    assert counters["llm.test_usage_stream.prompt_tokens"] == 5
+    assert counters["llm.test_usage_stream.response_tokens"] == 2, "last reported count wins"
+    print("✅ LLM reported usage test passed")
+
+
+def test_open_circuit_fails_fast(fake_provider):
+    """Test a failing upstream trips the breaker and later calls skip it"""
+    provider = fake_provider(FakeProvider(errors=[Busy("down")] * 4))
+
+    for i in range(2):
+        with pytest.raises(llm.LLMError):
+            asyncio.run(llm.generate(f"prompt {i}", retries=1))
+    assert provider.calls == 4 and llm.breaker.state == "open"
+
+    with pytest.raises(llm.LLMUnavailable):
+        asyncio.run(llm.generate("another prompt"))
+    assert provider.calls == 4, "no upstream call while open"
+    print("✅ Circuit breaker test passed")
+
+
+def test_slow_attempt_is_hedged(fake_provider, monkeypatch):
+    """Test an attempt past the recent p95 gets a second request that wins"""
+    class SlowThenFast(FakeProvider):
+        async def generate(self, prompt, model):
+            self.calls += 1
+            await asyncio.sleep(1 if self.calls == 1 else 0)
+            return f"answer {self.calls}"
+
+    provider = fake_provider(SlowThenFast())
+    monkeypatch.setattr(llm, "LLM_HEDGE_ENABLED", True)
+    llm._latencies["test_hedge"] = [0.01] * llm.LLM_HEDGE_MIN_SAMPLES
+
+    assert asyncio.run(llm.generate("prompt", endpoint="test_hedge")) == "answer 2"
+    assert provider.calls == 2
+    assert metrics.get_metrics()["counters"]["llm.test_hedge.hedged"] == 1
+    print("✅ Hedged request test passed")
@@ -0,0 +1,16 @@
+from backend.metrics import Histogram
+
+
+def test_histogram_quantiles():
+    """Test quantiles resolve to bucket bounds and slow outliers to the max"""
+    histogram = Histogram(bounds=(10, 100, 1000))
+    for value in [5] * 90 + [50] * 9 + [4000]:
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100 and snapshot["max"] == 4000
+    assert snapshot["p50"] == 10 and snapshot["p95"] == 100 and snapshot["p99"] == 100
+    assert histogram.quantile(1.0) == 4000
+    assert snapshot["buckets"] == {"le_10": 90, "le_100": 9, "le_1000": 0, "le_inf": 1}
+    assert Histogram().quantile(0.5) == 0.0
+    print("✅ Histogram test passed")
@@ -0,0 +1,49 @@
+from backend.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, clamp_page_size, encode_cursor, decode_cursor, paginate
+)
+from datetime import date
+
+
+def test_cursor_roundtrip():
+    """Test cursor encode/decode"""
+    cursor = encode_cursor((date(2025, 3, 1), 42))
+    assert decode_cursor(cursor, 2) == ['2025-03-01', 42], "Cursor should round-trip"
+
+    cursor = encode_cursor((None, 7))
+    assert decode_cursor(cursor, 2) == [None, 7], "NULL deadline should round-trip"
+    print("✅ Cursor round-trip test passed")
+
+
+def test_invalid_cursor():
+    """Test malformed cursors are rejected"""
+    for bad in ["not-a-cursor", encode_cursor((1, 2, 3))]:
+        try:
+            decode_cursor(bad, 2)
+            assert False, "Malformed cursor should raise ValueError"
+        except ValueError:
+            pass
+    print("✅ Invalid cursor test passed")
+
+
+def test_page_size_and_paginate():
+    """Test page size clamping and LIMIT n+1 splitting"""
+    assert clamp_page_size(None) == DEFAULT_PAGE_SIZE
+    assert clamp_page_size(0) == DEFAULT_PAGE_SIZE
+    assert clamp_page_size(10_000) == MAX_PAGE_SIZE
+
+    rows = [{'id': i} for i in range(1, 5)]
+    page, next_cursor = paginate(rows, 3, lambda r: (r['id'],))
+    assert [r['id'] for r in page] == [1, 2, 3]
+    assert decode_cursor(next_cursor, 1) == [3], "Cursor should point at last row"
+
+    page, next_cursor = paginate(rows, 4, lambda r: (r['id'],))
+    assert len(page) == 4 and next_cursor is None, "Last page has no cursor"
+    print("✅ Pagination test passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Pagination...\n")
+
+    test_cursor_roundtrip()
+    test_invalid_cursor()
+    test_page_size_and_paginate()
@@ -0,0 +1,44 @@
+from backend.passwords import hash_password_sync, verify_password_sync, needs_rehash, is_legacy_hash
+import hashlib
+
+# Low cost keeps the test fast
+COST = 10
+
+
+def test_hash_and_verify():
+    """Test salted hashes verify and differ per call"""
+    first = hash_password_sync("s3cret", COST)
+    second = hash_password_sync("s3cret", COST)
+
+    assert first != second, "Each hash should use a fresh salt"
+    assert verify_password_sync("s3cret", first)
+    assert not verify_password_sync("wrong", first)
+    assert not verify_password_sync("s3cret", "scrypt$broken")
+    print("✅ Hash/verify test passed")
+
+
+def test_legacy_hashes():
+    """Test old SHA-256 hashes still verify and are flagged for rehash"""
+    legacy = hashlib.sha256("s3cret".encode()).hexdigest()
+
+    assert is_legacy_hash(legacy)
+    assert verify_password_sync("s3cret", legacy)
+    assert not verify_password_sync("wrong", legacy)
+    assert needs_rehash(legacy)
+    print("✅ Legacy hash test passed")
+
+
+def test_needs_rehash_on_cost_change():
+    """Test hashes made with another cost are upgraded"""
+    stored = hash_password_sync("s3cret", COST)
+    assert not needs_rehash(stored, COST)
+    assert needs_rehash(stored, COST + 1)
+    print("✅ Rehash test passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Password Hashing...\n")
+
+    test_hash_and_verify()
+    test_legacy_hashes()
+    test_needs_rehash_on_cost_change()
@@ -0,0 +1,86 @@
+import pytest
+from datetime import date, datetime
+
+# EXPLAIN the queries the routers, background loops and scraper actually run
+# (their query constants and builders, with sample parameters) and fail on
+# any full table scan. Needs a migrated MySQL database; skipped without one.
+try:
+    from backend.database import EXPIRED_DELETE_QUERY, fetch_all, fetch_one
+    fetch_one("SELECT 1")
+except Exception as e:
+    pytest.skip(f"MySQL is not reachable: {e}", allow_module_level=True)
+
+from backend import auth, catalog, career_cache, career_clusters, conversations, degree_map, opportunities, resources
+from backend.migrations import MIGRATIONS, get_current_version
+from backend.models import OpportunitySearch
+from backend.pagination import encode_cursor
+from backend.scraper_utils import DEACTIVATE_STALE_QUERY, DUPLICATE_QUERY
+
+
+def built(name, builder, *args):
+    query, params = builder(*args)
+    return name, query, tuple(params)
+
+
+# LIKE '%...%' location search cannot use a B-tree index and is left out on
+# purpose, as is the catalog's full load, which reads every active row.
+HOT_QUERIES = [
+    ("verify_session", auth.SESSION_QUERY, ("token",)),
+    ("session sweeper", EXPIRED_DELETE_QUERY.format(table="sessions"), (1000,)),
+    ("revoked tokens sweeper", EXPIRED_DELETE_QUERY.format(table="revoked_tokens"), (1000,)),
+    ("career cache sweeper", EXPIRED_DELETE_QUERY.format(table="career_path_cache"), (1000,)),
+    ("revoked tokens initial sync", auth.REVOKED_QUERY, ()),
+    ("revoked tokens sync", auth.REVOKED_SINCE_QUERY, (datetime.now(),)),
+    built("opportunity listing", opportunities.list_query, 20),
+    built("opportunity listing, next page", opportunities.list_query, 20,
+          encode_cursor([date.today(), 100])),
+    built("opportunity search", opportunities.search_query, OpportunitySearch(query="python developer"), 20),
+    built("opportunity search, next page", opportunities.search_query, OpportunitySearch(query="python developer"), 20,
+          encode_cursor([1.5, 100])),
+    built("opportunity search by skill and deadline", opportunities.search_query,
+          OpportunitySearch(query="python", skill_ids=[1, 2], deadline_after=date.today()), 20),
+    ("saved opportunities", opportunities.SAVED_QUERY, (1,)),
+    built("resource listing", resources.list_query, 20),
+    built("resource listing, next page", resources.list_query, 20, encode_cursor([datetime.now(), 100])),
+    ("catalog active ids", catalog.ACTIVE_IDS_QUERY, ()),
+    ("catalog changes", catalog.CATALOG_QUERY + " AND o.last_updated >= %s GROUP BY o.opportunity_id",
+     (datetime.now(),)),
+    ("career path cache", career_cache.CACHE_QUERY, ("0" * 64,)),
+    ("career path clusters", career_clusters.CLUSTERS_QUERY, ("career-path-v1", "career-path-v1")),
+    ("degree map lookup", degree_map.CAREER_OPTIONS_QUERY, ("btech computer science", "degree-map-v1")),
+    ("conversation turns", conversations.MESSAGES_QUERY, ("0" * 32, 0, 50)),
+    ("scraper dedup", DUPLICATE_QUERY.format(table="opportunities"), ("hash",)),
+    ("opportunity cleanup", DEACTIVATE_STALE_QUERY.format(table="opportunities"), (30,)),
+    ("course cleanup", DEACTIVATE_STALE_QUERY.format(table="courses"), (90,)),
+]
+
+
+def find_full_scans(query, params):
+    """Return EXPLAIN rows that read a whole table, whether or not a key was possible"""
+    plan = fetch_all("EXPLAIN " + query, params)
+    return [row for row in plan if row['type'] == 'ALL']
+
+
+def test_schema_is_current():
+    """Test all migrations have been applied"""
+    assert get_current_version() == MIGRATIONS[-1][0], "Run python -m backend.migrations"
+    print("✅ Schema version test passed")
+
+
+def test_hot_queries_use_indexes():
+    """Test no hot query falls back to a full table scan"""
+    failures = []
+    for name, query, params in HOT_QUERIES:
+        scans = find_full_scans(query, params)
+        if scans:
+            failures.append(f"{name}: full scan on {', '.join(row['table'] for row in scans)}")
+
+    assert not failures, "Full table scans found:\n" + "\n".join(failures)
+    print("✅ Query plan test passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Query Plans...\n")
+
+    test_schema_is_current()
+    test_hot_queries_use_indexes()
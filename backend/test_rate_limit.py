@@ -0,0 +1,82 @@
+from backend import rate_limit
+from backend.rate_limit import MemoryStore, SQLiteStore, parse_limit
+from fastapi import HTTPException
+import asyncio
+import pytest
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills():
+    """Test a bucket spends its burst, reports the wait and refills over time"""
+    clock = Clock()
+    store = MemoryStore(clock=clock)
+    capacity, rate = parse_limit("3/60")
+
+    assert [store.take("coach_chat:1", capacity, rate) for _ in range(3)] == [0, 0, 0]
+    assert store.take("coach_chat:1", capacity, rate) == pytest.approx(20)
+    assert store.take("coach_chat:2", capacity, rate) == 0, "users have separate buckets"
+
+    clock.now = 20
+    assert store.take("coach_chat:1", capacity, rate) == 0
+    print("✅ Token bucket test passed")
+
+
+def test_idle_buckets_are_swept():
+    """Test the store forgets refilled buckets once it holds too many keys"""
+    clock = Clock()
+    store = MemoryStore(max_keys=2, clock=clock)
+    store.take("a", 1, 1)
+    store.take("b", 1, 1)
+    store.take("slow", 1, 1 / 60)  # another limit, refilling over a minute
+    clock.now = 5
+    store.take("c", 1, 1)
+    assert set(store.buckets) == {"slow", "c"}, "each bucket is judged by its own refill time"
+    print("✅ Bucket sweep test passed")
+
+
+def test_sqlite_store_is_shared(tmp_path):
+    """Test two stores on one file (two workers) drain the same bucket"""
+    path = str(tmp_path / "buckets.db")
+    first, second = SQLiteStore(path), SQLiteStore(path)
+
+    assert first.take("career_path:1", 2, 1 / 30) == 0
+    assert second.take("career_path:1", 2, 1 / 30) == 0
+    assert first.take("career_path:1", 2, 1 / 30) > 29
+    print("✅ Shared bucket store test passed")
+
+
+def test_sqlite_store_prunes_refilled_buckets(tmp_path, monkeypatch):
+    """Test rows are deleted once their bucket would be full again"""
+    store = SQLiteStore(str(tmp_path / "buckets.db"), sweep_seconds=0)
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+
+    store.take("coach_chat:1", 10, 10 / 60)
+    store.take("career_path:1", 5, 5 / 3600)
+    now[0] += 61
+    store.take("coach_chat:2", 10, 10 / 60)
+
+    keys = {row[0] for row in store._connect().execute("SELECT key FROM buckets")}
+    assert keys == {"career_path:1", "coach_chat:2"}
+    print("✅ Bucket pruning test passed")
+
+
+def test_limited_request_gets_429(monkeypatch):
+    """Test an empty bucket raises 429 with a whole-second Retry-After"""
+    monkeypatch.setattr(rate_limit, "store", MemoryStore())
+    monkeypatch.setenv("RATE_LIMIT_COACH_CHAT", "1/90")
+
+    asyncio.run(rate_limit.check("coach_chat", 7))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(rate_limit.check("coach_chat", 7))
+
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "90"
+    print("✅ Rate limit response test passed")
@@ -0,0 +1,59 @@
+from backend.coach_cache import profile_bucket
+from backend.semantic_cache import SemanticCache
+import numpy as np
+
+DIM = 16
+
+
+def unit(seed):
+    return np.random.default_rng(seed).normal(size=DIM).astype('float32')
+
+
+def nearby(vector, noise=0.05, seed=0):
+    return vector + np.random.default_rng(seed).normal(scale=noise, size=DIM).astype('float32')
+
+
+def test_similar_question_hits_within_bucket():
+    """Test near-duplicates hit, other buckets and unrelated questions miss"""
+    cache = SemanticCache(DIM, max_size=10, threshold=0.9)
+    question = unit(1)
+    cache.put(question, "cs|swe", {"response": "Practice DSA"})
+
+    assert cache.get(nearby(question), "cs|swe") == {"response": "Practice DSA"}
+    assert cache.get(nearby(question), "mech|design") is None, "buckets never mix"
+    assert cache.get(unit(2), "cs|swe") is None, "unrelated question"
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.hit_ratio() == round(1 / 3, 4)
+    print("✅ Semantic hit test passed")
+
+
+def test_lru_eviction_and_ttl():
+    """Test the least recently used entry goes first and old entries expire"""
+    cache = SemanticCache(DIM, max_size=2, threshold=0.9, ttl=60)
+    a, b, c = unit(1), unit(2), unit(3)
+
+    cache.put(a, "x", "A", now=0)
+    cache.put(b, "x", "B", now=0)
+    assert cache.get(a, "x", now=1) == "A"  # a is now most recently used
+
+    cache.put(c, "x", "C", now=2)
+    assert len(cache) == 2 and cache.index.ntotal == 2
+    assert cache.get(b, "x", now=3) is None, "b was evicted"
+    assert cache.get(a, "x", now=3) == "A"
+
+    assert cache.get(c, "x", now=100) is None, "entries expire after ttl"
+    assert len(cache) == 0 and cache.index.ntotal == 0
+    print("✅ Eviction test passed")
+
+
+def test_profile_bucket_ignores_skill_order():
+    """Test the bucket keeps the top skills by proficiency, ties by name"""
+    def profile(*skills):
+        return {"degree": "B.Tech CSE", "career_goal": "Data Analyst",
+                "skills": [{"skill_name": name, "proficiency": level} for name, level in skills]}
+
+    tied = [("SQL", 3), ("Python", 3), ("Excel", 3), ("Tableau", 3)]
+    assert profile_bucket(profile(*tied)) == profile_bucket(profile(*reversed(tied)))
+    assert "tableau" not in profile_bucket(profile(*tied)), "ties broken by name"
+    assert "tableau" in profile_bucket(profile(("Tableau", 5), *tied[:3]))
+    print("✅ Profile bucket test passed")
@@ -0,0 +1,49 @@
+from backend.session_tokens import DenyList, create_signed_token, is_signed_token, parse_signed_token
+from datetime import datetime, timedelta
+
+SECRET = "test-secret"
+
+
+def test_signed_token_roundtrip():
+    """Test a signed token carries user_id and expiry"""
+    expires_at = (datetime.now() + timedelta(days=7)).replace(microsecond=0)
+    token = create_signed_token(42, expires_at, SECRET)
+
+    assert is_signed_token(token)
+    assert not is_signed_token("0b4c7e9a-3f1d-4a57-9f7e-1f5a3c2b9d10"), "uuid tokens are not signed"
+
+    user_id, parsed_expiry, token_id = parse_signed_token(token, SECRET)
+    assert user_id == 42 and parsed_expiry == expires_at and token_id
+    print("✅ Signed token round-trip test passed")
+
+
+def test_tampered_token_rejected():
+    """Test wrong secrets and edited payloads fail verification"""
+    token = create_signed_token(42, datetime.now() + timedelta(days=1), SECRET)
+    prefix, user_id, expires_ts, token_id, signature = token.split(".")
+
+    assert parse_signed_token(token, "other-secret") is None
+    assert parse_signed_token(f"{prefix}.1.{expires_ts}.{token_id}.{signature}", SECRET) is None
+    assert parse_signed_token("s1.garbage", SECRET) is None
+    print("✅ Tampered token test passed")
+
+
+def test_deny_list_prune():
+    """Test revocations are dropped once the token has expired"""
+    deny_list = DenyList()
+    now = datetime.now()
+    deny_list.add("live", now + timedelta(hours=1))
+    deny_list.add("dead", now - timedelta(hours=1))
+
+    deny_list.prune(now)
+    assert "live" in deny_list and "dead" not in deny_list
+    assert len(deny_list) == 1
+    print("✅ Deny-list test passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Session Tokens...\n")
+
+    test_signed_token_roundtrip()
+    test_tampered_token_rejected()
+    test_deny_list_prune()
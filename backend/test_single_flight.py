@@ -0,0 +1,73 @@
+from backend.single_flight import SingleFlight
+import asyncio
+import pytest
+
+
+def test_concurrent_calls_share_one_result():
+    """Test identical concurrent keys run once and get the same object"""
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"paths": ["Data Analyst"]}
+
+    async def main():
+        results = await asyncio.gather(*(flights.do("cs", fetch) for _ in range(10)))
+        other = await flights.do("ee", fetch)
+        return results, other
+
+    results, other = asyncio.run(main())
+
+    assert len(calls) == 2, "one call per distinct key"
+    assert all(r is results[0] for r in results)
+    assert other == results[0] and other is not results[0]
+    assert flights.started == 2 and flights.joined == 9
+    assert len(flights) == 0, "finished calls are forgotten"
+    print("✅ Single-flight sharing test passed")
+
+
+def test_errors_propagate_and_are_not_cached():
+    """Test every waiter sees the failure and the next call retries"""
+    flights = SingleFlight()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "ok"
+
+    async def main():
+        first = await asyncio.gather(*(flights.do("k", flaky) for _ in range(3)), return_exceptions=True)
+        second = await flights.do("k", flaky)
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert all(isinstance(r, RuntimeError) for r in first)
+    assert second == "ok" and len(attempts) == 2
+    print("✅ Single-flight error test passed")
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    """Test one caller going away leaves the shared call running"""
+    flights = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        leaver = asyncio.ensure_future(flights.do("k", slow))
+        stayer = asyncio.ensure_future(flights.do("k", slow))
+        await asyncio.sleep(0)
+        leaver.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaver
+        return await stayer
+
+    assert asyncio.run(main()) == "done"
+    print("✅ Single-flight cancellation test passed")
@@ -0,0 +1,44 @@
+from backend.streaming import MarkerSplitter, format_sse
+import json
+
+MARKER = "SUGGESTIONS:"
+
+
+def run(chunks):
+    splitter = MarkerSplitter(MARKER)
+    forwarded = [splitter.feed(chunk) for chunk in chunks]
+    text, tail = splitter.finish()
+    return "".join(forwarded) + text, tail
+
+
+def test_marker_split_across_chunks():
+    """Test a marker broken over several chunks never leaks into the text"""
+    answer = "Start with Python basics.\nThen build projects.\n"
+    tail = ' ["What next?", "How long?"]'
+    full = answer + MARKER + tail
+
+    for size in (1, 3, 7, len(full)):
+        chunks = [full[i:i + size] for i in range(0, len(full), size)]
+        assert run(chunks) == (answer, tail), f"chunk size {size}"
+    print("✅ Marker split test passed")
+
+
+def test_text_forwarded_early():
+    """Test text is released as soon as it cannot be part of the marker"""
+    splitter = MarkerSplitter(MARKER)
+    assert splitter.feed("Hello wor") == "Hello wor"
+    assert splitter.feed("ld SUGG") == "ld "
+    assert splitter.feed("ESTED reading") == "SUGGESTED reading"
+    assert splitter.finish() == ("", None)
+    print("✅ Early forwarding test passed")
+
+
+def test_format_sse():
+    """Test SSE frames carry the event name and a JSON payload"""
+    frame = format_sse("token", {"text": "line one\nline two"})
+    event, data, blank, end = frame.split("\n")
+
+    assert event == "event: token"
+    assert json.loads(data[len("data: "):]) == {"text": "line one\nline two"}
+    assert blank == "" and end == ""
+    print("✅ SSE format test passed")
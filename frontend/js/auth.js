@@ -160,6 +160,46 @@ async function verifySession() {
     }
 }
 
+// Submit a background job and poll until it finishes; resolves to the job result
+async function runJob(path, options = {}) {
+    const submit = await fetch(`${API_BASE_URL}${path}`, {
+        method: 'POST',
+        headers: getAuthHeaders(),
+        ...options
+    });
+    const submitted = await submit.json();
+
+    if (!submit.ok) {
+        const error = new Error(submitted.detail || 'Could not start job');
+        error.status = submit.status;
+        throw error;
+    }
+
+    return waitForJob(submitted.job_id);
+}
+
+// Poll a job until it finishes and return its result
+async function waitForJob(jobId) {
+    let delay = 500;
+    while (true) {
+        const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`, {
+            headers: getAuthHeaders()
+        });
+        const data = await response.json();
+
+        if (!response.ok) {
+            const error = new Error(data.detail || 'Job lookup failed');
+            error.status = response.status;
+            throw error;
+        }
+        if (data.job.status === 'done') return data.job.result;
+        if (data.job.status === 'failed') throw new Error(data.job.error || 'Job failed');
+
+        await new Promise(resolve => setTimeout(resolve, delay));
+        delay = Math.min(delay * 1.5, 3000);
+    }
+}
+
 // Debug function - for testing
 function debugAuth() {
     console.log('=== AUTH DEBUG ===');
@@ -78,34 +78,32 @@ async function getCareerRecommendations() {
     careerPaths.classList.add('hidden');
 
     try {
-        const response = await fetch(`${API_BASE_URL}/career/path`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-                'Authorization': `Bearer ${token}`
-            },
+        // Generation runs as a background job so the request never hangs
+        const data = await runJob('/career/path/async', {
             body: JSON.stringify({ user_id: parseInt(userId) })
         });
 
-        const data = await response.json();
+        // Hide loading, show results
+        loadingState.classList.add('hidden');
+        careerPaths.classList.remove('hidden');
 
-        if (response.ok && data.success) {
-            // Hide loading, show results
-            loadingState.classList.add('hidden');
-            careerPaths.classList.remove('hidden');
+        // Display career paths
+        displayCareerPaths(data.career_paths);
 
-            // Display career paths
-            displayCareerPaths(data.career_paths);
-        } else if (response.status === 401) {
-            localStorage.clear();
-            window.location.href = '/login';
-        } else {
-            alert('Error getting recommendations: ' + (data.detail || 'Unknown error'));
-            loadingState.classList.add('hidden');
+        // Paths from a similar profile group; swap in personalized ones when ready
+        if (data.refine_job_id) {
+            waitForJob(data.refine_job_id)
+                .then(refined => displayCareerPaths(refined.career_paths))
+                .catch(error => console.error('Error refining career paths:', error));
         }
     } catch (error) {
         console.error('Error:', error);
-        alert('Network error. Please try again.');
+        if (error.status === 401) {
+            localStorage.clear();
+            window.location.href = '/login';
+            return;
+        }
+        alert('Error getting recommendations: ' + (error.message || 'Unknown error'));
         loadingState.classList.add('hidden');
     } finally {
         btn.disabled = false;
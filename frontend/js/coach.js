@@ -1,4 +1,5 @@
 let messageCount = 0;
+let conversationId = null;
 
 // Load on page load
 document.addEventListener('DOMContentLoaded', async () => {
@@ -26,31 +27,57 @@ async function sendMessage() {
     sendBtn.disabled = true;
     sendBtn.textContent = 'Thinking...';
 
+    let aiText = null;
+
     try {
         const token = localStorage.getItem('session_token');
-        const response = await fetch(`${API_BASE_URL}/coach/chat`, {
+        const response = await fetch(`${API_BASE_URL}/coach/chat/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
                 'Authorization': `Bearer ${token}`
             },
-            body: JSON.stringify({ message: message })
+            body: JSON.stringify({ message: message, conversation_id: conversationId })
         });
 
-        const data = await response.json();
+        if (response.status === 429) {
+            const wait = response.headers.get('Retry-After') || 'a few';
+            removeTypingIndicator(typingId);
+            aiText = addAIMessage(`You're sending messages quickly. Please wait ${wait} seconds and try again.`, []);
+            return;
+        }
+        if (!response.ok || !response.body) {
+            throw new Error(`Chat failed with status ${response.status}`);
+        }
 
-        // Remove typing indicator
-        removeTypingIndicator(typingId);
+        // Render tokens as server-sent events arrive
+        await readEventStream(response, (event, data) => {
+            if (event === 'token') {
+                if (!aiText) {
+                    removeTypingIndicator(typingId);
+                    aiText = addAIMessage('', []);
+                }
+                aiText.textContent += data.text;
+                scrollToBottom();
+            } else if (event === 'suggestions') {
+                if (data.suggestions.length > 0) {
+                    showSuggestions(data.suggestions);
+                }
+            } else if (event === 'done') {
+                conversationId = data.conversation_id || conversationId;
+            }
+        });
 
-        if (data.success) {
-            addAIMessage(data.response, data.suggestions || []);
-        } else {
+        removeTypingIndicator(typingId);
+        if (!aiText) {
             addAIMessage("I apologize, but I encountered an error. Please try again.", []);
         }
     } catch (error) {
         console.error('Chat error:', error);
         removeTypingIndicator(typingId);
-        addAIMessage("I'm having trouble connecting. Please check your internet and try again.", []);
+        if (!aiText) {
+            addAIMessage("I'm having trouble connecting. Please check your internet and try again.", []);
+        }
     } finally {
         sendBtn.disabled = false;
         sendBtn.textContent = 'Send';
@@ -101,6 +128,38 @@ function addAIMessage(message, suggestions = []) {
     }
 
     scrollToBottom();
+
+    // Text element, so streamed replies can keep appending to it
+    return messageDiv.querySelector('p');
+}
+
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+
+        // Frames are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            frame.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+
+            if (data) onEvent(event, JSON.parse(data));
+        }
+    }
 }
 
 function showSuggestions(suggestions) {
@@ -161,18 +220,18 @@ async function getLearningPlan() {
     const typingId = showTypingIndicator();
 
     try {
-        const token = localStorage.getItem('session_token');
+        // Plans are assembled from search results, not generated, so they return at once
         const response = await fetch(`${API_BASE_URL}/coach/plan`, {
-            headers: {
-                'Content-Type': 'application/json',
-                'Authorization': `Bearer ${token}`
-            }
+            headers: getAuthHeaders()
         });
-
         const data = await response.json();
 
         removeTypingIndicator(typingId);
 
+        if (!response.ok) {
+            throw new Error(data.detail || 'Learning plan failed');
+        }
+
         if (data.success) {
             const plan = data.plan;
 
@@ -186,6 +245,15 @@ async function getLearningPlan() {
             plan.learning_resources.forEach((resource, i) => {
                 message += `  ${i + 1}. ${resource.title}\n`;
             });
+            if (plan.weeks && plan.weeks.length > 0) {
+                message += `\n🗓️ Weekly Schedule (~${plan.hours_per_week} hours/week, ${plan.total_hours} hours total):\n`;
+                plan.weeks.forEach(week => {
+                    message += `  Week ${week.week}:\n`;
+                    week.tasks.forEach(task => {
+                        message += `    • ${task.activity} (${task.hours}h)\n`;
+                    });
+                });
+            }
             message += `\n✅ Next Steps:\n`;
             plan.next_steps.forEach((step, i) => {
                 message += `  ${i + 1}. ${step}\n`;
@@ -70,7 +70,7 @@ async function loadDashboardStats() {
 
 async function loadRecentOpportunities() {
     try {
-        const response = await fetch(`${API_BASE_URL}/opportunities/all`);
+        const response = await fetch(`${API_BASE_URL}/opportunities/all?limit=2`);
         const data = await response.json();
 
         if (data.success && data.opportunities.length > 0) {
@@ -193,7 +193,7 @@ function handleOpportunitiesEmptyState(hasOpportunities) {
 // Update your loadRecentOpportunities function
 async function loadRecentOpportunities() {
     try {
-        const response = await fetch(`${API_BASE_URL}/opportunities/all`);
+        const response = await fetch(`${API_BASE_URL}/opportunities/all?limit=2`);
         const data = await response.json();
 
         const container = document.getElementById('recentOpportunities');
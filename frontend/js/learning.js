@@ -34,7 +34,7 @@ async function loadUserProfile() {
 
 async function loadDefaultResources() {
     try {
-        const response = await fetch(`${API_BASE_URL}/resources/all`);
+        const response = await fetch(`${API_BASE_URL}/resources/all?limit=6`);
         const data = await response.json();
 
         if (data.success) {
@@ -1,7 +1,15 @@
+const PAGE_SIZE = 20;
+
 let allOpportunities = [];
+let shownOpportunities = [];
 let currentTab = 'all';
 let savedOpportunityIds = new Set();
 
+// Keyset pagination: the list on screen, how to fetch its next page and where it ends
+let fetchPage = listPage;
+let nextCursor = null;
+let listCursor = null;  // next page of the unfiltered listing
+
 // Load opportunities on page load
 document.addEventListener('DOMContentLoaded', async () => {
     const isValid = await verifySession();
@@ -32,15 +40,35 @@ async function loadSavedCount() {
     }
 }
 
+function listPage(cursor) {
+    const url = `${API_BASE_URL}/opportunities/all?limit=${PAGE_SIZE}` +
+        (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+    return fetch(url).then(response => response.json());
+}
+
+function searchPage(query, location) {
+    return cursor => {
+        const url = `${API_BASE_URL}/opportunities/search?limit=${PAGE_SIZE}` +
+            (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+        return fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ query: query, location: location || null })
+        }).then(response => response.json());
+    };
+}
+
 async function loadOpportunities() {
     showLoading();
 
     try {
-        const response = await fetch(`${API_BASE_URL}/opportunities/all`);
-        const data = await response.json();
+        // Only the first page; the rest is fetched with "Load more"
+        const data = await listPage(null);
 
         if (data.success) {
             allOpportunities = data.opportunities;
+            fetchPage = listPage;
+            nextCursor = listCursor = data.next_cursor;
             await checkSavedStatus();
             displayOpportunities(allOpportunities);
         } else {
@@ -52,6 +80,32 @@ async function loadOpportunities() {
     }
 }
 
+async function loadMore() {
+    if (!nextCursor) return;
+
+    const btn = document.getElementById('loadMoreBtn');
+    btn.disabled = true;
+    btn.textContent = 'Loading...';
+
+    try {
+        const data = await fetchPage(nextCursor);
+
+        if (data.success) {
+            nextCursor = data.next_cursor;
+            if (fetchPage === listPage) {
+                allOpportunities = allOpportunities.concat(data.opportunities);
+                listCursor = nextCursor;
+            }
+            displayOpportunities(shownOpportunities.concat(filterLoaded(data.opportunities)));
+        }
+    } catch (error) {
+        console.error('Error loading more opportunities:', error);
+    } finally {
+        btn.disabled = false;
+        btn.textContent = 'Load more';
+    }
+}
+
 async function checkSavedStatus() {
     const token = localStorage.getItem('session_token');
     if (!token) return;
@@ -80,7 +134,10 @@ function displayOpportunities(opportunities) {
     const loadingState = document.getElementById('loadingState');
     const emptyState = document.getElementById('emptyState');
 
-    if (opportunities.length === 0) {
+    shownOpportunities = opportunities;
+    document.getElementById('loadMore').classList.toggle('hidden', !nextCursor);
+
+    if (opportunities.length === 0 && !nextCursor) {
         showEmpty();
         return;
     }
@@ -230,6 +287,7 @@ async function changeTab(tab) {
     showLoading();
 
     if (tab === 'saved') {
+        nextCursor = null;  // saved opportunities come in one response
         await loadSavedOpportunities();
     } else {
         await loadOpportunities();
@@ -264,35 +322,49 @@ async function loadSavedOpportunities() {
     }
 }
 
-function applyFilters() {
+function filterLoaded(opportunities) {
     const location = document.getElementById('locationFilter').value;
     const source = document.getElementById('sourceFilter').value;
-    const search = document.getElementById('searchInput').value.toLowerCase();
 
-    let filtered = allOpportunities;
+    return opportunities.filter(o =>
+        (!location || (o.location && o.location.includes(location))) &&
+        (!source || o.source === source)
+    );
+}
 
-    if (location) {
-        filtered = filtered.filter(o => o.location && o.location.includes(location));
-    }
+async function applyFilters() {
+    const location = document.getElementById('locationFilter').value;
+    const search = document.getElementById('searchInput').value.trim();
 
-    if (source) {
-        filtered = filtered.filter(o => o.source === source);
-    }
+    let filtered = allOpportunities;
+    fetchPage = listPage;
+    nextCursor = listCursor;
 
+    // Keyword search is ranked server-side with MySQL full-text search
     if (search) {
-        filtered = filtered.filter(o =>
-            o.title.toLowerCase().includes(search) ||
-            o.description.toLowerCase().includes(search)
-        );
+        try {
+            const page = searchPage(search, location);
+            const data = await page(null);
+
+            if (data.success) {
+                filtered = data.opportunities;
+                fetchPage = page;
+                nextCursor = data.next_cursor;
+            }
+        } catch (error) {
+            console.error('Error searching opportunities:', error);
+        }
     }
 
-    displayOpportunities(filtered);
+    displayOpportunities(filterLoaded(filtered));
 }
 
 function clearFilters() {
     document.getElementById('locationFilter').value = '';
     document.getElementById('sourceFilter').value = '';
     document.getElementById('searchInput').value = '';
+    fetchPage = listPage;
+    nextCursor = listCursor;
     displayOpportunities(allOpportunities);
 }
 
@@ -300,11 +372,13 @@ function showLoading() {
     document.getElementById('loadingState').classList.remove('hidden');
     document.getElementById('emptyState').classList.add('hidden');
     document.getElementById('opportunitiesGrid').classList.add('hidden');
+    document.getElementById('loadMore').classList.add('hidden');
 }
 
 function showEmpty() {
     document.getElementById('loadingState').classList.add('hidden');
     document.getElementById('emptyState').classList.remove('hidden');
     document.getElementById('opportunitiesGrid').classList.add('hidden');
+    document.getElementById('loadMore').classList.add('hidden');
     document.getElementById('oppCount').textContent = '0';
 }
\ No newline at end of file
@@ -1,5 +1,6 @@
 -- MentoraX Database Setup Script
 -- Run this script to create the database and all required tables
+-- Afterwards run `python -m backend.migrations` to apply later schema changes and indexes
 
 CREATE DATABASE IF NOT EXISTS MentoraX;
 USE MentoraX;
@@ -9,7 +10,7 @@ CREATE TABLE IF NOT EXISTS users (
     user_id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
     email VARCHAR(255) NOT NULL UNIQUE,
-    password VARCHAR(64) NOT NULL,
+    password VARCHAR(255) NOT NULL,
     degree VARCHAR(255) DEFAULT NULL,
     career_goal VARCHAR(255) DEFAULT NULL,
     resume_url TEXT DEFAULT NULL,